@@ -17,11 +17,23 @@ __version__ = "2.0.1"
 from chatom import Channel, Message, User
 
 from .bot import Bot
-from .bot_config import BotConfig, DiscordConfig, SlackConfig, SymphonyConfig, TelegramConfig
+from .bot_config import (
+    AdmissionConfig,
+    AsyncLoopConfig,
+    BotConfig,
+    CommandPoolConfig,
+    DiscordConfig,
+    OutboxConfig,
+    RateLimitConfig,
+    SlackConfig,
+    SymphonyConfig,
+    TelegramConfig,
+)
 from .commands import (
     BaseCommand,
     BaseCommandModel,
     BotInfo,
+    CachePolicy,
     Command,
     CommandContext,
     CommandModel,
@@ -40,13 +52,15 @@ from .commands import (
 )
 from .gateway import CspBotGateway, Gateway, GatewayChannels, GatewayModule, GatewaySettings
 from .persistence import FsspecStateStore, InMemoryStateStore, ScheduledCommandRecord, ScheduleStore, StateStore, StoredRecord
-from .structs import Backend, BotCommand, BotMessage, CommandVariant
+from .structs import Backend, BotCommand, BotMessage, CommandVariant, MessagePriority
 from .utils import format_message, get_backend_format, is_valid_url, mention_users
 
 # Alias for backwards compatibility with tests
 Channels = GatewayChannels
 
 __all__ = (
+    "AdmissionConfig",
+    "AsyncLoopConfig",
     "Backend",
     "BaseCommand",
     "BaseCommandModel",
@@ -55,11 +69,13 @@ __all__ = (
     "BotConfig",
     "BotInfo",
     "BotMessage",
+    "CachePolicy",
     "Channel",
     "Channels",
     "Command",
     "CommandContext",
     "CommandModel",
+    "CommandPoolConfig",
     "CommandVariant",
     "CspBotGateway",
     "DiscordConfig",
@@ -73,7 +89,10 @@ __all__ = (
     "InMemoryStateStore",
     "LegacyCommandAdapter",
     "Message",
+    "MessagePriority",
     "NoResponseCommand",
+    "OutboxConfig",
+    "RateLimitConfig",
     "ReplyCommand",
     "ReplyToAllCommand",
     "ReplyToAuthorCommand",
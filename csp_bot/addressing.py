@@ -0,0 +1,131 @@
+"""Per-backend matcher for messages addressed to the bot.
+
+The bot identity (user ID and display name) is fixed per backend once it has
+been fetched, so the mention pattern and name prefix are compiled once here
+instead of being rebuilt for every incoming message.
+"""
+
+import html
+import re
+from collections.abc import Iterable
+
+from chatom import User
+
+__all__ = (
+    "AddressMatch",
+    "AddressMatcher",
+    "AddressReason",
+)
+
+
+class AddressReason:
+    """Why a message was considered addressed to the bot."""
+
+    DM = "dm"
+    MENTION = "mention"
+    NAME = "name"
+
+
+class AddressMatch:
+    """Result of a successful address match."""
+
+    __slots__ = ("reason", "text")
+
+    def __init__(self, reason: str, text: str):
+        self.reason = reason
+        self.text = text
+
+
+class AddressMatcher:
+    """Compiled matcher for a single backend's bot identity.
+
+    Decides whether a message is a DM, mentions the bot by ID, or mentions the
+    bot by name, and strips the bot mention to produce the command text.
+    """
+
+    __slots__ = ("_escaped_name", "_mention_re", "_name_prefix", "backend", "bot_id", "bot_name")
+
+    def __init__(self, backend: str, bot_id: str | None = None, bot_name: str | None = None):
+        self.backend = backend
+        self.bot_id = bot_id
+        self.bot_name = bot_name
+        # <@BOT_ID> (Slack) and <@!BOT_ID> (Discord nickname mention)
+        self._mention_re = re.compile(rf"<@!?{re.escape(bot_id)}>") if bot_id else None
+        self._name_prefix = f"@{bot_name}" if bot_name else ""
+        # Symphony content arrives as escaped PresentationML
+        self._escaped_name = html.escape(str(bot_name)) if bot_name else ""
+
+    def is_identity(self, bot_id: str | None, bot_name: str | None) -> bool:
+        """Return whether this matcher was compiled for the given identity."""
+        return self.bot_id == bot_id and self.bot_name == bot_name
+
+    def may_address(self, raw_content: str, mentions: Iterable[User] = (), data: str | None = None) -> bool:
+        """Cheap, conservative check on the raw message before full parsing.
+
+        Only substring and ID comparisons are done here. A ``False`` result
+        means the message cannot mention the bot by ID or name; DMs and
+        replies must be checked separately. If the bot ID is not known yet,
+        every message is a candidate.
+
+        Args:
+            raw_content: Unparsed message content.
+            mentions: Users already parsed as mentioned by the adapter.
+            data: Raw Symphony entity data, if any.
+        """
+        bot_id = self.bot_id
+        if not bot_id:
+            return True
+        if bot_id in raw_content or (data and bot_id in data):
+            return True
+        if any(u.id == bot_id for u in mentions):
+            return True
+        return bool(self._escaped_name) and (self._escaped_name in raw_content or str(self.bot_name) in raw_content)
+
+    def command_text(self, content: str) -> str:
+        """Strip the bot mention and leading ``@bot_name`` from content."""
+        text, _ = self._strip(content)
+        return text
+
+    def match(
+        self,
+        content: str,
+        mentions: Iterable[User],
+        is_dm: bool = False,
+        author_id: str | None = None,
+    ) -> AddressMatch | None:
+        """Classify a message and return the stripped command text.
+
+        Args:
+            content: Plain-text message content.
+            mentions: Users mentioned in the message.
+            is_dm: Whether the message was sent in a direct message.
+            author_id: ID of the message author.
+
+        Returns:
+            An AddressMatch if the message is addressed to the bot, else None.
+        """
+        text, stripped_id = self._strip(content)
+
+        # In DMs, accept anything not sent by the bot itself
+        if is_dm and author_id and author_id != self.bot_id:
+            return AddressMatch(AddressReason.DM, text)
+
+        if self.bot_id and (stripped_id or any(u.id == self.bot_id for u in mentions)):
+            return AddressMatch(AddressReason.MENTION, text)
+
+        if self._name_prefix and self._name_prefix in content:
+            return AddressMatch(AddressReason.NAME, text)
+
+        return None
+
+    def _strip(self, content: str) -> tuple[str, bool]:
+        text = content.strip()
+        stripped_id = False
+        if self._mention_re is not None:
+            text, count = self._mention_re.subn("", text)
+            if count:
+                stripped_id = True
+                text = text.strip()
+        if self._name_prefix and text.startswith(self._name_prefix):
+            text = text[len(self._name_prefix) :].strip()
+        return text, stripped_id
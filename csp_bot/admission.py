@@ -0,0 +1,199 @@
+"""Admission control for incoming commands.
+
+Before a command runs, it must fit its user's and its channel's rate
+quotas. A command that does not fit is refused. It must then fit the
+concurrency quotas: commands already running for its user, for its
+channel and for the whole bot. A command that does not fit waits in its
+user's queue.
+
+Waiting commands are started in weighted fair order: each user has a
+virtual clock that advances by ``1 / weight`` per command started, and
+the user with the earliest clock whose next command fits goes first. A
+user with a backlog therefore gets their share of the free slots, and
+users with a single command are not stuck behind the backlog.
+"""
+
+from collections import deque
+from logging import getLogger
+
+from .bot_config import AdmissionConfig
+from .metrics import Metrics
+from .ratelimit import TokenBucket
+from .structs import BotCommand
+
+__all__ = (
+    "REFUSED",
+    "WAITING",
+    "AdmissionControl",
+)
+
+log = getLogger(__name__)
+
+WAITING = "waiting"
+REFUSED = "refused"
+
+
+def _user_key(command: BotCommand) -> tuple[str, str]:
+    source = getattr(command, "source", None)
+    return command.backend, source.id if source is not None else ""
+
+
+def _channel_key(command: BotCommand) -> tuple[str, str]:
+    return command.backend, command.channel_id
+
+
+class _UserQueue:
+    """Commands of one user waiting to run, and the user's fair-share clock."""
+
+    __slots__ = ("commands", "finish", "weight")
+
+    def __init__(self, weight: float, start: float):
+        self.commands: deque[BotCommand] = deque()
+        self.weight = weight
+        self.finish = start
+
+
+class AdmissionControl:
+    """Per-user and per-channel quotas on commands, owned by the command-handling node.
+
+    Call :meth:`offer` for each new command, then :meth:`ready` for the
+    commands that may start now, and :meth:`release` when a started
+    command has finished.
+
+    Args:
+        config: The quotas.
+        metrics: Where refused and waiting commands are recorded.
+    """
+
+    def __init__(self, config: AdmissionConfig, metrics: Metrics | None = None):
+        self.config = config
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._user_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._channel_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._reply_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._user_running: dict[tuple[str, str], int] = {}
+        self._channel_running: dict[tuple[str, str], int] = {}
+        self._running: dict[int, BotCommand] = {}
+        self._queues: dict[tuple[str, str], _UserQueue] = {}
+        self._waiting = 0
+        # Virtual time: the fair-share clock of the last command started
+        self._clock = 0.0
+        self._pruned_at = 0.0
+
+    def offer(self, command: BotCommand, now: float) -> str:
+        """Check a new command against the rate quotas and queue it to run.
+
+        Returns :data:`WAITING` once queued, or :data:`REFUSED`.
+        """
+        self._prune(now)
+        user, channel = _user_key(command), _channel_key(command)
+        user_bucket = self._bucket(self._user_buckets, user, self.config.user_per_second, self.config.user_burst, now)
+        channel_bucket = self._bucket(self._channel_buckets, channel, self.config.channel_per_second, self.config.channel_burst, now)
+        if not user_bucket.available(now):
+            return self._refuse(command, "user_rate")
+        if not channel_bucket.available(now):
+            return self._refuse(command, "channel_rate")
+        queue = self._queues.get(user)
+        if queue is not None and len(queue.commands) >= self.config.user_max_waiting:
+            return self._refuse(command, "user_waiting")
+        user_bucket.take()
+        channel_bucket.take()
+        if queue is None:
+            # A user who was not waiting starts level with the others
+            queue = self._queues[user] = _UserQueue(self.config.user_weights.get(user[1], 1.0), self._clock)
+        queue.commands.append(command)
+        self._waiting += 1
+        return WAITING
+
+    def ready(self) -> list[BotCommand]:
+        """Return the waiting commands that may start now, in fair order, and count them as running."""
+        started = []
+        while self._waiting and self._has_room():
+            user = self._next_user()
+            if user is None:
+                break
+            queue = self._queues[user]
+            command = queue.commands.popleft()
+            self._waiting -= 1
+            self._clock = queue.finish
+            queue.finish += 1.0 / max(queue.weight, 1e-6)
+            if not queue.commands:
+                del self._queues[user]
+            self._start(command)
+            started.append(command)
+        self._metrics.set("commands.admission.waiting", self._waiting)
+        return started
+
+    def release(self, command: BotCommand) -> None:
+        """Free the quota slots of a command that has finished."""
+        if self._running.pop(id(command), None) is None:
+            return
+        self._decrement(self._user_running, _user_key(command))
+        self._decrement(self._channel_running, _channel_key(command))
+
+    def reply_allowed(self, command: BotCommand, now: float) -> bool:
+        """Return whether the user of a refused command may be told to slow down now."""
+        if not self.config.slow_down_message:
+            return False
+        interval = self.config.slow_down_interval_seconds
+        bucket = self._bucket(self._reply_buckets, _user_key(command), 1.0 / interval if interval > 0 else 0.0, 1, now)
+        if not bucket.available(now):
+            return False
+        bucket.take()
+        return True
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def _refuse(self, command: BotCommand, reason: str) -> str:
+        self._metrics.incr(f"commands.refused.{reason}")
+        log.info(f"Refusing command {command.command} from {_user_key(command)} in {command.channel_id}: {reason} quota exceeded")
+        return REFUSED
+
+    def _has_room(self) -> bool:
+        return self.config.max_running <= 0 or len(self._running) < self.config.max_running
+
+    def _fits(self, command: BotCommand) -> bool:
+        config = self.config
+        if config.user_max_running > 0 and self._user_running.get(_user_key(command), 0) >= config.user_max_running:
+            return False
+        return config.channel_max_running <= 0 or self._channel_running.get(_channel_key(command), 0) < config.channel_max_running
+
+    def _next_user(self) -> tuple[str, str] | None:
+        eligible = (user for user, queue in self._queues.items() if self._fits(queue.commands[0]))
+        return min(eligible, key=lambda user: self._queues[user].finish, default=None)
+
+    def _start(self, command: BotCommand) -> None:
+        self._running[id(command)] = command
+        user, channel = _user_key(command), _channel_key(command)
+        self._user_running[user] = self._user_running.get(user, 0) + 1
+        self._channel_running[channel] = self._channel_running.get(channel, 0) + 1
+
+    @staticmethod
+    def _decrement(counts: dict[tuple[str, str], int], key: tuple[str, str]) -> None:
+        count = counts.get(key, 0) - 1
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+
+    @staticmethod
+    def _bucket(buckets: dict[tuple[str, str], TokenBucket], key: tuple[str, str], rate: float, burst: float, now: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        # An idle, full bucket is indistinguishable from a new one
+        if now - self._pruned_at < 1.0:
+            return
+        self._pruned_at = now
+        for buckets in (self._user_buckets, self._channel_buckets, self._reply_buckets):
+            for key in [key for key, bucket in buckets.items() if bucket.full(now)]:
+                del buckets[key]
@@ -11,16 +11,14 @@ Key features enabled by chatom:
 """
 
 import asyncio
-import html
 import importlib.metadata as importlib_metadata
-import re
 import threading
 import time
-from csv import reader
-from datetime import datetime, timedelta
-from io import StringIO
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from logging import getLogger
-from types import MappingProxyType
 from typing import Any, ClassVar
 
 import csp
@@ -30,6 +28,8 @@ from croniter import croniter
 from csp import Outputs, ts
 from pydantic import PrivateAttr
 
+from .addressing import AddressMatcher
+from .admission import REFUSED, AdmissionControl
 from .backends import (
     DiscordAdapter,
     SlackAdapter,
@@ -37,26 +37,45 @@ from .backends import (
     SymphonyPresenceStatus,
     TelegramAdapter,
 )
-from .bot_config import BotConfig
+from .bot_config import BackendConfig, BotConfig
+from .channels import ChannelDirectory
+from .coalesce import pop_coalesced
 from .commands import (
     BaseCommand,
     BotInfo,
+    CachePolicy,
     Command,
     CommandContext,
-    HelpCommand,
-    ScheduleCommand,
-    StatusCommand,
-    execute_command_func,
+    CommandInvoker,
+    CommandTimeout,
+    EventLoopPool,
+    ProcessCommandPool,
+    ResultCache,
+    SingleFlight,
+    StreamClosed,
+    compile_invoker,
+    configure_event_loops,
+    get_event_loop_pool,
     get_registered_commands,
 )
+from .dedup import DedupIndex, message_key
 from .gateway import GatewayChannels, GatewayModule
+from .identity import BotIdentity, IdentityRegistry
+from .messageml import extract_text
+from .metrics import Metrics
+from .outbox import Outbox
 from .persistence import InMemoryStateStore, ScheduledCommandRecord, ScheduleStore, StateStore
+from .pools import CommandPools
+from .ratelimit import OutboundRateLimiter
+from .streaming import StreamBackpressure
 from .structs import (
     Backend,
     BotCommand,
     BotMessage,
-    CommandVariant,
+    MessagePriority,
 )
+from .tokenizer import MentionIndex, Token, as_tokens, tokenize
+from .utils import message_thread_id
 
 log = getLogger(__name__)
 
@@ -80,13 +99,32 @@ class Bot(GatewayModule):
 
     _command_models: list[Any] = PrivateAttr(default_factory=list)
     _commands: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _invokers: dict[tuple[str, str], CommandInvoker] = PrivateAttr(default_factory=dict)
     _configs: dict[Backend, Any] = PrivateAttr(default_factory=dict)
     _adapters: dict[Backend, Any] = PrivateAttr(default_factory=dict)
     _connected_backends: dict[Backend, tuple[Any, asyncio.AbstractEventLoop]] = PrivateAttr(default_factory=dict)
     _schedule_store: ScheduleStore = PrivateAttr(default_factory=lambda: ScheduleStore(InMemoryStateStore()))
+    _state_store: StateStore | None = PrivateAttr(None)
+    _outbox: Outbox | None = PrivateAttr(None)
+    _acked_backends: set[Backend] = PrivateAttr(default_factory=set)
     _authorized_users: dict[Backend, set[str]] = PrivateAttr(default_factory=dict)
     _bot_user_ids: dict[Backend, str] = PrivateAttr(default_factory=dict)
     _bot_names: dict[Backend, str] = PrivateAttr(default_factory=dict)
+    _address_matchers: dict[Backend, AddressMatcher] = PrivateAttr(default_factory=dict)
+    _identities: IdentityRegistry | None = PrivateAttr(None)
+    _backend_locks: dict[Backend, threading.RLock] = PrivateAttr(default_factory=dict)
+    _metrics: Metrics = PrivateAttr(default_factory=Metrics)
+    _channel_directory: ChannelDirectory | None = PrivateAttr(None)
+    _channel_executor: ThreadPoolExecutor | None = PrivateAttr(None)
+    _channel_retries: dict[Backend, csp.GenericPushAdapter] = PrivateAttr(default_factory=dict)
+    _command_pools: CommandPools | None = PrivateAttr(None)
+    _process_pool: ProcessCommandPool | None = PrivateAttr(None)
+    _stream_backpressure: StreamBackpressure | None = PrivateAttr(None)
+    _result_caches: dict[str, ResultCache] = PrivateAttr(default_factory=dict)
+    _single_flight: SingleFlight = PrivateAttr(default_factory=SingleFlight)
+    # Per worker thread: the emit callback of the command it is running
+    _worker_state: threading.local = PrivateAttr(default_factory=threading.local)
+    _command_completions: csp.GenericPushAdapter | None = PrivateAttr(None)
     _deps: Any = PrivateAttr(default=None)
     _thread: threading.Thread | None = PrivateAttr(None)
     _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
@@ -107,6 +145,9 @@ class Bot(GatewayModule):
 
     def set_state_store(self, state_store: StateStore) -> None:
         """Inject the state store used for bot runtime persistence."""
+        self._state_store = state_store
+        self._outbox = None
+        self._result_caches = {}
         self.set_schedule_store(ScheduleStore(state_store))
 
     def set_schedule_store(self, schedule_store: ScheduleStore) -> None:
@@ -165,17 +206,37 @@ class Bot(GatewayModule):
             self._configs["telegram"] = self.config.telegram
             self._adapters["telegram"] = TelegramAdapter(self.config.telegram.config)
 
-        # Fetch bot info for all backends at startup
-        for backend in self._adapters:
-            log.info(f"Fetching bot info for {backend}...")
-            self._fetch_bot_info(backend)
+        # Fetch bot info for all backends concurrently, then keep it fresh in
+        # the background. Message handling never waits on these fetches.
+        identities = self._get_identity_registry()
+        log.info(f"Fetching bot info for {', '.join(self._adapters)}...")
+        identities.refresh_all(self._adapters, timeout=self.config.bot_info_retry_seconds or None)
+        identities.start(self._adapters, self.config.bot_info_retry_seconds, self.config.bot_info_refresh_seconds)
+
+        # Warm the channel directory with subscribed channels in the background
+        for backend, config in self._configs.items():
+            for identifier in config.channels or ():
+                self._submit_channel_lookup(backend, identifier)
 
         # Inject backends into AgentCommand subclasses
         self._inject_backends_into_agent_commands()
 
-        # Subscribe to messages from all adapters
+        # Async commands run on a pool of event loops
+        loops = self.config.async_loops
+        configure_event_loops(
+            EventLoopPool(loops.size, loops.uvloop, loops.shard_by, loops.slow_callback_seconds, metrics=self._metrics),
+        )
+
+        # Fork the worker processes before the first heavy command needs them
+        if any(getattr(runner, "execution", "") == "process" for runner in self._commands.values()):
+            self._get_process_pool().start()
+
+        # Subscribe to messages from all adapters. Each backend gets its own
+        # ingestion lane; only the resulting commands are merged.
         # chatom provides unified Message type across all backends
-        messages_in = csp.null_ts(Message)
+        messages_in = []
+        lane_commands = []
+        lane_unauthorized = []
         for backend, adapter in self._adapters.items():
             config = self._configs[backend]
             raw_msgs = adapter.subscribe(
@@ -187,24 +248,24 @@ class Bot(GatewayModule):
             unrolled = csp.unroll(raw_msgs)
             # Tag messages with their backend
             tagged = self._tag_message_backend(backend, unrolled)
-            messages_in = csp.flatten([messages_in, tagged])
+            messages_in.append(tagged)
+            commands, unauthorized = self._ingestion_lane(backend, tagged)
+            lane_commands.append(commands)
+            lane_unauthorized.append(unauthorized)
 
         # Set input channel
-        channels.set_channel(GatewayChannels.messages_in, messages_in)
+        channels.set_channel(GatewayChannels.messages_in, csp.flatten(messages_in) if messages_in else csp.null_ts(Message))
 
-        # Process messages to extract commands
-        command_outputs = self._process_incoming_messages(messages_in)
-        bot_commands = csp.unroll(command_outputs.bot_commands)
+        # Merge commands from all lanes
+        bot_commands = csp.flatten(lane_commands) if lane_commands else csp.null_ts(BotCommand)
         channels.set_channel(GatewayChannels.commands, bot_commands)
 
         # Handle commands and generate responses
-        response_outputs = self._handle_commands(channels.get_channel(GatewayChannels.commands))
-        messages_out = csp.flatten(
-            [
-                csp.unroll(response_outputs.messages),
-                command_outputs.unauthorized_message,
-            ]
-        )
+        self._command_completions = csp.GenericPushAdapter(object, name="command_completions")
+        # Outbox resends re-enter the rate limiter in _handle_commands
+        resends = csp.feedback([Message])
+        response_outputs = self._handle_commands(channels.get_channel(GatewayChannels.commands), self._command_completions.out(), resends.out())
+        messages_out = csp.flatten([csp.unroll(response_outputs.messages), *lane_unauthorized])
 
         channels.set_channel(GatewayChannels.messages_out, messages_out)
 
@@ -214,9 +275,21 @@ class Bot(GatewayModule):
 
         # Publish responses to adapters
         # chatom handles conversion to backend-specific formats
+        deliveries = messages_out
+        if self._get_outbox() is not None:
+            # Keep outgoing messages until the adapters report them as sent
+            for backend, adapter in self._adapters.items():
+                if hasattr(adapter, "set_message_callback"):
+                    adapter.set_message_callback(self._on_message_sent)
+                    self._acked_backends.add(backend)
+            delivery = self._deliver_outbound(messages_out)
+            resends.bind(delivery.resend)
+            deliveries = csp.unroll(delivery.sent)
+        else:
+            resends.bind(csp.null_ts([Message]))
+        routes = self._route_outbound(list(self._adapters), deliveries)
         for backend, adapter in self._adapters.items():
-            backend_messages = self._filter_messages_for_backend(backend, messages_out)
-            adapter.publish(backend_messages)
+            adapter.publish(routes.routed[backend])
 
         # Set up presence updates for Symphony
         if self.config.symphony and self.config.symphony.set_presence_seconds:
@@ -239,6 +312,51 @@ class Bot(GatewayModule):
                     )
                     self._thread.start()
 
+        # Stop the worker pools and background threads with the graph
+        self._shutdown_on_stop()
+
+    def shutdown(self) -> None:
+        """Stop the command pools, event loops, worker processes and background threads.
+
+        Runs when the graph stops and when the gateway shuts the module down;
+        pools are started again by the next ``connect``.
+        """
+        if self._identities is not None:
+            self._identities.stop()
+        pools, self._command_pools = self._command_pools, None
+        if pools is not None:
+            pools.shutdown()
+        channel_executor, self._channel_executor = self._channel_executor, None
+        if channel_executor is not None:
+            channel_executor.shutdown(wait=False, cancel_futures=True)
+        get_event_loop_pool().close()
+        process_pool, self._process_pool = self._process_pool, None
+        if process_pool is not None:
+            process_pool.shutdown()
+
+    @csp.node
+    def _shutdown_on_stop(self):
+        with csp.stop():
+            self.shutdown()
+
+    def _ingestion_lane(self, backend: str, messages: ts[Message]) -> tuple[ts[BotCommand], ts[Message]]:
+        """Wire one backend's prefilter, parse, authorize and extract nodes.
+
+        Lanes share no nodes, so a burst on one backend does not sit behind
+        another backend's messages in a shared node, and a lane can later be
+        moved to its own thread or process. Messages whose /channel or /room
+        target had to be resolved remotely come back through the lane's retry
+        adapter once the lookup finishes.
+
+        Returns:
+            Tuple of (commands, unauthorized replies) for the backend.
+        """
+        retries = self._channel_retries[backend] = csp.GenericPushAdapter(Message, name=f"channel_retries_{backend}")
+        # Drop chatter that cannot be addressed to the bot before full parsing
+        candidates = self._prefilter_messages(backend, messages)
+        outputs = self._process_incoming_messages(candidates, retries.out())
+        return csp.unroll(outputs.bot_commands), outputs.unauthorized_message
+
     @csp.node
     def _tag_message_backend(self, backend: str, msg: ts[Message]) -> ts[Message]:
         """Tag a message with its backend."""
@@ -252,13 +370,116 @@ class Bot(GatewayModule):
             return msg
 
     @csp.node
-    def _filter_messages_for_backend(self, backend: str, msg: ts[Message]) -> ts[Message]:
-        """Filter messages for a specific backend."""
+    def _prefilter_messages(self, backend: str, msg: ts[Message]) -> ts[Message]:
+        """Pass through only messages that may be addressed to the bot."""
+        if csp.ticked(msg) and self._is_candidate_message(msg, backend):
+            return msg
+
+    def _is_candidate_message(self, msg: Message, backend: str) -> bool:
+        """Cheaply check whether a message could be addressed to the bot.
+
+        Uses substring and ID checks only, so the full content parsing in
+        _is_message_to_bot is skipped for ordinary channel chatter.
+        """
+        matcher = self._address_matcher(backend)
+        if matcher.may_address(msg.content or "", msg.mentions or (), getattr(msg, "data", None)):
+            return True
+        if self._is_direct_message(msg, backend):
+            return True
+        ref_id = self._message_reference_id(msg)
+        return bool(ref_id) and self._agent_session_for_reference(ref_id) is not None
+
+    def _get_outbox(self) -> Outbox | None:
+        """Return the outbox, or None when durable delivery is not configured."""
+        config = self.config.outbox
+        if config is None:
+            return None
+        if self._outbox is None:
+            self._outbox = Outbox(
+                self._state_store if self._state_store is not None else InMemoryStateStore(),
+                ack_seconds=config.ack_seconds,
+                retry_seconds=config.retry_seconds,
+                max_retry_seconds=config.max_retry_seconds,
+                max_attempts=config.max_attempts,
+                metrics=self._metrics,
+            )
+        return self._outbox
+
+    def _on_message_sent(self, msg: Message, sent: Message | None = None) -> None:
+        """Adapter callback for a message the platform accepted. Runs on the writer thread."""
+        if self._outbox is not None:
+            self._outbox.ack(msg)
+
+    @csp.node
+    def _deliver_outbound(self, msg: ts[Message]) -> csp.Outputs(sent=ts[[Message]], resend=ts[[Message]]):
+        """Record outgoing messages in the outbox and resend unacknowledged ones.
+
+        Only messages for backends that acknowledge sends are recorded; they
+        tick on ``sent``. Unacknowledged and replayed messages tick on
+        ``resend``, which is fed back into ``_handle_commands`` so that they
+        are rate limited like any other message, and come back here once the
+        limiter releases them. The retry alarm is only scheduled while
+        messages are unacknowledged.
+        """
+        with csp.alarms():
+            a_retry: ts[bool] = csp.alarm(bool)
+
+        with csp.state():
+            s_outbox = self._get_outbox()
+            s_retry_at: datetime | None = None
+            s_pending: list[Message] = []
+
+        with csp.start():
+            # Messages left over from a previous run
+            s_pending = s_outbox.replay(self._utc(csp.now()))
+            if s_pending:
+                csp.schedule_alarm(a_retry, timedelta(0), True)
+
+        now = self._utc(csp.now())
+        if csp.ticked(a_retry):
+            resend = s_pending + s_outbox.due(now)
+            s_pending = []
+            if s_retry_at is not None and s_retry_at <= now:
+                s_retry_at = None
+            if resend:
+                csp.output(resend=resend)
         if csp.ticked(msg):
             metadata = msg.metadata or {}
-            msg_backend = metadata.get("backend", "")
-            if msg_backend == backend:
-                return msg
+            # Resent messages are already recorded
+            if metadata.get("backend") in self._acked_backends and not metadata.get("outbox_id"):
+                s_outbox.add(msg, now)
+            csp.output(sent=[msg])
+
+        retry_at = s_outbox.next_retry_at()
+        if retry_at is not None and (s_retry_at is None or retry_at < s_retry_at):
+            s_retry_at = retry_at
+            csp.schedule_alarm(a_retry, self._datetime_for_now(retry_at, csp.now()), True)
+
+    @staticmethod
+    def _utc(value: datetime) -> datetime:
+        # csp.now() is naive UTC; the outbox persists aware datetimes
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+    @csp.node
+    def _route_outbound(self, backends: [str], msg: ts[Message]) -> csp.Outputs(
+        routed=csp.OutputBasket(dict[str, ts[Message]], shape="backends"), unroutable=ts[Message]
+    ):
+        """Route each outgoing message to its backend's publish edge.
+
+        Messages are routed on metadata["backend"]; those naming a backend
+        that is not connected tick on ``unroutable`` and are counted.
+        """
+        with csp.state():
+            s_backends = set(backends)
+
+        if csp.ticked(msg):
+            backend = (msg.metadata or {}).get("backend", "")
+            if backend in s_backends:
+                csp.output(routed={backend: msg})
+            else:
+                self._metrics.incr("outbound.unroutable")
+                log.warning(f"Dropping outgoing message {msg.id!r} for unknown backend {backend!r}")
+                csp.output(unroutable=msg)
 
     def _update_user_access(self, backend: str) -> None:
         """Update authorized users from access channels."""
@@ -303,6 +524,9 @@ class Bot(GatewayModule):
             # pydantic-ai / chatom[agent] not installed — skip silently
             return
 
+        # The LLM calls are bounded by the same pool as the agent commands
+        AgentCommand.set_workers(self._get_command_pools().get(AgentCommand.pool()).workers)
+
         backends = {}
         loops = {}
         for name in self._adapters:
@@ -358,6 +582,12 @@ class Bot(GatewayModule):
         if backend in self._connected_backends:
             return self._connected_backends[backend]
 
+        with self._backend_lock(backend):
+            if backend in self._connected_backends:
+                return self._connected_backends[backend]
+            return self._connect_backend(backend)
+
+    def _connect_backend(self, backend: str) -> tuple[Any, asyncio.AbstractEventLoop] | None:
         adapter = self._adapters.get(backend)
         if not adapter:
             log.warning(f"No adapter for backend: {backend}")
@@ -420,11 +650,83 @@ class Bot(GatewayModule):
             return channel
 
         try:
-            return loop.run_until_complete(_fetch())
+            with self._backend_lock(backend):
+                return loop.run_until_complete(_fetch())
         except Exception:
             log.exception(f"Error resolving channel: {channel_identifier}")
             return None
 
+    def _backend_lock(self, backend: str) -> threading.RLock:
+        """Return the lock serializing use of a backend's connection and event loop."""
+        with self._lock:
+            lock = self._backend_locks.get(backend)
+            if lock is None:
+                lock = self._backend_locks[backend] = threading.RLock()
+            return lock
+
+    def _get_channel_directory(self) -> ChannelDirectory:
+        """Return the channel directory, creating it from config on first use."""
+        if self._channel_directory is None:
+            self._channel_directory = ChannelDirectory(
+                ttl=self.config.channel_cache_seconds,
+                negative_ttl=self.config.channel_cache_negative_seconds,
+            )
+        return self._channel_directory
+
+    def _lookup_channel(self, channel_identifier: str, backend: str, msg: Message, defer: bool = True) -> tuple[bool, Channel | None]:
+        """Look up a /channel or /room target without blocking the graph.
+
+        Fresh entries are used as-is. An expired entry for a known channel is
+        still used while it is refreshed in the background. On a miss the
+        lookup runs in the background and ``msg`` is re-injected through the
+        retry adapter when it completes.
+
+        Args:
+            channel_identifier: Channel name or ID.
+            backend: The backend platform.
+            msg: The message carrying the command, re-injected after a miss.
+            defer: Whether a miss may be deferred. Re-injected messages use
+                whatever the lookup stored, even if it has already expired.
+
+        Returns:
+            Tuple of (ready, channel). ``ready`` is False if the message was
+            deferred; ``channel`` is None if the target could not be resolved.
+        """
+        directory = self._get_channel_directory()
+        entry = directory.get(backend, channel_identifier)
+        if entry is not None:
+            if not defer or directory.is_fresh(entry):
+                return True, entry.channel
+            if entry.channel is not None:
+                self._submit_channel_lookup(backend, channel_identifier)
+                return True, entry.channel
+
+        retries = self._channel_retries.get(backend)
+        if defer and retries is not None and retries.started() and not retries.stopped():
+            self._submit_channel_lookup(backend, channel_identifier, retry=msg)
+            return False, None
+
+        # No running graph to re-inject into; resolve inline
+        channel = self._resolve_channel(channel_identifier, backend)
+        directory.put(backend, channel_identifier, channel)
+        return True, channel
+
+    def _submit_channel_lookup(self, backend: str, channel_identifier: str, retry: Message | None = None) -> None:
+        """Resolve a channel on the background worker, at most once at a time per identifier."""
+        if not self._get_channel_directory().begin(backend, channel_identifier, waiter=retry):
+            return
+        if self._channel_executor is None:
+            self._channel_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csp-bot-channels")
+        self._channel_executor.submit(self._complete_channel_lookup, backend, channel_identifier)
+
+    def _complete_channel_lookup(self, backend: str, channel_identifier: str) -> None:
+        """Resolve a channel, cache the result and re-inject deferred messages."""
+        channel = self._resolve_channel(channel_identifier, backend)
+        for waiter in self._get_channel_directory().put(backend, channel_identifier, channel):
+            retries = self._channel_retries.get(backend)
+            if retries is None or not retries.push_tick(waiter):
+                log.warning(f"Dropping deferred message for channel '{channel_identifier}': graph is not running")
+
     def load_commands(self, command_models: list[Any]) -> None:
         """Load command handlers from command models and decorator registry.
 
@@ -469,6 +771,26 @@ class Bot(GatewayModule):
             log.info(f"Registered decorated command: /{command_name}")
             self._commands[command_name] = entry
 
+        self._compile_invokers(active_backends)
+
+    def _compile_invokers(self, backends: set[str]) -> None:
+        """Build the (backend, command) dispatch table for the given backends."""
+        self._invokers = {(backend, name): compile_invoker(name, runner, backend) for backend in backends for name, runner in self._commands.items()}
+
+    def _invoker(self, backend: str, command_name: str) -> CommandInvoker | None:
+        """Return the compiled invoker for a command, or None if it is not registered.
+
+        Invokers are compiled in ``load_commands``; a command registered or
+        replaced afterwards is compiled here on first use.
+        """
+        runner = self._commands.get(command_name)
+        if runner is None:
+            return None
+        invoker = self._invokers.get((backend, command_name))
+        if invoker is None or invoker.runner is not runner:
+            invoker = self._invokers[(backend, command_name)] = compile_invoker(command_name, runner, backend)
+        return invoker
+
     def _load_entrypoint_commands(self) -> None:
         """Load command plugins from Python entry points.
 
@@ -574,23 +896,33 @@ class Bot(GatewayModule):
         )
 
     @csp.node
-    def _process_incoming_messages(self, msg: ts[Message]) -> Outputs(bot_commands=ts[[BotCommand]], unauthorized_message=ts[Message]):
+    def _process_incoming_messages(self, msg: ts[Message], retry: ts[Message]) -> Outputs(
+        bot_commands=ts[[BotCommand]], unauthorized_message=ts[Message]
+    ):
         """Process incoming messages to extract bot commands.
 
-        Uses chatom's unified Message type and mention parsing.
+        Uses chatom's unified Message type and mention parsing. ``retry``
+        carries messages deferred while their target channel was resolved.
         """
+        pending = []
         if csp.ticked(msg):
+            pending.append((msg, True))
+        if csp.ticked(retry):
+            pending.append((retry, False))
+
+        bot_commands = []
+        for message, defer in pending:
             try:
-                backend = msg.metadata.get("backend", "")
-                log.info(f"Processing incoming message from {backend}: content={msg.content[:100] if msg.content else ''!r}")
-                is_to_bot, channel_id, text, mentions = self._is_message_to_bot(msg, backend)
-                log.info(f"is_to_bot={is_to_bot}, channel_id={channel_id}")
+                backend = message.metadata.get("backend", "")
+                log.debug(f"Processing incoming message from {backend}: content={message.content[:100] if message.content else ''!r}")
+                is_to_bot, channel_id, text, mentions = self._is_message_to_bot(message, backend)
+                log.debug(f"is_to_bot={is_to_bot}, channel_id={channel_id}")
 
                 if not is_to_bot:
-                    log.info("Ignoring message (not to bot)")
-                    return
+                    log.debug("Ignoring message (not to bot)")
+                    continue
 
-                if not self._is_authorized(msg, backend):
+                if not self._is_authorized(message, backend):
                     config = self._configs.get(backend)
                     if config and config.unauthorized_msg:
                         response = self._create_response_message(
@@ -599,20 +931,33 @@ class Bot(GatewayModule):
                             backend=backend,
                         )
                         csp.output(unauthorized_message=response)
-                    return
+                    continue
 
-                commands = self._extract_commands(msg, backend, channel_id, text, mentions)
+                commands = self._extract_commands(message, backend, channel_id, text, mentions, defer_channel=defer)
                 if commands:
-                    csp.output(bot_commands=commands if isinstance(commands, list) else [commands])
+                    bot_commands.extend(commands if isinstance(commands, list) else [commands])
 
             except Exception:
                 log.exception("Error processing message")
 
+        if bot_commands:
+            csp.output(bot_commands=bot_commands)
+
     @csp.node
-    def _handle_commands(self, cmd: ts[BotCommand]) -> Outputs(messages=ts[[Message]], commands=ts[[BotCommand]]):
+    def _handle_commands(self, cmd: ts[BotCommand], completed: ts[object], resend: ts[[Message]]) -> Outputs(
+        messages=ts[[Message]], commands=ts[[BotCommand]]
+    ):
         """Handle bot commands and generate responses.
 
-        Supports delayed and scheduled commands via alarms.
+        Supports delayed and scheduled commands via alarms. New commands
+        pass admission control before they run; refused ones get a
+        slow-down reply. Commands are executed on the worker pool they
+        declare when the graph is running, and their results come back on
+        ``completed`` as ``(command, result, finished)``; otherwise they
+        are executed inline. Responses, and messages the outbox sends
+        again on ``resend``, are rate limited per channel and per backend;
+        the flush alarm is only scheduled while some channel is being
+        throttled.
         """
         with csp.alarms():
             a_scheduled: ts[BotCommand] = csp.alarm(BotCommand)
@@ -620,11 +965,18 @@ class Bot(GatewayModule):
 
         with csp.state():
             s_buffer: list[Message] = []
-            s_buffer_last: list[Message] = []
+            s_dedup = DedupIndex(self.config.dedup_max_entries)
             s_to_process: list[BotCommand] = []
+            s_admission = AdmissionControl(self.config.admission, self._metrics)
+            s_limiter = OutboundRateLimiter(
+                self._rate_limits,
+                coalesce=pop_coalesced if self.config.coalesce_messages else None,
+                max_queued=self.config.outbound_max_queued,
+                metrics=self._metrics,
+            )
+            s_flush_at: datetime | None = None
 
         with csp.start():
-            csp.schedule_alarm(a_ratelimit, timedelta(seconds=self.config.ratelimit_seconds), True)
             now = csp.now()
             for record in self._restore_scheduled_commands(now):
                 next_run_at = self._datetime_for_now(record.next_run_at, now)
@@ -662,49 +1014,201 @@ class Bot(GatewayModule):
                 if next_time >= now:
                     self._store_scheduled_command(cmd, next_time)
                     csp.schedule_alarm(a_scheduled, next_time, cmd)
-            else:
-                s_to_process.append(cmd)
-
-        # Process commands
-        if csp.ticked(cmd) or csp.ticked(a_scheduled):
-            next_cycle_commands = []
-
+            elif s_admission.offer(cmd, now.timestamp()) == REFUSED and s_admission.reply_allowed(cmd, now.timestamp()):
+                s_buffer.append(self._slow_down_response(cmd))
+
+        next_cycle_commands = []
+        if csp.ticked(completed):
+            command, result, finished = completed
+            self._collect_command_result(command, result, s_buffer, next_cycle_commands)
+            if finished:
+                s_admission.release(command)
+
+        # Dispatch commands; results are collected here or when they complete
+        s_to_process.extend(s_admission.ready())
+        while s_to_process:
             for command in s_to_process:
-                log.debug(f"Executing command: {command.command}")
-                result = self._execute_command(command)
-
-                log.debug(f"Command {command.command} execution returned: {result}")
-                if result:
-                    results = result if isinstance(result, list) else [result]
-                    for item in results:
-                        log.debug(f"Processing result item type: {type(item).__name__}, isinstance(Message): {isinstance(item, Message)}")
-                        if isinstance(item, Message):
-                            log.debug(f"Adding message to buffer: {item.content[:100] if item.content else 'empty'}...")
-                            s_buffer.append(item)
-                            # Track agent session responses for reply continuity
-                            self._track_agent_session_response(item, command)
-                        elif isinstance(item, BotCommand):
-                            next_cycle_commands.append(item)
-                else:
-                    log.debug(f"Command {command.command} returned no result")
-
-            if next_cycle_commands:
-                csp.output(commands=next_cycle_commands)
+                if not self._submit_command(command):
+                    self._collect_command_result(command, self._execute_command(command), s_buffer, next_cycle_commands)
+                    s_admission.release(command)
+            # Commands run inline free their slots at once
+            s_to_process = s_admission.ready()
 
-            s_to_process = []
+        if next_cycle_commands:
+            csp.output(commands=next_cycle_commands)
 
         # Rate-limited output
-        if csp.ticked(a_ratelimit):
+        if csp.ticked(a_ratelimit) and s_flush_at is not None and csp.now() >= s_flush_at:
+            s_flush_at = None
+        if s_buffer or csp.ticked(a_ratelimit, resend):
+            now = csp.now()
             if s_buffer:
-                # Deduplicate by message ID (Message is not hashable)
-                seen_ids = {m.id for m in s_buffer_last if m.id}
-                output = [m for m in s_buffer if m.id not in seen_ids]
-                if output:
-                    csp.output(messages=output)
-                s_buffer_last = s_buffer.copy()
+                s_limiter.push(m for m in s_buffer if not self._is_duplicate(s_dedup, m, now.timestamp()))
                 s_buffer = []
+            if csp.ticked(resend):
+                # Resends repeat a message ID on purpose; only the limiter applies
+                s_limiter.push(resend)
+            ready = s_limiter.drain(now.timestamp())
+            if ready:
+                csp.output(messages=ready)
+
+            # Wake up only when a throttled channel can send again
+            wait = s_limiter.next_wakeup(now.timestamp())
+            if wait is not None:
+                flush_at = now + timedelta(seconds=wait)
+                if s_flush_at is None or flush_at < s_flush_at:
+                    s_flush_at = flush_at
+                    csp.schedule_alarm(a_ratelimit, flush_at, True)
+            self._metrics.set("outbound.queued", len(s_limiter))
+            if self._stream_backpressure is not None:
+                self._stream_backpressure.update(s_limiter.queued)
+
+    def _submit_command(self, command: BotCommand) -> bool:
+        """Execute a command on its worker pool, returning False if it must run inline.
+
+        The result is pushed back into the graph through the completions
+        adapter, which only accepts ticks while the graph is running. When
+        the pool is full the command is not executed; depending on the
+        pool's rejection policy the user is told the bot is busy.
+        """
+        completions = self._command_completions
+        if completions is None or not completions.started():
+            return False
+        invoker = self._invoker(command.backend, command.command)
+        pool = self._get_command_pools().get(invoker.pool if invoker is not None else "")
+        if pool.workers <= 0:
+            return False
+        log.debug(f"Submitting command {command.command} to pool {pool.name}")
+        if not pool.submit(self._run_command, command, completions):
+            self._metrics.incr(f"commands.rejected.{pool.name}")
+            log.warning(f"Rejecting command {command.command}: pool {pool.name} is full")
+            completions.push_tick((command, self._busy_response(command) if pool.rejection == "reject" else None, True))
+        self._metrics.set(f"commands.pending.{pool.name}", pool.pending)
+        return True
+
+    def _get_command_pools(self) -> CommandPools:
+        if self._command_pools is None:
+            self._command_pools = CommandPools(self.config.command_pools, self.config.command_workers)
+        return self._command_pools
+
+    def _command_timeout(self, command_name: str, declared: float | None) -> float:
+        """Return how long a command may run: configured, else declared, else the default."""
+        timeout = self.config.command_timeouts.get(command_name)
+        if timeout is None:
+            timeout = declared if declared is not None else self.config.command_timeout_seconds
+        return timeout
+
+    def _stream_emitter(self) -> Callable[[Any], None] | None:
+        """Return the emit callback for the command running on this thread, or None to collect output."""
+        if self.config.stream_max_queued <= 0:
+            return None
+        return getattr(self._worker_state, "emit", None)
+
+    def _emit_streamed(self, command: BotCommand, completions: csp.GenericPushAdapter, item: Any) -> None:
+        """Push one streamed item into the graph, waiting while its channel is backlogged."""
+        if item is None:
+            return
+        if isinstance(item, Message):
+            self._get_stream_backpressure().acquire(OutboundRateLimiter.key(item), completions.stopped)
+        if not completions.push_tick((command, [item], False)):
+            raise StreamClosed(f"Graph stopped while streaming {command.command}")
+
+    def _get_stream_backpressure(self) -> StreamBackpressure:
+        if self._stream_backpressure is None:
+            self._stream_backpressure = StreamBackpressure(self.config.stream_max_queued)
+        return self._stream_backpressure
+
+    def _get_process_pool(self) -> ProcessCommandPool:
+        if self._process_pool is None:
+            self._process_pool = ProcessCommandPool(self.config.command_processes, self.config.command_process_shared_memory_bytes)
+        return self._process_pool
+
+    def _result_cache(self, command_name: str, policy: CachePolicy) -> ResultCache:
+        """Return the result cache of a command declared with ``policy``."""
+        cache = self._result_caches.get(command_name)
+        if cache is None or cache.policy is not policy:
+            cache = self._result_caches[command_name] = ResultCache(command_name, policy, self._state_store)
+        return cache
+
+    def _busy_response(self, command: BotCommand) -> Message:
+        """Reply to a command that was rejected because its pool is full."""
+        return self._notice_response(command, f"/{command.command} is busy right now, please try again shortly.")
+
+    def _slow_down_response(self, command: BotCommand) -> Message:
+        """Reply to a command that was refused by admission control."""
+        return self._notice_response(command, self.config.admission.slow_down_message)
+
+    def _notice_response(self, command: BotCommand, content: str) -> Message:
+        """Reply to the user of a command that was not run, in its thread."""
+        message = getattr(command, "message", None)
+        source = getattr(command, "source", None)
+        return self._create_response_message(
+            content,
+            command.channel_id,
+            command.backend,
+            thread_id=message_thread_id(message) if message else "",
+            mentions=[source] if source else None,
+        )
+
+    def _run_command(self, command: BotCommand, completions: csp.GenericPushAdapter) -> None:
+        """Worker-thread body: execute a command and push its result into the graph.
+
+        Generator commands stream their items through ``_emit_streamed``
+        while they run; the final result then holds anything not streamed.
+        """
+        self._worker_state.emit = partial(self._emit_streamed, command, completions)
+        try:
+            result = self._execute_command(command)
+        finally:
+            self._worker_state.emit = None
+        if not completions.push_tick((command, result, True)):
+            log.warning(f"Dropping result of {command.command}: the graph has stopped")
 
-            csp.schedule_alarm(a_ratelimit, timedelta(seconds=self.config.ratelimit_seconds), True)
+    def _collect_command_result(
+        self,
+        command: BotCommand,
+        result: Message | list[Message] | BotCommand | list[BotCommand] | None,
+        messages: list[Message],
+        commands: list[BotCommand],
+    ) -> None:
+        """Sort a command's result into outgoing messages and follow-up commands."""
+        log.debug(f"Command {command.command} execution returned: {result}")
+        if not result:
+            log.debug(f"Command {command.command} returned no result")
+            return
+        results = result if isinstance(result, list) else [result]
+        for item in results:
+            log.debug(f"Processing result item type: {type(item).__name__}, isinstance(Message): {isinstance(item, Message)}")
+            if isinstance(item, Message):
+                log.debug(f"Adding message to buffer: {item.content[:100] if item.content else 'empty'}...")
+                if command.schedule and "priority" not in (item.metadata or {}):
+                    # Recurring schedules are broadcasts, not replies
+                    item.metadata = {**(item.metadata or {}), "priority": MessagePriority.BULK.name}
+                messages.append(item)
+                # Track agent session responses for reply continuity
+                self._track_agent_session_response(item, command)
+            elif isinstance(item, BotCommand):
+                commands.append(item)
+
+    def _is_duplicate(self, index: DedupIndex, msg: Message, now: float) -> bool:
+        """Check an outgoing message against recently sent ones, counting duplicates."""
+        key = message_key(msg)
+        ttl = self.config.dedup_seconds if key[0] == "id" else self.config.dedup_content_seconds
+        if ttl <= 0 or not index.seen(key, now, ttl):
+            return False
+        self._metrics.incr("outbound.duplicates_suppressed")
+        log.debug(f"Suppressing duplicate outgoing message {msg.id or (msg.content or '')[:50]!r}")
+        return True
+
+    def _rate_limits(self, backend: str) -> tuple[float, float, float, float]:
+        """Return (channel rate, channel burst, backend rate, backend burst) for a backend."""
+        config = self._configs.get(backend)
+        if isinstance(config, BackendConfig) and "rate_limit" in config.model_fields_set:
+            limits = config.rate_limit
+            return limits.channel_per_second, limits.channel_burst, limits.backend_per_second, limits.backend_burst
+        # Without an explicit rate_limit, ratelimit_seconds keeps its meaning
+        seconds = self.config.ratelimit_seconds
+        return (1.0 / seconds if seconds > 0 else 0.0), 1, 0.0, 1
 
     def _is_message_to_bot(self, msg: Message, backend: str) -> tuple[bool, str, str, list[User]]:
         """Check if a message is directed at the bot.
@@ -720,6 +1224,7 @@ class Bot(GatewayModule):
 
         # Get content and channel - extract plain text for Symphony
         raw_content = msg.content or ""
+        parsed = None
         if backend == "symphony":
             # Symphony sends HTML/MessageML - extract plain text
             from chatom.symphony import SymphonyMessage
@@ -727,13 +1232,9 @@ class Bot(GatewayModule):
             if isinstance(msg, SymphonyMessage):
                 content = msg._parse_symphony_content(raw_content)
             else:
-                # Manual HTML stripping for non-SymphonyMessage
-                content = raw_content
-                content = re.sub(r"<br\s*/?>\s*", "\n", content, flags=re.IGNORECASE)
-                content = re.sub(r"</p>\s*", "\n", content, flags=re.IGNORECASE)
-                content = re.sub(r"</div>\s*", "\n", content, flags=re.IGNORECASE)
-                content = re.sub(r"<[^>]+>", "", content)
-                content = html.unescape(content).strip()
+                # Single pass over the markup for both text and <mention/> tags
+                parsed = extract_text(raw_content)
+                content = parsed.text
         else:
             content = raw_content
         metadata = msg.metadata or {}
@@ -752,42 +1253,34 @@ class Bot(GatewayModule):
                 for uid in mention_ids:
                     mentioned_users.append(User(id=str(uid), name=""))
 
-        # If still no mentions, try parsing from raw content (before stripping)
-        if not mentioned_users:
+        # If still no mentions, use the mentions found while extracting text
+        if not mentioned_users and parsed is not None:
+            mentioned_users = [User(id=uid, name="") for uid in parsed.mention_ids]
+
+        # Otherwise try parsing from raw content (before stripping)
+        elif not mentioned_users:
             mention_matches = parse_mentions(raw_content, backend)
             for match in mention_matches:
                 user = User(id=match.user_id, name="")
                 mentioned_users.append(user)
 
-        # Get bot ID and name from backend (auto-detected)
-        bot_id = self._get_bot_id(backend)
-        bot_name = self._get_bot_name(backend)
+        # Bot ID and name are compiled into a per-backend matcher
+        matcher = self._address_matcher(backend)
 
         # Debug logging
-        log.info(
-            f"[{backend}] _is_message_to_bot: bot_id={bot_id}, mentions={[u.id for u in mentioned_users]}, msg.data={getattr(msg, 'data', None)}"
+        log.debug(
+            f"[{backend}] _is_message_to_bot: bot_id={matcher.bot_id}, mentions={[u.id for u in mentioned_users]}, msg.data={getattr(msg, 'data', None)}"
         )
 
-        # Check if this is a DM (always to bot)
+        # DMs are always to the bot, as long as the author is not the bot
         is_dm = self._is_direct_message(msg, backend)
         log.debug(f"[{backend}] is_dm={is_dm}")
 
-        if is_dm:
-            # In DMs, accept if author is not the bot
-            author_id = msg.author.id if msg.author else msg.author_id
-            if author_id and author_id != bot_id:
-                log.debug(f"[{backend}] Accepting DM from {author_id}")
-                return True, channel_id, content, mentioned_users
-
-        # Check if bot is mentioned by ID
-        if bot_id and any(u.id == bot_id for u in mentioned_users):
-            log.debug(f"[{backend}] Bot mentioned by ID")
-            return True, channel_id, content, mentioned_users
-
-        # Check for bot name mention in text
-        if bot_name and f"@{bot_name}" in content:
-            log.debug(f"[{backend}] Bot mentioned by name")
-            return True, channel_id, content, mentioned_users
+        author_id = msg.author.id if msg.author else msg.author_id
+        match = matcher.match(content, mentioned_users, is_dm=is_dm, author_id=author_id)
+        if match is not None:
+            log.debug(f"[{backend}] Message to bot ({match.reason})")
+            return True, channel_id, match.text, mentioned_users
 
         log.debug(f"[{backend}] Message not to bot")
         return False, "", content, mentioned_users
@@ -832,58 +1325,61 @@ class Bot(GatewayModule):
 
         return False
 
-    def _fetch_bot_info(self, backend: str) -> None:
-        """Fetch bot info from the backend API and cache it.
+    def _address_matcher(self, backend: str) -> AddressMatcher:
+        """Return the compiled address matcher for a backend.
 
-        Uses the shared connected backend for the platform.
+        The matcher is rebuilt only when the cached bot identity changes.
+        """
+        identity = self._bot_identity(backend)
+        matcher = self._address_matchers.get(backend)
+        if matcher is None or not matcher.is_identity(identity.id, identity.name):
+            matcher = AddressMatcher(backend, identity.id, identity.name)
+            self._address_matchers[backend] = matcher
+        return matcher
+
+    def _get_identity_registry(self) -> IdentityRegistry:
+        """Return the bot identity registry, creating it on first use."""
+        if self._identities is None:
+            self._identities = IdentityRegistry(self._fetch_bot_user, self._bot_user_ids, self._bot_names, self._metrics)
+        return self._identities
+
+    def _fetch_bot_user(self, backend: str) -> User | None:
+        """Fetch the bot's own user from the backend API. Blocking.
+
+        Only called from the identity registry, never on the engine thread.
         """
-        if backend in self._bot_user_ids and backend in self._bot_names:
-            return  # Already cached
-
         result = self._ensure_backend_connected(backend)
         if not result:
-            return
+            return None
 
         connected_backend, loop = result
+        with self._backend_lock(backend):
+            return loop.run_until_complete(connected_backend.get_bot_info())
 
-        async def _fetch():
-            bot_info = await connected_backend.get_bot_info()
-            if bot_info:
-                self._bot_user_ids[backend] = bot_info.id
-                self._bot_names[backend] = bot_info.name or bot_info.display_name or ""
-                log.info(f"Bot info for {backend}: id={bot_info.id}, name={self._bot_names[backend]}")
-
-        try:
-            loop.run_until_complete(_fetch())
-        except Exception:
-            log.exception("Error fetching bot info for %s", backend)
+    def _bot_identity(self, backend: str) -> BotIdentity:
+        """Return the bot identity for a backend, in the ``unknown`` state if not fetched yet."""
+        identity = self._get_identity_registry().get(backend)
+        identity.name = self._get_bot_name(backend)
+        return identity
 
     def _get_bot_id(self, backend: str) -> str | None:
-        """Get the bot's user ID for a backend."""
-        if backend in self._bot_user_ids:
-            return self._bot_user_ids[backend]
+        """Get the bot's user ID for a backend, or None while it is unknown.
 
-        # Try to fetch from API
-        self._fetch_bot_info(backend)
+        Never does I/O; the identity registry fills the cache in the background.
+        """
         return self._bot_user_ids.get(backend)
 
     def _get_bot_name(self, backend: str) -> str | None:
         """Get the bot's username for a backend.
 
-        First checks config for explicit bot_name, then checks cache,
-        then tries to fetch from backend API.
+        First checks config for explicit bot_name, then the cache. Never does
+        I/O; returns None while the identity is unknown.
         """
         # Check config first (explicit override)
         config = self._configs.get(backend)
         if config and config.bot_name:
             return config.bot_name
 
-        # Check cache
-        if backend in self._bot_names:
-            return self._bot_names[backend]
-
-        # Try to fetch from API
-        self._fetch_bot_info(backend)
         return self._bot_names.get(backend)
 
     def _is_authorized(self, msg: Message, backend: str) -> bool:
@@ -907,32 +1403,26 @@ class Bot(GatewayModule):
         channel_id: str,
         text: str,
         mentions: list[User],
+        defer_channel: bool = True,
     ) -> BotCommand | list[BotCommand] | None:
         """Extract bot commands from a message.
 
+        ``text`` is the command text returned by ``_is_message_to_bot``,
+        with the bot mention already stripped.
         Uses chatom's entity recognition to identify mentioned users.
+        If the command targets a channel that is not cached and
+        ``defer_channel`` is set, the channel is resolved in the background
+        and None is returned; the message is processed again once resolved.
         """
         try:
-            content = text.strip()
-
-            # Strip bot mention from beginning if present
-            bot_name = self._get_bot_name(backend)
-            bot_id = self._get_bot_id(backend)
-
-            # Strip <@BOT_ID> format (Slack/Discord)
-            if bot_id:
-                content = re.sub(rf"<@!?{re.escape(bot_id)}>", "", content).strip()
-
-            # Strip @bot_name format (Symphony/generic)
-            if bot_name and content.startswith(f"@{bot_name}"):
-                content = content[len(f"@{bot_name}") :].strip()
+            content = text
 
             log.info(f"Extracting command from: {content!r}")
 
             # Check for command syntax (supports both / and ! prefixes)
             if not content.startswith(("/", "!")):
                 # Check if this is a reply to an active agent session
-                session_cmd = self._check_agent_session_reply(msg, backend, channel_id)
+                session_cmd = self._check_agent_session_reply(msg, backend, channel_id, content)
                 if session_cmd:
                     return session_cmd
 
@@ -941,19 +1431,25 @@ class Bot(GatewayModule):
                 return self._create_help_command(msg, backend, channel_id)
 
             # Tokenize the command
-            tokens = next(reader(StringIO(content), delimiter=" ", quotechar='"', skipinitialspace=True))
+            tokens = tokenize(content)
             if not tokens:
                 return None
 
             # Parse command and arguments (strip both / and ! prefixes)
-            command_name = tokens[0].lstrip("/!").lower()
-            log.info(f"Parsed command_name: {command_name!r}, registered commands: {list(self._commands.keys())}")
-            if command_name not in self._commands:
+            command_name = tokens[0].text.lstrip("/!").lower()
+            log.debug(f"Parsed command_name: {command_name!r}")
+            invoker = self._invoker(backend, command_name)
+            if invoker is None:
                 log.warning(f"Unknown command: {command_name}")
                 return self._create_help_command(msg, backend, channel_id)
 
+            # Check backend support
+            if not invoker.supported:
+                log.warning(f"Command {command_name} not supported on {backend}")
+                return None
+
             # Filter out the bot from mentions before parsing args
-            bot_id = self._get_bot_id(backend)
+            bot_id = self._address_matcher(backend).bot_id
             filtered_mentions = [u for u in mentions if u.id != bot_id]
 
             # Parse arguments and tagged users
@@ -962,7 +1458,10 @@ class Bot(GatewayModule):
             # Resolve channel name to ID if a target channel was specified
             target_channel_name = ""
             if target_channel:
-                resolved_channel = self._resolve_channel(target_channel, backend)
+                ready, resolved_channel = self._lookup_channel(target_channel, backend, msg, defer_channel)
+                if not ready:
+                    log.info(f"Deferring command {command_name} until channel '{target_channel}' is resolved")
+                    return None
                 if resolved_channel:
                     target_channel = resolved_channel.id
                     target_channel_name = resolved_channel.name or target_channel
@@ -975,15 +1474,6 @@ class Bot(GatewayModule):
             if not target_channel:
                 target_channel = channel_id
 
-            # Create command
-            command_runner = self._commands[command_name]
-
-            # Check backend support
-            command_backends = self._command_backends(command_runner)
-            if command_backends and backend not in command_backends:
-                log.warning(f"Command {command_name} not supported on {backend}")
-                return None
-
             # Build source user from chatom Message
             source = User(
                 id=msg.author.id if msg.author else msg.author_id or "",
@@ -1011,68 +1501,41 @@ class Bot(GatewayModule):
                 channel_id=target_channel,
                 channel_name=channel_name,
                 backend=backend,
-                variant=command_runner.kind() if isinstance(command_runner, BaseCommand) else CommandVariant.REPLY,
+                variant=invoker.variant,
                 message=msg,
                 delay=None,
                 schedule="",
                 times_run=0,
             )
 
-            # Pre-execute hooks
-            if isinstance(command_runner, ScheduleCommand):
-                return command_runner.preexecute(bot_cmd, self._schedule_store, self)
-            elif isinstance(command_runner, StatusCommand):
-                return command_runner.preexecute(bot_cmd, self)
-            return command_runner.preexecute(bot_cmd)
+            return invoker.preexecute(bot_cmd, self)
 
         except Exception:
             log.exception("Error extracting command")
             return None
 
-    def _check_agent_session_reply(self, msg: Message, backend: str, channel_id: str) -> BotCommand | None:
+    def _check_agent_session_reply(self, msg: Message, backend: str, channel_id: str, content: str) -> BotCommand | None:
         """Check if the message is a reply to a bot response with an active agent session.
 
-        If so, constructs a BotCommand to continue the conversation.
+        If so, constructs a BotCommand to continue the conversation, with
+        ``content`` (the message text without the bot mention) as its prompt.
         """
-        try:
-            from csp_bot.commands.agent import AgentCommand
-        except ImportError:
-            return None
-
-        # Get the referenced message ID
-        ref_id = None
-        if msg.reference and msg.reference.message_id:
-            ref_id = msg.reference.message_id
-        elif msg.reply_to and msg.reply_to.id:
-            ref_id = msg.reply_to.id
-        # Check thread metadata (Slack thread_ts)
-        if not ref_id and msg.thread and msg.thread.id:
-            ref_id = msg.thread.id
-
+        ref_id = self._message_reference_id(msg)
         if not ref_id:
             return None
 
         # Look up session by the bot response ID
-        session = AgentCommand._sessions.get_by_response_id(ref_id)
+        session = self._agent_session_for_reference(ref_id)
         if session is None:
             return None
 
         # Found an active session — route the reply to the same command
         command_name = session.command_name
-        if command_name not in self._commands:
+        invoker = self._invoker(backend, command_name)
+        if invoker is None:
             log.warning(f"Agent session references unknown command: {command_name}")
             return None
 
-        command_runner = self._commands[command_name]
-        content = msg.content or ""
-        # Strip bot mention if present
-        bot_name = self._get_bot_name(backend)
-        bot_id = self._get_bot_id(backend)
-        if bot_id:
-            content = re.sub(rf"<@!?{re.escape(bot_id)}>", "", content).strip()
-        if bot_name and content.startswith(f"@{bot_name}"):
-            content = content[len(f"@{bot_name}") :].strip()
-
         source = User(
             id=msg.author.id if msg.author else msg.author_id or "",
             name=msg.author.name if msg.author else "",
@@ -1092,7 +1555,7 @@ class Bot(GatewayModule):
             channel_id=channel_id,
             channel_name=channel_name,
             backend=backend,
-            variant=command_runner.kind() if isinstance(command_runner, BaseCommand) else CommandVariant.REPLY,
+            variant=invoker.variant,
             message=msg,
             delay=None,
             schedule="",
@@ -1100,75 +1563,108 @@ class Bot(GatewayModule):
         )
 
         log.info(f"Routing reply to active agent session: command={command_name}, user={source.id}")
-        return command_runner.preexecute(bot_cmd)
+        return invoker.preexecute(bot_cmd, self)
+
+    @staticmethod
+    def _message_reference_id(msg: Message) -> str | None:
+        """Return the ID of the message this one replies to, if any."""
+        if msg.reference and msg.reference.message_id:
+            return msg.reference.message_id
+        if msg.reply_to and msg.reply_to.id:
+            return msg.reply_to.id
+        # Check thread metadata (Slack thread_ts)
+        if msg.thread and msg.thread.id:
+            return msg.thread.id
+        return None
+
+    @staticmethod
+    def _agent_session_for_reference(ref_id: str) -> Any:
+        """Return the active agent session a bot response belongs to, if any."""
+        try:
+            from csp_bot.commands.agent import AgentCommand
+        except ImportError:
+            return None
+        return AgentCommand._sessions.get_by_response_id(ref_id)
 
     def _parse_command_args(
         self,
-        tokens: list[str],
+        tokens: list[Token] | list[str],
         mentions: list[User],
         backend: str,
     ) -> tuple[list[str], list[User], str]:
-        """Parse command arguments, extracting tagged users and channels."""
+        """Parse command arguments, extracting tagged users and channels.
+
+        Quoted tokens are always literal arguments.
+        """
+        tokens = as_tokens(tokens)
         args = []
         target_users = []
         target_channel = ""
-        skip_indices = set()
+        index = MentionIndex(mentions)
 
         # For Symphony, we need special handling since mentions in the stripped
-        # text are names like "@Paine," but our mentions list has user IDs.
-        # We'll match @ tokens with mentions in order, and skip following name tokens.
+        # text are names like "@Paine, Timothy" but our mentions list has user IDs.
+        # We'll match @ tokens with mentions in order, and skip the name tokens that follow.
         symphony_mention_iter = iter(mentions) if backend == "symphony" else None
 
-        for i, token in enumerate(tokens):
-            if i in skip_indices:
+        i = 0
+        count = len(tokens)
+        while i < count:
+            token = tokens[i]
+            text = token.text
+            i += 1
+
+            if token.quoted:
+                args.append(text)
                 continue
 
             # Handle /channel, /room, !channel, or !room directive
-            if token in ("/channel", "/room", "!channel", "!room"):
-                if i + 1 < len(tokens):
-                    target_channel = tokens[i + 1]
-                    skip_indices.add(i + 1)
+            if text in ("/channel", "/room", "!channel", "!room"):
+                if i < count:
+                    target_channel = tokens[i].text
+                    i += 1
                 continue
 
-            # Check if token is a mention placeholder
-            is_mention = False
-
             # For Symphony: if token starts with @, it's a mention - match with next mention in list
-            # Also skip following tokens that look like they're part of the name (no @ prefix, no /)
-            if backend == "symphony" and token.startswith("@") and symphony_mention_iter:
-                try:
-                    user = next(symphony_mention_iter)
+            if symphony_mention_iter is not None and text.startswith("@"):
+                user = next(symphony_mention_iter, None)
+                if user is not None:
                     target_users.append(user)
-                    is_mention = True
-                    # Skip following tokens that are likely part of the multi-word name
-                    # (they don't start with @ or / and aren't commands)
-                    j = i + 1
-                    while j < len(tokens):
-                        next_token = tokens[j]
-                        if next_token.startswith(("@", "/", "!")):
-                            break
-                        skip_indices.add(j)
-                        j += 1
-                except StopIteration:
-                    pass  # No more mentions to match
+                    i = self._skip_mention_name(tokens, i, token, user)
+                    continue
 
             # For other backends: match by user ID
-            if not is_mention:
-                for user in mentions:
-                    if user.id in token or f"@{user.id}" == token:
-                        target_users.append(user)
-                        is_mention = True
-                        break
+            user = index.find(text)
+            if user is not None:
+                target_users.append(user)
+                continue
 
-            if not is_mention:
-                args.append(token)
+            args.append(text)
 
         return args, target_users, target_channel
 
+    @staticmethod
+    def _skip_mention_name(tokens: list[Token], i: int, mention: Token, user: User) -> int:
+        """Return the index of the first token after a multi-word ``@name`` mention.
+
+        If the user's name is known and the mention token starts it, the name's
+        length says exactly which tokens it covers. Otherwise, following tokens
+        that don't start with @, / or ! are assumed to be part of the name.
+        """
+        name = f"@{user.name}" if user.name else ""
+        if name and name.startswith(mention.text):
+            end = mention.start + len(name)
+            while i < len(tokens) and tokens[i].start < end:
+                i += 1
+            return i
+        while i < len(tokens) and not tokens[i].text.startswith(("@", "/", "!")):
+            i += 1
+        return i
+
     def _create_help_command(self, msg: Message, backend: str, channel_id: str) -> BotCommand | None:
         """Create a help command when no specific command is given."""
-        command_runner = self._commands.get("help")
-        if not command_runner:
+        invoker = self._invoker(backend, "help")
+        if invoker is None:
             return None
 
         source = User(
@@ -1194,7 +1690,7 @@ class Bot(GatewayModule):
             channel_id=channel_id,
             channel_name=channel_name,
             backend=backend,
-            variant=command_runner.kind() if isinstance(command_runner, BaseCommand) else CommandVariant.REPLY,
+            variant=invoker.variant,
             message=msg,
             delay=None,
             schedule="",
@@ -1203,27 +1699,15 @@ class Bot(GatewayModule):
 
     def _execute_command(self, cmd: BotCommand) -> Message | list[Message] | BotCommand | list[BotCommand] | None:
         """Execute a bot command and return responses."""
-        command_runner = self._commands.get(cmd.command)
-        if not command_runner:
+        invoker = self._invoker(cmd.backend, cmd.command)
+        if invoker is None:
             return None
 
         try:
-            if isinstance(command_runner, BaseCommand):
-                if isinstance(command_runner, HelpCommand):
-                    responses = command_runner.execute(cmd, MappingProxyType(self._commands))
-                elif isinstance(command_runner, ScheduleCommand):
-                    responses = command_runner.execute(cmd, self._schedule_store)
-                else:
-                    responses = command_runner.execute(cmd)
-            elif isinstance(command_runner, Command):
-                ctx = self._build_command_context(cmd)
-                responses = [r for r in execute_command_func(command_runner.execute, ctx) if r is not None]
-            elif hasattr(command_runner, "handler"):
-                ctx = self._build_command_context(cmd)
-                responses = [r for r in execute_command_func(command_runner.handler, ctx) if r is not None]
-            else:
-                log.error(f"Unsupported command runner type for {cmd.command}: {type(command_runner).__name__}")
-                return None
+            responses = invoker.execute(cmd, self)
+        except CommandTimeout:
+            self._metrics.incr(f"commands.timeouts.{cmd.command}")
+            return None
         except Exception:
             log.exception(f"Error executing command: {cmd.command}")
             return None
@@ -4,6 +4,8 @@ This module provides configuration classes that wrap chatom's
 backend-specific configurations with bot-specific settings.
 """
 
+from typing import Literal
+
 from ccflow import BaseModel
 from pydantic import Field
 
@@ -15,15 +17,48 @@ from .backends import (
 )
 
 __all__ = (
+    "AdmissionConfig",
+    "AsyncLoopConfig",
     "BackendConfig",
     "BotConfig",
+    "CommandPoolConfig",
     "DiscordConfig",
+    "OutboxConfig",
+    "RateLimitConfig",
     "SlackConfig",
     "SymphonyConfig",
     "TelegramConfig",
 )
 
 
+class RateLimitConfig(BaseModel):
+    """Outgoing message rate limits for a backend.
+
+    Rates are messages per second and 0 means unlimited. Bursts are the
+    number of messages that may be sent at once after a quiet period.
+    """
+
+    channel_per_second: float = Field(
+        default=1.0,
+        description="Sustained messages per second to any one channel.",
+    )
+
+    channel_burst: int = Field(
+        default=3,
+        description="Messages that may be sent to one channel at once.",
+    )
+
+    backend_per_second: float = Field(
+        default=0.0,
+        description="Sustained messages per second across all channels. 0 means unlimited.",
+    )
+
+    backend_burst: int = Field(
+        default=1,
+        description="Messages that may be sent across all channels at once.",
+    )
+
+
 class BackendConfig(BaseModel):
     """Base configuration for a bot backend.
 
@@ -56,6 +91,12 @@ class BackendConfig(BaseModel):
         description="Message to send when unauthorized user interacts. None means no message.",
     )
 
+    rate_limit: RateLimitConfig = Field(
+        default_factory=RateLimitConfig,
+        description="Outgoing message rate limits. When not set, one message per BotConfig.ratelimit_seconds per channel "
+        "and no backend-wide limit. Unset fields take the RateLimitConfig defaults.",
+    )
+
 
 class DiscordConfig(BackendConfig):
     """Discord bot configuration."""
@@ -98,6 +139,178 @@ class TelegramConfig(BackendConfig):
     )
 
 
+class OutboxConfig(BaseModel):
+    """Durable delivery of outgoing messages.
+
+    Outgoing messages are kept in the bot's state store until the adapter
+    reports them as sent, and are resent if that does not happen in time.
+    """
+
+    ack_seconds: float = Field(
+        default=30.0,
+        description="How long to wait for a message to be reported as sent before resending it.",
+    )
+
+    retry_seconds: float = Field(
+        default=2.0,
+        description="Extra wait before resending after the first failure on a backend. Doubles with each further failure.",
+    )
+
+    max_retry_seconds: float = Field(
+        default=300.0,
+        description="Maximum extra wait before resending.",
+    )
+
+    max_attempts: int = Field(
+        default=8,
+        description="Sends before a message is moved to the dead-letter namespace.",
+    )
+
+
+class AdmissionConfig(BaseModel):
+    """Per-user and per-channel quotas on commands.
+
+    A command over a rate quota is refused, and its user is told to slow
+    down. A command over a concurrency quota waits until its user, its
+    channel and the bot have room. Waiting commands are started in
+    weighted fair order across users, so one user with a backlog cannot
+    delay everyone else's commands. Scheduled commands are not subject to
+    admission. Every limit is off by default.
+
+    Example YAML::
+
+        modules:
+          bot:
+            config:
+              admission:
+                user_per_second: 0.5
+                user_burst: 5
+                user_max_running: 2
+                max_running: 16
+                user_weights:
+                  U0BUILDBOT: 0.25
+    """
+
+    user_per_second: float = Field(
+        default=0.0,
+        description="Commands one user may send per second, sustained. 0 means unlimited.",
+    )
+
+    user_burst: int = Field(
+        default=5,
+        description="Commands one user may send at once before user_per_second applies.",
+    )
+
+    channel_per_second: float = Field(
+        default=0.0,
+        description="Commands one channel may send per second, sustained. 0 means unlimited.",
+    )
+
+    channel_burst: int = Field(
+        default=10,
+        description="Commands one channel may send at once before channel_per_second applies.",
+    )
+
+    user_max_running: int = Field(
+        default=0,
+        description="Commands of one user running at once; more wait their turn. 0 means unlimited.",
+    )
+
+    channel_max_running: int = Field(
+        default=0,
+        description="Commands from one channel running at once; more wait their turn. 0 means unlimited.",
+    )
+
+    max_running: int = Field(
+        default=0,
+        description="Commands running at once across all users; more wait their turn. 0 means unlimited.",
+    )
+
+    user_max_waiting: int = Field(
+        default=10,
+        description="Commands of one user that may wait their turn. Further commands are refused.",
+    )
+
+    user_weights: dict[str, float] = Field(
+        default_factory=dict,
+        description="Share of the waiting commands started, by user ID. Users not listed have weight 1.",
+    )
+
+    slow_down_message: str = Field(
+        default="You are sending commands faster than I can run them, please slow down.",
+        description="Reply to a refused command. Empty refuses commands silently.",
+    )
+
+    slow_down_interval_seconds: float = Field(
+        default=30.0,
+        description="Minimum seconds between slow-down replies to one user.",
+    )
+
+
+class AsyncLoopConfig(BaseModel):
+    """Event loops running async commands.
+
+    Each command is assigned to a loop by its name or channel, so a
+    coroutine that blocks its loop only delays commands that share it.
+    """
+
+    size: int = Field(
+        default=1,
+        description="Number of event loops, each on its own thread.",
+    )
+
+    uvloop: bool = Field(
+        default=False,
+        description="Use uvloop event loops when uvloop is installed.",
+    )
+
+    shard_by: Literal["command", "channel"] = Field(
+        default="command",
+        description="Assign commands to loops by command name or by channel.",
+    )
+
+    slow_callback_seconds: float = Field(
+        default=0.1,
+        description="How late a loop's heartbeat may wake up before the loop is reported as blocked.",
+    )
+
+
+class CommandPoolConfig(BaseModel):
+    """A worker pool that commands declare with ``pool``.
+
+    Commands in one pool cannot use the threads of another, so a slow or
+    busy command only delays the commands that share its pool.
+
+    Example YAML::
+
+        modules:
+          bot:
+            config:
+              command_pools:
+                agent:
+                  workers: 4
+                  max_queued: 16
+                reports:
+                  workers: 1
+                  rejection: drop
+    """
+
+    workers: int = Field(
+        default=4,
+        description="Threads executing the pool's commands. 0 executes them inline on the engine thread.",
+    )
+
+    max_queued: int = Field(
+        default=0,
+        description="Commands that may wait for a free thread. 0 means unbounded.",
+    )
+
+    rejection: Literal["reject", "drop"] = Field(
+        default="reject",
+        description="What to do with a command when the pool is full: reply that the bot is busy, or drop it silently.",
+    )
+
+
 class BotConfig(BaseModel):
     """Main bot configuration.
 
@@ -110,7 +323,107 @@ class BotConfig(BaseModel):
     symphony: SymphonyConfig | None = None
     telegram: TelegramConfig | None = None
 
+    command_workers: int = Field(
+        default=8,
+        description="Threads of the default command pool, unless it is set in command_pools. 0 executes commands inline on the engine thread.",
+    )
+
+    command_timeout_seconds: float = Field(
+        default=60.0,
+        description="Seconds a command may run unless it declares its own timeout. 0 means no limit.",
+    )
+
+    command_timeouts: dict[str, float] = Field(
+        default_factory=dict,
+        description="Timeouts in seconds by command name, overriding what the commands declare.",
+    )
+
+    admission: AdmissionConfig = Field(
+        default_factory=AdmissionConfig,
+        description="Per-user and per-channel quotas on commands.",
+    )
+
+    async_loops: AsyncLoopConfig = Field(
+        default_factory=AsyncLoopConfig,
+        description="Event loops running async commands.",
+    )
+
+    command_pools: dict[str, CommandPoolConfig] = Field(
+        default_factory=dict,
+        description="Worker pools by name. Commands run on the pool they declare, or on the default pool.",
+    )
+
+    command_processes: int = Field(
+        default=2,
+        description='Worker processes running commands declared with execution="process". They are started with the bot '
+        "if any such command is registered.",
+    )
+
+    command_process_shared_memory_bytes: int = Field(
+        default=1024 * 1024,
+        description="Results of process commands at least this large are returned through shared memory. 0 disables shared memory.",
+    )
+
+    outbox: OutboxConfig | None = Field(
+        default=None,
+        description="Durable delivery with retries for outgoing messages. None sends each message once.",
+    )
+
     ratelimit_seconds: float = Field(
         default=1.0,
-        description="Minimum seconds between message outputs.",
+        description="Seconds between outgoing messages to one channel on backends whose config does not set rate_limit.",
+    )
+
+    coalesce_messages: bool = Field(
+        default=False,
+        description="Merge outgoing messages queued for the same channel and thread into one post, within platform size limits.",
+    )
+
+    outbound_max_queued: int = Field(
+        default=1000,
+        description="Maximum outgoing messages waiting on rate limits. When exceeded, status messages are dropped first, "
+        "then scheduled broadcasts, then replies. 0 means unbounded.",
+    )
+
+    stream_max_queued: int = Field(
+        default=2,
+        description="Messages a streaming generator command may have waiting on the rate limit for its channel before it is paused. "
+        "0 collects generator output and sends it when the command finishes.",
+    )
+
+    dedup_max_entries: int = Field(
+        default=10000,
+        description="How many recently sent messages are remembered for duplicate suppression.",
+    )
+
+    dedup_seconds: float = Field(
+        default=300.0,
+        description="How long a sent message ID is remembered; a message with the same ID is suppressed.",
+    )
+
+    dedup_content_seconds: float = Field(
+        default=0.0,
+        description="How long a sent message without an ID is remembered by backend, channel, thread and content. 0 disables content dedup. "
+        "Bot replies have no ID, so when enabled, identical replies to different commands within the window are dropped too.",
+    )
+
+    channel_cache_seconds: float = Field(
+        default=300.0,
+        description="How long a resolved /channel or /room target is used before it is refreshed in the background.",
+    )
+
+    channel_cache_negative_seconds: float = Field(
+        default=30.0,
+        description="How long a /channel or /room target that could not be resolved is remembered as missing.",
+    )
+
+    bot_info_retry_seconds: float = Field(
+        default=30.0,
+        description="How often to retry fetching the bot's own identity on backends where it is still unknown. "
+        "Startup waits at most this long for the first fetch. 0 disables background retries.",
+    )
+
+    bot_info_refresh_seconds: float = Field(
+        default=3600.0,
+        description="How often to re-fetch a known bot identity in the background. 0 disables re-fetching.",
     )
@@ -0,0 +1,126 @@
+"""Cache of resolved ``/channel`` and ``/room`` targets.
+
+Resolving a channel name means one or two remote ``fetch_channel`` calls,
+which must not run on the csp engine thread. The directory remembers
+results per backend under both the identifier that was asked for and the
+resolved channel's ID and name, remembers misses for a shorter time, and
+tracks which lookups are in flight so concurrent requests for the same
+channel share one fetch.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from chatom import Channel
+
+__all__ = (
+    "ChannelDirectory",
+    "ChannelEntry",
+)
+
+
+class ChannelEntry:
+    """A cached lookup result. ``channel`` is None for a remembered miss."""
+
+    __slots__ = ("channel", "expires_at")
+
+    def __init__(self, channel: Channel | None, expires_at: float):
+        self.channel = channel
+        self.expires_at = expires_at
+
+
+class ChannelDirectory:
+    """Thread-safe channel lookup cache keyed by backend and name or ID.
+
+    Entries are not dropped when they expire: an expired entry for a channel
+    that exists can still be served while it is refreshed in the background.
+
+    Args:
+        ttl: Seconds a resolved channel is considered fresh.
+        negative_ttl: Seconds a failed lookup is remembered.
+        max_entries: Maximum cached identifiers; least recently used are evicted.
+        clock: Monotonic time source, for tests.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], ChannelEntry] = OrderedDict()
+        self._pending: dict[tuple[str, str], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend: str, identifier: str) -> ChannelEntry | None:
+        """Return the cached entry for a channel name or ID, fresh or not."""
+        key = (backend, identifier)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: ChannelEntry) -> bool:
+        """Return whether an entry has not yet expired."""
+        return self._clock() < entry.expires_at
+
+    def begin(self, backend: str, identifier: str, waiter: Any = None) -> bool:
+        """Register interest in a lookup.
+
+        Args:
+            backend: The backend platform.
+            identifier: Channel name or ID.
+            waiter: Optional item to hand back from :meth:`put` once resolved.
+
+        Returns:
+            True if the caller should start the lookup, False if one is
+            already in flight.
+        """
+        key = (backend, identifier)
+        with self._lock:
+            waiters = self._pending.get(key)
+            started = waiters is None
+            if started:
+                waiters = self._pending[key] = []
+            if waiter is not None:
+                waiters.append(waiter)
+            return started
+
+    def put(self, backend: str, identifier: str, channel: Channel | None) -> list[Any]:
+        """Record a lookup result and return the waiters registered for it.
+
+        A resolved channel is also cached under its own ID and name.
+        """
+        now = self._clock()
+        with self._lock:
+            if channel is None:
+                self._store((backend, identifier), ChannelEntry(None, now + self.negative_ttl))
+            else:
+                entry = ChannelEntry(channel, now + self.ttl)
+                for key in {identifier, channel.id, channel.name}:
+                    if key:
+                        self._store((backend, key), entry)
+            return self._pending.pop((backend, identifier), [])
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: tuple[str, str], entry: ChannelEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,110 @@
+"""Merging of queued outgoing messages into fewer platform posts.
+
+When several small messages are waiting to go to the same channel and
+thread, they can be sent as one post. Only plain messages are merged:
+anything with attachments, embeds, components, pre-rendered formatted
+content or a reply reference is always sent on its own, and Symphony
+MessageML is only merged with MessageML. Content is joined
+in the backend's native format and merged posts stay under the platform's
+message size limit.
+"""
+
+import re
+from collections import deque
+
+from chatom import Message
+
+from .utils import message_backend, message_thread_id
+
+__all__ = (
+    "MAX_MESSAGE_LENGTH",
+    "can_coalesce",
+    "join_content",
+    "pop_coalesced",
+)
+
+# Conservative per-platform limits on the length of one post
+MAX_MESSAGE_LENGTH = {
+    "discord": 2000,
+    "slack": 4000,
+    "symphony": 40000,
+    "telegram": 4096,
+}
+DEFAULT_MAX_MESSAGE_LENGTH = 2000
+
+_MESSAGEML_RE = re.compile(r"^\s*<messageML>(.*)</messageML>\s*$", re.DOTALL)
+
+
+def can_coalesce(first: Message, second: Message) -> bool:
+    """Return whether two messages may be sent as one post."""
+    for msg in (first, second):
+        if msg.attachments or msg.embeds or msg.components or msg.formatted_content or msg.reference or msg.reply_to:
+            return False
+    backend = message_backend(first)
+    return (
+        backend == message_backend(second)
+        and first.channel_id == second.channel_id
+        and message_thread_id(first) == message_thread_id(second)
+        and first.metadata == second.metadata
+        and _content_format(backend, first.content) == _content_format(backend, second.content)
+    )
+
+
+def _content_format(backend: str, content: str | None) -> str:
+    # Plain text inside <messageML> would need escaping, so the two are not mixed
+    if backend == "symphony" and _MESSAGEML_RE.match(content or ""):
+        return "messageml"
+    return "text"
+
+
+def join_content(backend: str, contents: list[str]) -> str:
+    """Join message contents in the backend's native format.
+
+    Symphony MessageML bodies are unwrapped and joined with line breaks
+    inside a single ``<messageML>`` element; everything else is joined
+    with newlines. The contents must share a format (see ``can_coalesce``).
+    """
+    if backend == "symphony":
+        bodies = []
+        wrapped = False
+        for content in contents:
+            match = _MESSAGEML_RE.match(content)
+            if match:
+                wrapped = True
+                content = match.group(1)
+            bodies.append(content)
+        joined = "<br/>".join(bodies)
+        return f"<messageML>{joined}</messageML>" if wrapped else joined
+    return "\n".join(contents)
+
+
+def pop_coalesced(queue: deque[Message]) -> Message:
+    """Pop the next message, merged with any compatible messages after it.
+
+    Stops at the first incompatible message, so ordering within a channel
+    is preserved, and before the merged content would exceed the
+    platform's size limit.
+    """
+    first = queue.popleft()
+    if not queue or not can_coalesce(first, queue[0]):
+        return first
+
+    backend = message_backend(first)
+    limit = MAX_MESSAGE_LENGTH.get(backend, DEFAULT_MAX_MESSAGE_LENGTH)
+    merged = [first]
+    content = first.content or ""
+    while queue and can_coalesce(first, queue[0]):
+        candidate = join_content(backend, [content, queue[0].content or ""])
+        if len(candidate) > limit:
+            break
+        content = candidate
+        merged.append(queue.popleft())
+
+    if len(merged) == 1:
+        return first
+    update = {"content": content, "mentions": [user for msg in merged for user in msg.mentions]}
+    # Responses built by the bot carry mention IDs as an extra field
+    mention_ids = [mention_id for msg in merged for mention_id in (msg.model_extra or {}).get("mention_ids") or ()]
+    if mention_ids:
+        update["mention_ids"] = list(dict.fromkeys(mention_ids))
+    return first.model_copy(update=update)
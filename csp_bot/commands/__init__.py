@@ -23,13 +23,18 @@ from .base import (
     ReplyToAuthorCommand,
     ReplyToOtherCommand,
 )
+from .cache import CachePolicy, ResultCache
 from .context import BotInfo, CommandContext
+from .dispatch import CommandInvoker, compile_invoker
 from .echo import EchoCommand, EchoCommandModel
-from .executor import execute_command_func
+from .executor import CommandTimeout, StreamClosed, command_strategy, configure_event_loops, execute_command_func, get_event_loop_pool
 from .framework import Command, CommandEntry, CommandModel, clear_registry, command, get_registered_commands
 from .help import HelpCommand, HelpCommandModel
 from .legacy import LegacyCommandAdapter
+from .loops import EventLoopPool
+from .process import ProcessCommandPool
 from .schedule import ScheduleCommand, ScheduleCommandModel
+from .singleflight import SingleFlight
 from .status import StatusCommand, StatusCommandModel
 
 try:
@@ -42,27 +47,39 @@ __all__ = (
     "BaseCommand",
     "BaseCommandModel",
     "BotInfo",
+    "CachePolicy",
     "Command",
     "CommandContext",
     "CommandEntry",
+    "CommandInvoker",
     "CommandModel",
+    "CommandTimeout",
     "EchoCommand",
     "EchoCommandModel",
+    "EventLoopPool",
     "HelpCommand",
     "HelpCommandModel",
     "LegacyCommandAdapter",
     "NoResponseCommand",
+    "ProcessCommandPool",
     "ReplyCommand",
     "ReplyToAllCommand",
     "ReplyToAuthorCommand",
     "ReplyToOtherCommand",
+    "ResultCache",
     "ScheduleCommand",
     "ScheduleCommandModel",
+    "SingleFlight",
     "StatusCommand",
     "StatusCommandModel",
+    "StreamClosed",
     "clear_registry",
     "command",
+    "command_strategy",
+    "compile_invoker",
+    "configure_event_loops",
     "execute_command_func",
+    "get_event_loop_pool",
     "get_registered_commands",
     "mention_user",
 )
@@ -30,7 +30,7 @@ from chatom.format import Format, convert_format
 
 from csp_bot.commands.base import BaseCommand, ReplyCommand
 from csp_bot.persistence import InMemoryStateStore, StateStore
-from csp_bot.structs import BotCommand
+from csp_bot.structs import BotCommand, MessagePriority
 
 try:
     from chatom.agent import BackendToolset
@@ -44,6 +44,7 @@ log = logging.getLogger(__name__)
 
 __all__ = ("AgentCommand",)
 
+# Runs the LLM calls; the bot resizes it from the "agent" command pool config
 _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-cmd")
 
 
@@ -262,6 +263,8 @@ class AgentCommand(ReplyCommand):
     _backends: ClassVar[dict[str, BackendBase]] = {}
     _backend_loops: ClassVar[dict[str, asyncio.AbstractEventLoop]] = {}
     _futures: ClassVar[dict[str, Future]] = {}
+    # preexecute runs on the engine thread and execute on pool threads
+    _futures_lock: ClassVar[threading.Lock] = threading.Lock()
     _sessions: ClassVar[SessionStore] = SessionStore(ttl_seconds=900.0)
 
     # Configurable delay between polling checks (seconds)
@@ -303,6 +306,11 @@ class AgentCommand(ReplyCommand):
     def __init__(self, *args, **kwargs):
         pass
 
+    @staticmethod
+    def pool() -> str:
+        """Agent commands share their own pool so they cannot starve other commands."""
+        return "agent"
+
     @classmethod
     def set_backends(
         cls,
@@ -313,6 +321,16 @@ class AgentCommand(ReplyCommand):
         cls._backends = backends
         cls._backend_loops = loops or {}
 
+    @classmethod
+    def set_workers(cls, workers: int) -> None:
+        """Run agent LLM calls on ``workers`` threads from now on.
+
+        Calls already running finish on the previous threads.
+        """
+        global _executor
+        previous, _executor = _executor, ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="agent-cmd")
+        previous.shutdown(wait=False)
+
     @classmethod
     def set_session_ttl(cls, ttl_seconds: float) -> None:
         """Reconfigure the session TTL, preserving the backing store."""
@@ -594,7 +612,9 @@ class AgentCommand(ReplyCommand):
             log.debug("Cleaned up %d expired agent sessions", removed_sessions)
 
         key = self._command_key(command)
-        if key not in self._futures:
+        with self._futures_lock:
+            running = key in self._futures
+        if not running:
             try:
                 agent = self.build_agent(command)
                 prompt_text = self.build_prompt(command)
@@ -613,14 +633,17 @@ class AgentCommand(ReplyCommand):
 
             # Use the backend's event loop so aiohttp sessions stay valid
             backend_loop = self._backend_loops.get(command.backend)
-            future = _executor.submit(_run_agent, agent, prompt, backend_loop, history)
-            self._futures[key] = future
-            log.info(
-                "AgentCommand[%s] submitted for user %s (session history: %d msgs)",
-                self.command(),
-                command.source.name,
-                len(session.message_history),
-            )
+            with self._futures_lock:
+                submit = key not in self._futures
+                if submit:
+                    self._futures[key] = _executor.submit(_run_agent, agent, prompt, backend_loop, history)
+            if submit:
+                log.info(
+                    "AgentCommand[%s] submitted for user %s (session history: %d msgs)",
+                    self.command(),
+                    command.source.name,
+                    len(session.message_history),
+                )
 
         command.delay = _utc_now() + timedelta(seconds=self.poll_interval)
         return command
@@ -636,7 +659,8 @@ class AgentCommand(ReplyCommand):
             )
 
         key = self._command_key(command)
-        future = self._futures.get(key)
+        with self._futures_lock:
+            future = self._futures.get(key)
 
         if future is None:
             log.warning("AgentCommand[%s] no future found for key %s", self.command(), key)
@@ -650,7 +674,8 @@ class AgentCommand(ReplyCommand):
             # Check timeout
             elapsed = command.times_run * self.poll_interval
             if elapsed >= self.timeout:
-                self._futures.pop(key, None)
+                with self._futures_lock:
+                    self._futures.pop(key, None)
                 future.cancel()
                 return Message(
                     content="Sorry, the AI request timed out. Please try again.",
@@ -673,7 +698,7 @@ class AgentCommand(ReplyCommand):
                         Message(
                             content=status_text,
                             channel=origin_channel,
-                            metadata={"backend": command.backend},
+                            metadata={"backend": command.backend, "priority": MessagePriority.STATUS.name},
                         )
                     )
                 elif command.times_run % self.status_every_n_polls == 0:
@@ -683,13 +708,14 @@ class AgentCommand(ReplyCommand):
                         Message(
                             content=status_text,
                             channel=origin_channel,
-                            metadata={"backend": command.backend},
+                            metadata={"backend": command.backend, "priority": MessagePriority.STATUS.name},
                         )
                     )
             return result
 
         # Future is done — get result
-        self._futures.pop(key, None)
+        with self._futures_lock:
+            self._futures.pop(key, None)
         try:
             result = future.result()
             output = str(result.output) if hasattr(result, "output") else str(result)
@@ -31,6 +31,11 @@ class BaseCommand(ABC):
         """Return supported backends. Empty means all backends."""
         return []
 
+    @staticmethod
+    def pool() -> str:
+        """Return the worker pool the command runs on."""
+        return "default"
+
     @abstractmethod
     def command(self) -> str:
         """Return the command signature (e.g., 'help' for /help)."""
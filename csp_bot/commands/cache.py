@@ -0,0 +1,197 @@
+"""Result caching for idempotent commands.
+
+A command declared with a ``CachePolicy`` has its responses cached per
+backend, already rendered into chatom ``Message`` objects, so a hit skips
+both executing the command and rendering its output. Entries expire after
+the policy's TTL and the in-memory tier holds at most ``max_entries``
+results, evicting the least recently used. With ``persist`` the results
+are also written to the bot's ``StateStore``, which survives restarts and
+can be shared between bot processes.
+
+Only complete results are cached: commands that fail, return nothing or
+return follow-up commands are executed every time. Cached commands also
+run single-flight (see ``singleflight``), so their output is collected
+rather than streamed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Literal
+
+from ccflow import BaseModel
+from chatom import Channel, Message
+from pydantic import Field
+
+from csp_bot.persistence import StateStore
+from csp_bot.structs import BotCommand
+from csp_bot.utils import message_thread_id
+
+__all__ = (
+    "CachePolicy",
+    "ResultCache",
+    "normalized_args",
+)
+
+
+def normalized_args(cmd: BotCommand) -> tuple[str, ...]:
+    """Return the arguments of ``cmd`` as compared by caching and single flight."""
+    return tuple(arg.strip() for arg in cmd.args)
+
+
+class CachePolicy(BaseModel):
+    """How a command's results are cached.
+
+    Example::
+
+        @command(name="quote", cache=CachePolicy(ttl_seconds=60, key=["args"]))
+        def quote(ctx: CommandContext) -> str: ...
+    """
+
+    ttl_seconds: float = Field(
+        default=60.0,
+        description="How long a result is reused.",
+    )
+
+    key: list[Literal["args", "channel", "user", "backend"]] = Field(
+        default_factory=lambda: ["args"],
+        description="What distinguishes cached results. Results are always cached per backend.",
+    )
+
+    max_entries: int = Field(
+        default=256,
+        description="Results kept in memory, least recently used evicted first.",
+    )
+
+    persist: bool = Field(
+        default=False,
+        description="Also keep results in the bot's state store.",
+    )
+
+    def key_for(self, cmd: BotCommand) -> tuple:
+        """Return what distinguishes the result of ``cmd`` under this policy."""
+        parts: list[object] = [cmd.backend]
+        for part in self.key:
+            if part == "args":
+                parts.append(normalized_args(cmd))
+            elif part == "channel":
+                parts.append(cmd.channel_id)
+            elif part == "user":
+                source = getattr(cmd, "source", None)
+                parts.append(source.id if source is not None else "")
+        return tuple(parts)
+
+
+class _CachedResult:
+    """Responses cached for one key, with where the invocation that produced them came from."""
+
+    __slots__ = ("channel_id", "expires_at", "messages", "thread_id")
+
+    def __init__(self, messages: list[Message], channel_id: str, thread_id: str, expires_at: float):
+        self.messages = messages
+        self.channel_id = channel_id
+        self.thread_id = thread_id
+        self.expires_at = expires_at
+
+
+def _origin(cmd: BotCommand) -> tuple[str, str]:
+    """Return the channel and thread an invocation was made in."""
+    message = getattr(cmd, "message", None)
+    return cmd.channel_id, message_thread_id(message) if message is not None else ""
+
+
+def _copy(msg: Message) -> Message:
+    # Metadata is tagged downstream (priority, outbox IDs); keep ours clean
+    return msg.model_copy(update={"metadata": dict(msg.metadata or {})})
+
+
+def _readdress(msg: Message, origin: tuple[str, str], target: tuple[str, str]) -> Message:
+    """Copy a reply made to the ``origin`` invocation so it answers the ``target`` one."""
+    if not msg.channel or msg.channel.id != origin[0] or target == origin:
+        return _copy(msg)
+    update: dict = {"metadata": dict(msg.metadata or {}), "channel": Channel(id=target[0] or origin[0])}
+    thread_id = message_thread_id(msg)
+    if thread_id:
+        # Only the thread of the original invocation has a counterpart here
+        update["thread"] = None
+        update["thread_id"] = target[1] if thread_id == origin[1] else ""
+    return msg.model_copy(update=update)
+
+
+class ResultCache:
+    """Cached responses of one command.
+
+    Args:
+        command_name: The command whose results are cached.
+        policy: TTL, key and size of the cache.
+        store: Second tier used when ``policy.persist`` is set.
+        clock: Wall-clock time source, for tests. Wall-clock time because
+            persisted entries outlive the process.
+    """
+
+    __slots__ = ("_clock", "_entries", "_lock", "_store", "command_name", "policy")
+
+    namespace = "csp_bot.command_cache"
+
+    def __init__(self, command_name: str, policy: CachePolicy, store: StateStore | None = None, clock: Callable[[], float] = time.time):
+        self.command_name = command_name
+        self.policy = policy
+        self._store = store if policy.persist else None
+        self._clock = clock
+        self._entries: OrderedDict[tuple, _CachedResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, cmd: BotCommand) -> tuple:
+        """Return the cache key of an invocation."""
+        return self.policy.key_for(cmd)
+
+    def get(self, cmd: BotCommand) -> list[Message] | None:
+        """Return copies of the cached responses for ``cmd``, or None on a miss."""
+        key = self.key(cmd)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self._store is not None:
+            entry = self._store.get(self.namespace, self._store_key(key))
+            if isinstance(entry, _CachedResult) and entry.expires_at > now:
+                self._remember(key, entry)
+            else:
+                entry = None
+        if entry is None:
+            return None
+        target = _origin(cmd)
+        return [_readdress(msg, (entry.channel_id, entry.thread_id), target) for msg in entry.messages]
+
+    def put(self, cmd: BotCommand, messages: list[Message]) -> None:
+        """Cache the responses of ``cmd``."""
+        key = self.key(cmd)
+        entry = _CachedResult([_copy(msg) for msg in messages], *_origin(cmd), self._clock() + self.policy.ttl_seconds)
+        self._remember(key, entry)
+        if self._store is not None:
+            self._store.put(self.namespace, self._store_key(key), entry, ttl_seconds=self.policy.ttl_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: tuple, entry: _CachedResult) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.policy.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store_key(self, key: tuple) -> str:
+        return f"{self.command_name}:{hashlib.sha256(repr(key).encode()).hexdigest()}"
@@ -0,0 +1,193 @@
+"""Precompiled command dispatch.
+
+Every registered runner (legacy ``BaseCommand``, ``Command`` subclass or
+decorated ``CommandEntry``) is compiled once per backend into a
+``CommandInvoker`` holding what the hot path needs: backend support,
+response variant, preexecute hook and execute strategy. Extracting and
+executing a command is then one lookup and a call, with no type checks or
+signature inspection per message.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from functools import partial
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from chatom import Message
+
+from csp_bot.structs import BotCommand, CommandVariant
+
+from .base import BaseCommand
+from .cache import CachePolicy, _origin, _readdress, normalized_args
+from .executor import call_with_deadline, command_strategy
+from .framework import Command
+from .help import HelpCommand
+from .schedule import ScheduleCommand
+from .status import StatusCommand
+
+if TYPE_CHECKING:
+    from csp_bot.bot import Bot
+
+__all__ = (
+    "CommandInvoker",
+    "compile_invoker",
+)
+
+log = logging.getLogger(__name__)
+
+
+class CommandInvoker:
+    """A command runner compiled for one backend.
+
+    Attributes:
+        name: The command name.
+        backend: The backend this invoker was compiled for.
+        runner: The registered runner it was compiled from.
+        supported: Whether the runner supports ``backend``.
+        variant: Response variant for BotCommands it creates.
+        preexecute: ``(BotCommand, Bot) -> BotCommand | list[BotCommand] | None``
+        execute: ``(BotCommand, Bot) -> responses``
+        pool: The worker pool the command runs on.
+    """
+
+    __slots__ = ("backend", "execute", "name", "pool", "preexecute", "runner", "supported", "variant")
+
+    def __init__(
+        self,
+        name: str,
+        backend: str,
+        runner: Any,
+        supported: bool,
+        variant: CommandVariant,
+        preexecute: Callable[[BotCommand, Bot], Any],
+        execute: Callable[[BotCommand, Bot], Any],
+        pool: str = "default",
+    ):
+        self.name = name
+        self.backend = backend
+        self.runner = runner
+        self.supported = supported
+        self.variant = variant
+        self.preexecute = preexecute
+        self.execute = execute
+        self.pool = pool
+
+
+def compile_invoker(name: str, runner: Any, backend: str) -> CommandInvoker:
+    """Compile a registered command runner into an invoker for ``backend``."""
+    if isinstance(runner, BaseCommand):
+        backends = runner.backends()
+        pool = runner.pool()
+        variant = runner.kind()
+        preexecute = partial(_legacy_preexecute, runner)
+        execute = partial(_legacy_execute, runner)
+        if isinstance(runner, ScheduleCommand):
+            preexecute = partial(_schedule_preexecute, runner)
+            execute = partial(_schedule_execute, runner)
+        elif isinstance(runner, StatusCommand):
+            preexecute = partial(_status_preexecute, runner)
+        elif isinstance(runner, HelpCommand):
+            execute = partial(_help_execute, runner)
+        execute = partial(_deadline_execute, execute)
+    elif isinstance(runner, Command) or hasattr(runner, "handler"):
+        backends = runner.backends
+        pool = getattr(runner, "pool", "default")
+        variant = CommandVariant.REPLY
+        preexecute = _no_preexecute
+        fn = runner.execute if isinstance(runner, Command) else runner.handler
+        timeout = getattr(runner, "timeout", None)
+        cache = getattr(runner, "cache", None)
+        single_flight = cache is not None or getattr(runner, "single_flight", False)
+        if getattr(runner, "execution", "thread") == "process":
+            execute = partial(_process_execute, fn, timeout)
+        else:
+            # Single-flight waiters share the whole result, so it is collected rather than streamed
+            execute = partial(_context_execute, command_strategy(fn), timeout, not single_flight)
+        if single_flight:
+            execute = partial(_single_flight_execute, cache, execute)
+        if cache is not None:
+            execute = partial(_cached_execute, cache, execute)
+    else:
+        backends = getattr(runner, "backends", None)
+        pool = "default"
+        variant = CommandVariant.REPLY
+        preexecute = _no_preexecute
+        execute = partial(_unsupported_execute, runner)
+
+    backends = [b.lower() for b in backends or []]
+    supported = not backends or backend in backends
+    return CommandInvoker(name, backend, runner, supported, variant, preexecute, execute, pool or "default")
+
+
+def _no_preexecute(cmd: BotCommand, bot: Bot) -> BotCommand:
+    return cmd
+
+
+def _legacy_preexecute(runner: BaseCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.preexecute(cmd)
+
+
+def _legacy_execute(runner: BaseCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.execute(cmd)
+
+
+def _schedule_preexecute(runner: ScheduleCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.preexecute(cmd, bot._schedule_store, bot)
+
+
+def _schedule_execute(runner: ScheduleCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.execute(cmd, bot._schedule_store)
+
+
+def _status_preexecute(runner: StatusCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.preexecute(cmd, bot)
+
+
+def _help_execute(runner: HelpCommand, cmd: BotCommand, bot: Bot) -> Any:
+    return runner.execute(cmd, MappingProxyType(bot._commands))
+
+
+def _deadline_execute(execute: Callable[[BotCommand, Bot], Any], cmd: BotCommand, bot: Bot) -> Any:
+    return call_with_deadline(execute, bot._command_timeout(cmd.command, None), cmd, bot)
+
+
+def _context_execute(run: Callable[..., list], timeout: float | None, stream: bool, cmd: BotCommand, bot: Bot) -> list:
+    ctx = bot._build_command_context(cmd)
+    emit = bot._stream_emitter() if stream else None
+    return [r for r in run(ctx, bot._command_timeout(cmd.command, timeout), emit) if r is not None]
+
+
+def _process_execute(fn: Callable[..., Any], timeout: float | None, cmd: BotCommand, bot: Bot) -> list:
+    ctx = bot._build_command_context(cmd)
+    return [r for r in bot._get_process_pool().run(fn, ctx, bot._command_timeout(cmd.command, timeout)) if r is not None]
+
+
+def _cached_execute(policy: CachePolicy, execute: Callable[[BotCommand, Bot], list], cmd: BotCommand, bot: Bot) -> list:
+    cache = bot._result_cache(cmd.command, policy)
+    cached = cache.get(cmd)
+    if cached is not None:
+        bot._metrics.incr(f"commands.cache.hits.{cmd.command}")
+        return cached
+    bot._metrics.incr(f"commands.cache.misses.{cmd.command}")
+    responses = execute(cmd, bot)
+    # Partial results (failures, streamed output, follow-up commands) are not reusable
+    if responses and all(isinstance(r, Message) for r in responses):
+        cache.put(cmd, responses)
+    return responses
+
+
+def _single_flight_execute(policy: CachePolicy | None, execute: Callable[[BotCommand, Bot], list], cmd: BotCommand, bot: Bot) -> list:
+    key = (cmd.command, *policy.key_for(cmd)) if policy is not None else (cmd.command, cmd.backend, normalized_args(cmd))
+    origin = _origin(cmd)
+    responses, leader_origin = bot._single_flight.run(key, origin, partial(execute, cmd, bot))
+    if leader_origin is None:
+        return responses
+    bot._metrics.incr(f"commands.single_flight.joined.{cmd.command}")
+    return [_readdress(r, leader_origin, origin) for r in responses if isinstance(r, Message)]
+
+
+def _unsupported_execute(runner: Any, cmd: BotCommand, bot: Bot) -> None:
+    log.error(f"Unsupported command runner type for {cmd.command}: {type(runner).__name__}")
@@ -3,15 +3,18 @@
 Handles sync functions, async functions, sync generators, and async
 generators uniformly. The caller gets back a list of response items
 (Message, FormattedMessage, str, or None) regardless of which
-signature the command used.
+signature the command used. Callers that pass an ``emit`` callback get
+generator items streamed to it as they are produced instead.
 """
 
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import inspect
 import logging
-import threading
+import time
+from collections.abc import Callable
 from typing import Any
 
 from chatom import Message
@@ -21,28 +24,92 @@ from chatom.format.attachment import FormattedAttachment, FormattedImage
 
 from csp_bot.structs import BotCommand
 
+from .loops import EventLoopPool
+
 log = logging.getLogger(__name__)
 
-# Module-level async event loop running in a background thread.
-# Lazily initialised on first use.
-_loop: asyncio.AbstractEventLoop | None = None
-_loop_thread: threading.Thread | None = None
-_loop_lock = threading.Lock()
-
-
-def _get_event_loop() -> asyncio.AbstractEventLoop:
-    """Get or create the shared background event loop."""
-    global _loop, _loop_thread
-    with _loop_lock:
-        if _loop is None or _loop.is_closed():
-            _loop = asyncio.new_event_loop()
-            _loop_thread = threading.Thread(
-                target=_loop.run_forever,
-                name="csp-bot-async-loop",
-                daemon=True,
-            )
-            _loop_thread.start()
-    return _loop
+
+class StreamClosed(Exception):
+    """Raised by an ``emit`` callback when nobody is listening any more.
+
+    Stops a streaming generator command without logging an error.
+    """
+
+
+class CommandTimeout(TimeoutError):
+    """Raised when a command runs past its timeout.
+
+    Async commands are cancelled and sync generators are closed at their
+    next yield; a sync function cannot be interrupted, so its late result
+    is discarded instead.
+    """
+
+
+# Receives each item a streaming generator command yields
+Emit = Callable[[Any], None]
+
+
+class _Deadline:
+    """A command's remaining run time, stopped while it is blocked in ``emit``.
+
+    ``emit`` waits on stream backpressure (the channel's outbound rate
+    limit), which is not time the command spends working.
+    """
+
+    __slots__ = ("_at", "_paused_at", "timeout")
+
+    def __init__(self, timeout: float | None):
+        self.timeout = timeout
+        self._at = time.monotonic() + timeout if timeout is not None else None
+        self._paused_at: float | None = None
+
+    def remaining(self) -> float | None:
+        """Seconds left, or None without a limit."""
+        if self._at is None:
+            return None
+        return self._at - (self._paused_at if self._paused_at is not None else time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def paused(self, emit: Emit) -> Emit:
+        """Wrap ``emit`` so the time it blocks is added back to the deadline."""
+
+        def call(item: Any) -> None:
+            self._paused_at = time.monotonic()
+            try:
+                emit(item)
+            finally:
+                if self._at is not None:
+                    self._at += time.monotonic() - self._paused_at
+                self._paused_at = None
+
+        return call
+
+
+# Module-level pool of async event loops running in background threads.
+# Lazily started on first use; the bot replaces it with a configured pool.
+_loop_pool = EventLoopPool()
+
+
+def configure_event_loops(pool: EventLoopPool) -> None:
+    """Run async commands on ``pool`` from now on, stopping the previous pool."""
+    global _loop_pool
+    previous, _loop_pool = _loop_pool, pool
+    if previous is not pool:
+        previous.close()
+
+
+def get_event_loop_pool() -> EventLoopPool:
+    """Return the pool async commands run on."""
+    return _loop_pool
+
+
+def _get_event_loop(ctx: Any = None) -> asyncio.AbstractEventLoop:
+    """Get the background event loop a command context is sharded to."""
+    pool = _loop_pool
+    return pool.loop_for(pool.key_for(ctx))
 
 
 def _extract_attachments(fm: FormattedMessage) -> list:
@@ -148,7 +215,8 @@ def _coerce_response(item: Any, backend: str) -> Message | BotCommand | None:
 def execute_command_func(
     fn: Any,
     ctx: Any,
-    timeout: float = 60.0,
+    timeout: float | None = 60.0,
+    emit: Emit | None = None,
 ) -> list[Message | BotCommand | None]:
     """Execute a command callable and return a list of Messages.
 
@@ -161,48 +229,79 @@ def execute_command_func(
     Args:
         fn: The callable (function, bound method, generator, etc.)
         ctx: The CommandContext to pass.
-        timeout: Timeout in seconds for async operations and generators.
+        timeout: Seconds the command may run; None or 0 means no limit.
+            Raises ``CommandTimeout`` when exceeded.
+        emit: Called with each item a generator yields, as soon as it is
+            yielded. Streamed items are not included in the returned list.
 
     Returns:
         List of Messages/BotCommands.
     """
-    backend = getattr(ctx, "backend", "")
+    return command_strategy(fn)(ctx, timeout, emit)
+
+
+def command_strategy(fn: Any) -> Callable[..., list[Message | BotCommand | None]]:
+    """Resolve how ``fn`` should be executed, once.
 
+    Returns a callable taking ``(ctx, timeout=60.0, emit=None)`` that runs ``fn`` the
+    way :func:`execute_command_func` would, so callers that invoke the same
+    command repeatedly can skip signature detection on every call.
+    """
     if inspect.isasyncgenfunction(fn):
-        return _run_async_generator(fn, ctx, backend, timeout)
+        runner = _run_async_generator
     elif inspect.isgeneratorfunction(fn):
-        return _run_sync_generator(fn, ctx, backend, timeout)
+        runner = _run_sync_generator
     elif inspect.iscoroutinefunction(fn):
-        return _run_async_function(fn, ctx, backend, timeout)
+        runner = _run_async_function
     else:
-        return _run_sync_function(fn, ctx, backend)
+        runner = _run_sync_function
+
+    def run(ctx: Any, timeout: float | None = 60.0, emit: Emit | None = None) -> list[Message | BotCommand | None]:
+        return runner(fn, ctx, getattr(ctx, "backend", ""), timeout or None, emit)
+
+    return run
 
 
-def _run_sync_function(fn: Any, ctx: Any, backend: str) -> list[Message | BotCommand | None]:
-    """Execute a plain sync function."""
+def call_with_deadline(fn: Callable[..., Any], timeout: float | None, *args: Any) -> Any:
+    """Call a sync ``fn``, discarding its result if it overran ``timeout``.
+
+    A running sync call cannot be interrupted; an overrun raises
+    ``CommandTimeout`` once it returns. None or 0 means no limit.
+    """
+    started = time.monotonic()
     try:
-        result = fn(ctx)
-        return [_coerce_response(result, backend)]
+        result = fn(*args)
     except Exception:
         log.exception("Error executing sync command")
         raise
+    if timeout and time.monotonic() - started > timeout:
+        log.error(f"Sync command overran its {timeout}s timeout; discarding its result")
+        raise CommandTimeout(f"Command exceeded {timeout}s")
+    return result
+
+
+def _run_sync_function(fn: Any, ctx: Any, backend: str, timeout: float | None = None, emit: Emit | None = None) -> list[Message | BotCommand | None]:
+    """Execute a plain sync function, discarding its result if it overran."""
+    return [_coerce_response(call_with_deadline(fn, timeout, ctx), backend)]
 
 
 def _run_async_function(
     fn: Any,
     ctx: Any,
     backend: str,
-    timeout: float,
+    timeout: float | None,
+    emit: Emit | None = None,
 ) -> list[Message | BotCommand | None]:
-    """Execute an async function in the background event loop."""
-    loop = _get_event_loop()
+    """Execute an async function in the background event loop, cancelling it on timeout."""
+    loop = _get_event_loop(ctx)
+    future = asyncio.run_coroutine_threadsafe(fn(ctx), loop)
     try:
-        future = asyncio.run_coroutine_threadsafe(fn(ctx), loop)
         result = future.result(timeout=timeout)
         return [_coerce_response(result, backend)]
-    except asyncio.TimeoutError:
+    except concurrent.futures.TimeoutError:
+        future.cancel()
         log.error(f"Async command timed out after {timeout}s")
-        raise
+        raise CommandTimeout(f"Command exceeded {timeout}s") from None
     except Exception:
         log.exception("Error executing async command")
         raise
@@ -212,17 +311,31 @@ def _run_sync_generator(
     fn: Any,
     ctx: Any,
     backend: str,
-    timeout: float,
+    timeout: float | None,
+    emit: Emit | None = None,
 ) -> list[Message | BotCommand | None]:
-    """Drain a sync generator until it yields None sentinel."""
+    """Drain a sync generator until it yields None sentinel, streaming items to ``emit`` if given.
+
+    The timeout is checked at every yield, not counting time blocked in
+    ``emit``; an overrunning generator is closed, which runs its
+    ``finally`` blocks.
+    """
     results: list[Message | BotCommand | None] = []
+    deadline = _Deadline(timeout)
+    collect = deadline.paused(emit) if emit is not None else results.append
     try:
         gen = fn(ctx)
         for item in gen:
+            if deadline.expired():
+                gen.close()
+                log.error(f"Generator command timed out after {timeout}s")
+                raise CommandTimeout(f"Command exceeded {timeout}s")
             if item is None:
                 break
-            results.append(_coerce_response(item, backend))
-    except GeneratorExit:
+            collect(_coerce_response(item, backend))
+    except CommandTimeout:
+        raise
+    except (GeneratorExit, StreamClosed):
         pass
     except Exception:
         log.exception("Error in generator command")
@@ -234,13 +347,23 @@ async def _drain_async_gen(
     fn: Any,
     ctx: Any,
     backend: str,
+    emit: Emit | None = None,
 ) -> list[Message | BotCommand | None]:
-    """Async helper to drain an async generator until None sentinel."""
+    """Async helper to drain an async generator until None sentinel.
+
+    ``emit`` may block on backpressure, so it is called off the shared loop.
+    """
     results: list[Message | BotCommand | None] = []
     async for item in fn(ctx):
         if item is None:
             break
-        results.append(_coerce_response(item, backend))
+        if emit is None:
+            results.append(_coerce_response(item, backend))
+            continue
+        try:
+            await asyncio.to_thread(emit, _coerce_response(item, backend))
+        except StreamClosed:
+            break
     return results
 
 
@@ -248,19 +371,30 @@ def _run_async_generator(
     fn: Any,
     ctx: Any,
     backend: str,
-    timeout: float,
+    timeout: float | None,
+    emit: Emit | None = None,
 ) -> list[Message | BotCommand | None]:
-    """Drain an async generator in the background event loop."""
-    loop = _get_event_loop()
+    """Drain an async generator in the background event loop, cancelling it on timeout.
+
+    Time blocked in ``emit`` does not count towards the timeout.
+    """
+    loop = _get_event_loop(ctx)
+    deadline = _Deadline(timeout)
+    future = asyncio.run_coroutine_threadsafe(
+        _drain_async_gen(fn, ctx, backend, deadline.paused(emit) if emit is not None else None),
+        loop,
+    )
     try:
-        future = asyncio.run_coroutine_threadsafe(
-            _drain_async_gen(fn, ctx, backend),
-            loop,
-        )
-        return future.result(timeout=timeout)
-    except asyncio.TimeoutError:
-        log.error(f"Async generator command timed out after {timeout}s")
-        raise
+        while not deadline.expired():
+            remaining = deadline.remaining()
+            try:
+                return future.result(timeout=max(remaining, 0.0) if remaining is not None else None)
+            except concurrent.futures.TimeoutError:
+                if future.done():
+                    raise
     except Exception:
         log.exception("Error in async generator command")
         raise
+    future.cancel()
+    log.error(f"Async generator command timed out after {timeout}s")
+    raise CommandTimeout(f"Command exceeded {timeout}s")
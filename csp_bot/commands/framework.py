@@ -16,11 +16,13 @@ import logging
 from collections.abc import Callable
 from typing import (
     Any,
+    Literal,
 )
 
 from ccflow import BaseModel
 from pydantic import Field
 
+from csp_bot.commands.cache import CachePolicy
 from csp_bot.commands.context import CommandContext
 
 log = logging.getLogger(__name__)
@@ -31,7 +33,7 @@ _COMMAND_REGISTRY: dict[str, CommandEntry] = {}
 class CommandEntry:
     """Internal registry entry for a command."""
 
-    __slots__ = ("backends", "handler", "help", "is_class", "name")
+    __slots__ = ("backends", "cache", "execution", "handler", "help", "is_class", "name", "pool", "single_flight", "timeout")
 
     def __init__(
         self,
@@ -40,18 +42,33 @@ class CommandEntry:
         handler: Any,
         backends: list[str] | None = None,
         is_class: bool = False,
+        pool: str = "default",
+        execution: str = "thread",
+        timeout: float | None = None,
+        cache: CachePolicy | None = None,
+        single_flight: bool = False,
     ):
         self.name = name
         self.help = help
         self.handler = handler
         self.backends = backends or []
         self.is_class = is_class
+        self.pool = pool
+        self.execution = execution
+        self.timeout = timeout
+        self.cache = cache
+        self.single_flight = single_flight
 
 
 def command(
     name: str,
     help: str = "",
     backends: list[str] | None = None,
+    pool: str = "default",
+    execution: Literal["thread", "process"] = "thread",
+    timeout: float | None = None,
+    cache: CachePolicy | None = None,
+    single_flight: bool = False,
 ) -> Callable:
     """Decorator to register a function as a bot command.
 
@@ -67,6 +84,15 @@ def command(
         name: The command name (e.g. "echo" for /echo).
         help: Help text shown by the /help command.
         backends: List of backends this command supports. Empty = all.
+        pool: Worker pool the command runs on (see ``BotConfig.command_pools``).
+        execution: ``"process"`` runs the command in a worker process, for
+            CPU-heavy commands; it must then be a module-level function.
+        timeout: Seconds the command may run. None uses
+            ``BotConfig.command_timeout_seconds``.
+        cache: Reuse the command's rendered responses, for idempotent
+            commands. See ``CachePolicy``.
+        single_flight: Identical invocations arriving while one is running
+            wait for it and share its responses. Implied by ``cache``.
 
     Returns:
         The original function, registered in the global command registry.
@@ -85,12 +111,22 @@ def command(
             handler=fn,
             backends=backends,
             is_class=False,
+            pool=pool,
+            execution=execution,
+            timeout=timeout,
+            cache=cache,
+            single_flight=single_flight,
         )
         _COMMAND_REGISTRY[name] = entry
         # Stash metadata on the function for introspection
         fn._command_name = name
         fn._command_help = help
         fn._command_backends = backends or []
+        fn._command_pool = pool
+        fn._command_execution = execution
+        fn._command_timeout = timeout
+        fn._command_cache = cache
+        fn._command_single_flight = single_flight
         return fn
 
     return decorator
@@ -136,6 +172,21 @@ class Command(BaseModel):
     backends: list[str] = Field(default_factory=list)
     """Backends this command supports. Empty = all."""
 
+    pool: str = "default"
+    """Worker pool the command runs on (see ``BotConfig.command_pools``)."""
+
+    execution: Literal["thread", "process"] = "thread"
+    """``"process"`` runs the command in a worker process, for CPU-heavy commands."""
+
+    timeout: float | None = None
+    """Seconds the command may run. None uses ``BotConfig.command_timeout_seconds``."""
+
+    cache: CachePolicy | None = None
+    """Reuse the command's rendered responses, for idempotent commands. See ``CachePolicy``."""
+
+    single_flight: bool = False
+    """Identical invocations arriving while one is running share its responses. Implied by ``cache``."""
+
     def execute(self, ctx: CommandContext) -> Any:
         """Execute the command. Override in subclasses.
 
@@ -7,12 +7,15 @@ from typing import Any
 from chatom import Message
 from chatom.format import Bold, Code, FormattedMessage, Heading, LineBreak, ListItem, Span, Table, Text, UnorderedList
 
+from csp_bot.render import get_render_cache, rows_key
 from csp_bot.structs import BotCommand
 
 from .base import BaseCommand, BaseCommandModel, ReplyCommand
 
 log = getLogger(__name__)
 
+_HELP_COLUMNS = ["Command", "Name", "Info"]
+
 
 def _command_backends(runner: Any) -> list:
     """Get backends list from either legacy or new command types."""
@@ -36,7 +39,7 @@ def _command_help(runner: Any) -> str:
 def _render_table_help(rows: list, backend: str) -> str:
     msg = FormattedMessage(metadata={"backend": backend})
     msg.content.append(Heading(child=Text(content="Bot Commands Help"), level=3))
-    msg.content.append(Table.from_dict_list(rows, columns=["Command", "Name", "Info"]))
+    msg.content.append(Table.from_dict_list(rows, columns=_HELP_COLUMNS))
     return msg.render_for(backend)
 
 
@@ -66,9 +69,8 @@ def _render_list_help(rows: list, backend: str) -> str:
 
 
 def _render_help(rows: list, backend: str) -> str:
-    if backend.lower() == "symphony":
-        return _render_table_help(rows, backend)
-    return _render_list_help(rows, backend)
+    render = _render_table_help if backend.lower() == "symphony" else _render_list_help
+    return get_render_cache().get_or_render(backend, ("help", rows_key(rows, _HELP_COLUMNS)), lambda: render(rows, backend))
 
 
 class HelpCommand(ReplyCommand):
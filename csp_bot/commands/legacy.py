@@ -50,6 +50,10 @@ class LegacyCommandAdapter:
     def backends(self) -> list[str]:
         return self._command.backends()
 
+    @property
+    def pool(self) -> str:
+        return self._command.pool()
+
     def context_to_bot_command(self, ctx: CommandContext) -> BotCommand:
         """Convert a CommandContext back to a legacy BotCommand."""
         return BotCommand(
@@ -0,0 +1,164 @@
+"""Pool of background event loops for async commands.
+
+Async commands and async generators run on one of several event loops,
+each in its own daemon thread, so a coroutine that blocks its loop (CPU
+work, a blocking library call) only stalls the commands sharing that
+loop. Commands are assigned to loops by rendezvous hashing of their
+command name or channel, so the same key always lands on the same loop
+and resizing the pool moves as few keys as possible.
+
+Each loop runs a heartbeat that measures how late it wakes up. The lag is
+published as the ``async.loop_lag.<n>`` gauge, and every wakeup later than
+``slow_callback_seconds`` counts as ``async.slow_callbacks.<n>``. A loop
+whose heartbeat is overdue is considered blocked, and new work for its keys
+goes to the next loop in their ranking until it recovers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Any
+
+from csp_bot.metrics import Metrics
+
+__all__ = ("EventLoopPool",)
+
+log = logging.getLogger(__name__)
+
+
+class _LoopShard:
+    """One event loop of the pool and its heartbeat state."""
+
+    __slots__ = ("index", "lag", "last_beat", "loop", "thread")
+
+    def __init__(self, index: int, loop: asyncio.AbstractEventLoop, thread: threading.Thread):
+        self.index = index
+        self.loop = loop
+        self.thread = thread
+        self.lag = 0.0
+        self.last_beat = time.monotonic()
+
+
+def _cancel_and_stop(loop: asyncio.AbstractEventLoop) -> None:
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    # Runs after the cancelled tasks have unwound
+    loop.call_soon(loop.stop)
+
+
+class EventLoopPool:
+    """Fixed set of background event loops, sharded by command name or channel.
+
+    Args:
+        size: Number of event loops.
+        use_uvloop: Create uvloop loops when uvloop is installed.
+        shard_by: ``"command"`` or ``"channel"``: what a command's loop is chosen by.
+        slow_callback_seconds: Heartbeat lag counted as a slow callback.
+        heartbeat_seconds: How often each loop measures its lag.
+        metrics: Where lag and slow callbacks are recorded.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        use_uvloop: bool = False,
+        shard_by: str = "command",
+        slow_callback_seconds: float = 0.1,
+        heartbeat_seconds: float = 1.0,
+        metrics: Metrics | None = None,
+    ):
+        self.size = max(1, size)
+        self.use_uvloop = use_uvloop
+        self.shard_by = shard_by
+        self.slow_callback_seconds = slow_callback_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._shards: list[_LoopShard] = []
+        self._lock = threading.Lock()
+
+    def key_for(self, ctx: Any) -> str:
+        """Return the sharding key of a command context."""
+        if self.shard_by == "channel":
+            channel = getattr(ctx, "channel", None)
+            return str(getattr(channel, "id", "") or "")
+        return str(getattr(ctx, "command_name", "") or "")
+
+    def ranking(self, key: str) -> list[int]:
+        """Return loop indexes in order of preference for ``key``."""
+        if self.size == 1:
+            return [0]
+        weights = {index: int.from_bytes(hashlib.blake2b(f"{index}:{key}".encode(), digest_size=8).digest(), "big") for index in range(self.size)}
+        return sorted(weights, key=weights.__getitem__, reverse=True)
+
+    def loop_for(self, key: str = "") -> asyncio.AbstractEventLoop:
+        """Return the loop ``key`` runs on: its first-ranked loop that is not blocked."""
+        shards = self._start()
+        ranking = self.ranking(key)
+        now = time.monotonic()
+        for index in ranking:
+            if not self._is_blocked(shards[index], now):
+                return shards[index].loop
+        return shards[ranking[0]].loop
+
+    def lags(self) -> dict[int, float]:
+        """Return the last measured lag of each loop, in seconds."""
+        return {shard.index: shard.lag for shard in self._shards}
+
+    def blocked(self) -> list[int]:
+        """Return the indexes of loops whose heartbeat is overdue."""
+        now = time.monotonic()
+        return [shard.index for shard in self._shards if self._is_blocked(shard, now)]
+
+    def close(self) -> None:
+        """Cancel everything running on the loops and stop them."""
+        with self._lock:
+            shards, self._shards = self._shards, []
+        for shard in shards:
+            shard.loop.call_soon_threadsafe(_cancel_and_stop, shard.loop)
+
+    def _is_blocked(self, shard: _LoopShard, now: float) -> bool:
+        return now - shard.last_beat > self.heartbeat_seconds + self.slow_callback_seconds
+
+    def _start(self) -> list[_LoopShard]:
+        shards = self._shards
+        if shards:
+            return shards
+        with self._lock:
+            if not self._shards:
+                self._shards = [self._start_loop(index) for index in range(self.size)]
+            return self._shards
+
+    def _new_loop(self) -> asyncio.AbstractEventLoop:
+        if self.use_uvloop:
+            try:
+                import uvloop
+
+                return uvloop.new_event_loop()
+            except ImportError:
+                log.warning("uvloop is not installed; using asyncio event loops")
+                self.use_uvloop = False
+        return asyncio.new_event_loop()
+
+    def _start_loop(self, index: int) -> _LoopShard:
+        loop = self._new_loop()
+        name = "csp-bot-async-loop" if self.size == 1 else f"csp-bot-async-loop-{index}"
+        thread = threading.Thread(target=loop.run_forever, name=name, daemon=True)
+        shard = _LoopShard(index, loop, thread)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(self._heartbeat(shard), loop)
+        return shard
+
+    async def _heartbeat(self, shard: _LoopShard) -> None:
+        while True:
+            expected = time.monotonic() + self.heartbeat_seconds
+            await asyncio.sleep(self.heartbeat_seconds)
+            shard.last_beat = time.monotonic()
+            shard.lag = max(0.0, shard.last_beat - expected)
+            self._metrics.set(f"async.loop_lag.{shard.index}", shard.lag)
+            if shard.lag >= self.slow_callback_seconds:
+                self._metrics.incr(f"async.slow_callbacks.{shard.index}")
+                log.warning(f"Event loop {shard.index} was blocked for {shard.lag:.3f}s; an async command is doing blocking work")
@@ -0,0 +1,269 @@
+"""Process-pool execution for CPU-heavy commands.
+
+Commands declared with ``execution="process"`` run in a pool of worker
+processes, so number crunching (pandas tables and the like) does not hold
+the bot process's GIL while the csp engine is handling messages.
+
+The command receives a slimmed-down ``CommandContext``: injected ``deps``
+are dropped and the original message loses its raw platform payload, so
+the context pickles cheaply. The command's raw return values (strings,
+``FormattedMessage`` trees, ...) are pickled back and coerced into chatom
+``Message`` objects in the bot process. Results larger than
+``shared_memory_bytes`` are handed back through a shared memory block
+rather than the pool's pipe; blocks whose result was never read are
+unlinked when the pool shuts down.
+
+The command callable itself must be picklable: a module-level function
+for ``@command``, or a ``Command`` whose fields pickle.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any
+
+from chatom import Message
+
+from csp_bot.structs import BotCommand
+
+from .context import CommandContext
+from .executor import CommandTimeout, _coerce_response
+
+__all__ = (
+    "ProcessCommandPool",
+    "slim_context",
+)
+
+log = logging.getLogger(__name__)
+
+
+def slim_context(ctx: CommandContext) -> CommandContext:
+    """Return a copy of ``ctx`` that is cheap to send to another process."""
+    message = ctx.message
+    if message is not None:
+        message = message.model_copy(update={"raw": None, "reply_to": None, "forwarded_from": None})
+    return CommandContext(
+        command_name=ctx.command_name,
+        source=ctx.source,
+        targets=list(ctx.targets),
+        channel=ctx.channel,
+        message=message,
+        args=list(ctx.args),
+        args_text=ctx.args_text,
+        backend=ctx.backend,
+        bot=ctx.bot,
+        deps=None,
+    )
+
+
+def _pack(items: list[Any], shared_memory_bytes: int, block_prefix: str) -> tuple[str, Any, int]:
+    payload = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+    if shared_memory_bytes <= 0 or len(payload) < shared_memory_bytes:
+        return "inline", payload, len(payload)
+    # Named after the pool so the pool can find blocks that were never read
+    block = shared_memory.SharedMemory(name=f"{block_prefix}{uuid.uuid4().hex[:12]}", create=True, size=len(payload))
+    block.buf[: len(payload)] = payload
+    block.close()
+    # The bot process unlinks the block once it has read it
+    resource_tracker.unregister(block._name, "shared_memory")
+    return "shm", block.name, len(payload)
+
+
+def _unpack(packed: tuple[str, Any, int]) -> list[Any]:
+    kind, payload, size = packed
+    if kind == "inline":
+        return pickle.loads(payload)
+    block = shared_memory.SharedMemory(name=payload)
+    try:
+        return pickle.loads(block.buf[:size])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _discard(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        _unpack(future.result())
+
+
+def _unlink_blocks(block_prefix: str) -> int:
+    """Unlink the result blocks named with ``block_prefix`` that were never read.
+
+    Only platforms that expose shared memory under ``/dev/shm`` are scanned.
+    """
+    try:
+        names = [name for name in os.listdir("/dev/shm") if name.startswith(block_prefix)]
+    except OSError:
+        return 0
+    for name in names:
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()
+    return len(names)
+
+
+async def _drain_async(fn: Any, ctx: CommandContext) -> list[Any]:
+    items = []
+    async for item in fn(ctx):
+        if item is None:
+            break
+        items.append(item)
+    return items
+
+
+def _run_in_process(fn: Any, ctx: CommandContext, timeout: float, shared_memory_bytes: int, block_prefix: str) -> tuple[str, Any, int]:
+    """Worker-process body: run ``fn`` and return its packed raw results."""
+    if inspect.isasyncgenfunction(fn):
+        items = asyncio.run(asyncio.wait_for(_drain_async(fn, ctx), timeout))
+    elif inspect.iscoroutinefunction(fn):
+        items = [asyncio.run(asyncio.wait_for(fn(ctx), timeout))]
+    elif inspect.isgeneratorfunction(fn):
+        items = []
+        for item in fn(ctx):
+            if item is None:
+                break
+            items.append(item)
+    else:
+        items = [fn(ctx)]
+    return _pack(items, shared_memory_bytes, block_prefix)
+
+
+def _warm() -> None:
+    pass
+
+
+class ProcessCommandPool:
+    """A pool of worker processes running commands declared with ``execution="process"``.
+
+    Workers are started with the ``spawn`` method, which is safe in a
+    process that is already running csp and adapter threads.
+
+    A command that times out is still running in its worker, and a worker
+    cannot be stopped without breaking its whole pool. The pool is
+    therefore replaced: new commands go to fresh workers, and the old
+    workers are terminated as soon as the other commands they are running
+    have finished.
+
+    Args:
+        workers: Worker processes.
+        shared_memory_bytes: Results at least this large are returned
+            through shared memory. 0 always uses the pool's pipe.
+    """
+
+    def __init__(self, workers: int = 2, shared_memory_bytes: int = 1024 * 1024):
+        self.workers = workers
+        self.shared_memory_bytes = shared_memory_bytes
+        self._executor: ProcessPoolExecutor | None = None
+        # Commands running per executor, including replaced ones
+        self._running: dict[ProcessPoolExecutor, int] = {}
+        self._retired: set[ProcessPoolExecutor] = set()
+        # Bumped by shutdown so a pending restart does not start a new pool
+        self._generation = 0
+        self._block_prefix = f"cspbot{uuid.uuid4().hex[:8]}_"
+        self._lock = threading.Lock()
+
+    def start(self, generation: int | None = None) -> None:
+        """Start every worker process now instead of on first use.
+
+        With ``generation``, only if the pool has not been shut down since.
+        """
+        with self._lock:
+            if self._executor is not None or (generation is not None and generation != self._generation):
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            futures = [self._executor.submit(_warm) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        log.info(f"Started {self.workers} command worker processes")
+
+    def run(self, fn: Any, ctx: CommandContext, timeout: float | None = 60.0) -> list[Message | BotCommand | None]:
+        """Run ``fn(ctx)`` in a worker process and return its responses."""
+        executor = self._acquire()
+        try:
+            future = executor.submit(_run_in_process, fn, slim_context(ctx), timeout, self.shared_memory_bytes, self._block_prefix)
+            items = _unpack(future.result(timeout=timeout))
+        except concurrent.futures.TimeoutError:
+            # Free the result's shared memory block if it arrives before the worker is stopped
+            future.cancel()
+            future.add_done_callback(_discard)
+            self._retire(executor)
+            log.error(f"Command {ctx.command_name} timed out after {timeout}s in a worker process; replacing the worker pool")
+            raise CommandTimeout(f"Command exceeded {timeout}s") from None
+        except Exception:
+            log.exception(f"Error executing command {ctx.command_name} in a worker process")
+            raise
+        finally:
+            self._release(executor)
+        return [_coerce_response(item, ctx.backend) for item in items]
+
+    def shutdown(self) -> None:
+        """Stop every worker process, including any still running a command, and free unread results.
+
+        The pool starts again on its next use.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            executors = self._retired | ({executor} if executor is not None else set())
+            self._retired = set()
+            self._running.clear()
+            self._generation += 1
+        for old in executors:
+            _terminate(old, wait=True)
+        leaked = _unlink_blocks(self._block_prefix)
+        if leaked:
+            log.info(f"Unlinked {leaked} unread shared memory results")
+
+    def _acquire(self) -> ProcessPoolExecutor:
+        while True:
+            self.start()
+            with self._lock:
+                executor = self._executor
+                if executor is not None:
+                    self._running[executor] = self._running.get(executor, 0) + 1
+                    return executor
+
+    def _release(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            running = self._running.get(executor, 1) - 1
+            if running > 0:
+                self._running[executor] = running
+                return
+            self._running.pop(executor, None)
+            if executor not in self._retired:
+                return
+            self._retired.discard(executor)
+        _terminate(executor)
+
+    def _retire(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if executor in self._running:
+                self._retired.add(executor)
+            generation = self._generation
+        # Spawning workers takes seconds; do it before the next command needs them
+        threading.Thread(target=self.start, args=(generation,), name="csp-bot-process-pool-restart", daemon=True).start()
+
+
+def _terminate(executor: ProcessPoolExecutor, wait: bool = False) -> None:
+    """Stop the workers of a pool, including any still running a timed-out command."""
+    processes = list((executor._processes or {}).values())
+    for process in processes:
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+    if wait:
+        for process in processes:
+            process.join()
@@ -7,10 +7,11 @@ from logging import getLogger
 from typing import TYPE_CHECKING
 
 from chatom import Message
-from chatom.format import Bold, FormattedMessage, Table, Text
+from chatom.format import Bold, FormattedMessage, Text
 from croniter import CroniterBadCronError, croniter
 from dateparser import parse
 
+from csp_bot.render import render_table
 from csp_bot.structs import BotCommand
 
 from .base import BaseCommand, BaseCommandModel, ReplyCommand
@@ -118,7 +119,7 @@ class ScheduleCommand(ReplyCommand):
 
         msg = FormattedMessage(metadata={"backend": command.backend})
         msg.content.append(Bold(child=Text(content="Scheduled Commands")))
-        msg.content.append(Table.from_dict_list(rows, columns=["ID", "Command"]))
+        msg.content.append(render_table(rows, ["ID", "Command"], command.backend))
 
         return Message(
             content=msg.render_for(command.backend),
@@ -0,0 +1,82 @@
+"""Single-flight execution of identical concurrent command invocations.
+
+When several people send the same command at once (ten ``/price XYZ``
+within a second of a market event), only the first invocation runs. The
+others wait for it and share its responses, each re-addressed to the
+channel and thread it was sent from. This removes the thundering herd on
+upstream services before a result cache has an entry to serve.
+
+Commands opt in with ``single_flight=True``; commands with a
+``CachePolicy`` always run single-flight, keyed like their cache.
+Invocations are identical when they have the same command, backend and
+arguments, with surrounding whitespace ignored.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any
+
+__all__ = ("SingleFlight",)
+
+
+class _Flight:
+    """One running invocation and what its waiters receive."""
+
+    __slots__ = ("done", "error", "origin", "result", "waiters")
+
+    def __init__(self, origin: Any):
+        self.origin = origin
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time, sharing its outcome with concurrent callers."""
+
+    __slots__ = ("_flights", "_lock")
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Hashable, origin: Any, fn: Callable[[], Any]) -> tuple[Any, Any]:
+        """Call ``fn`` unless a call for ``key`` is already running, then wait for that one instead.
+
+        Returns ``(result, origin)`` where ``origin`` is None for the caller
+        that ran ``fn`` and the leader's ``origin`` for callers that waited.
+        Exceptions raised by ``fn`` are raised to every caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(origin)
+            else:
+                flight.waiters += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, flight.origin
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, None
+
+    def waiting(self, key: Hashable) -> int:
+        """Return how many callers are waiting on the running call for ``key``."""
+        flight = self._flights.get(key)
+        return flight.waiters if flight is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
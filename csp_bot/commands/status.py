@@ -14,6 +14,7 @@ import psutil
 from chatom import Message
 from chatom.format import Bold, FormattedMessage, Table, Text
 
+from csp_bot.metrics import Metrics
 from csp_bot.structs import BotCommand
 
 from .base import BaseCommand, BaseCommandModel, ReplyCommand
@@ -31,6 +32,7 @@ class StatusCommand(ReplyCommand):
     """Display bot and system status."""
 
     _adapters: ClassVar[list[str]] = []
+    _metrics: ClassVar[dict[str, float]] = {}
 
     def command(self) -> str:
         return "status"
@@ -43,6 +45,8 @@ class StatusCommand(ReplyCommand):
 
     def preexecute(self, command: BotCommand, bot_instance: "Bot") -> BotCommand:
         self._adapters = list(bot_instance._adapters.keys())
+        metrics = getattr(bot_instance, "_metrics", None)
+        self._metrics = metrics.snapshot() if isinstance(metrics, Metrics) else {}
         return command
 
     def execute(self, command: BotCommand) -> Message | None:
@@ -62,6 +66,7 @@ class StatusCommand(ReplyCommand):
             {"Metric": "PID", "Value": str(proc.pid)},
             {"Metric": "Active Threads", "Value": str(active_count())},
         ]
+        rows.extend({"Metric": name, "Value": f"{value:g}"} for name, value in self._metrics.items())
 
         msg = FormattedMessage(metadata={"backend": command.backend})
         msg.content.append(Bold(child=Text(content="Bot Status")))
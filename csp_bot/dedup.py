@@ -0,0 +1,77 @@
+"""Bounded, time-windowed index of recently sent outgoing messages.
+
+Outgoing messages are identified by their ID when they have one, and
+otherwise by a hash of their backend, channel, thread and content. A
+message whose key was seen within the window is a duplicate. The index
+holds at most ``max_entries`` keys, evicting the least recently seen.
+"""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from chatom import Message
+
+from .utils import message_backend, message_thread_id
+
+__all__ = (
+    "DedupIndex",
+    "message_key",
+)
+
+
+def message_key(msg: Message) -> tuple[str, Hashable]:
+    """Return the dedup key for an outgoing message.
+
+    The first element is ``"id"`` or ``"content"`` so callers can use a
+    different window for each kind of key.
+    """
+    if msg.id:
+        return "id", msg.id
+    return "content", hash((message_backend(msg), msg.channel_id, message_thread_id(msg), msg.content or ""))
+
+
+class DedupIndex:
+    """LRU set of keys that each expire after their own window.
+
+    Args:
+        max_entries: Maximum keys remembered; least recently seen are evicted.
+    """
+
+    __slots__ = ("_entries", "max_entries")
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+
+    def seen(self, key: Hashable, now: float, ttl: float) -> bool:
+        """Record ``key`` and return whether it was already seen within its window.
+
+        The window runs from the first time the key was seen, so a steady
+        stream of duplicates does not keep it open forever.
+        """
+        entries = self._entries
+        expires_at = entries.get(key)
+        if expires_at is not None and expires_at > now:
+            entries.move_to_end(key)
+            return True
+        entries[key] = now + ttl
+        entries.move_to_end(key)
+        self._evict(now)
+        return False
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        entries = self._entries
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        # Drop expired keys from the least recently seen end
+        while entries:
+            key, expires_at = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            del entries[key]
@@ -0,0 +1,143 @@
+"""Registry of the bot's own identity on each backend.
+
+The bot's user ID and display name are needed for every incoming message,
+so reads must never wait on the network. The registry fetches identities
+concurrently at startup and keeps retrying (or refreshing) them on a
+background thread; until a backend's identity has been fetched, reads
+return it in the ``unknown`` state.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging import getLogger
+
+from chatom import User
+
+from .metrics import Metrics
+
+__all__ = (
+    "BotIdentity",
+    "IdentityRegistry",
+    "IdentityState",
+)
+
+log = getLogger(__name__)
+
+
+class IdentityState:
+    """Whether a backend's bot identity has been fetched."""
+
+    UNKNOWN = "unknown"
+    KNOWN = "known"
+
+
+class BotIdentity:
+    """The bot's identity on one backend."""
+
+    __slots__ = ("backend", "id", "name", "state")
+
+    def __init__(self, backend: str, id: str | None, name: str | None):
+        self.backend = backend
+        self.id = id
+        self.name = name
+        self.state = IdentityState.KNOWN if id else IdentityState.UNKNOWN
+
+    @property
+    def known(self) -> bool:
+        return self.state == IdentityState.KNOWN
+
+
+class IdentityRegistry:
+    """Bot identities per backend, refreshed off the engine thread.
+
+    Args:
+        fetch: Blocking call returning the bot user for a backend, or None.
+        ids: Mapping of backend to bot user ID, updated in place.
+        names: Mapping of backend to bot name, updated in place.
+        metrics: Where fetch failures are counted.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], User | None],
+        ids: dict[str, str],
+        names: dict[str, str],
+        metrics: Metrics,
+    ):
+        self._fetch = fetch
+        self._ids = ids
+        self._names = names
+        self._metrics = metrics
+        self._fetched_at: dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get(self, backend: str) -> BotIdentity:
+        """Return the cached identity for a backend. Never does I/O."""
+        return BotIdentity(backend, self._ids.get(backend), self._names.get(backend))
+
+    def refresh(self, backend: str) -> bool:
+        """Fetch one backend's identity, blocking. Returns whether it succeeded."""
+        try:
+            user = self._fetch(backend)
+        except Exception:
+            log.exception("Error fetching bot info for %s", backend)
+            user = None
+        if user is None or not user.id:
+            self._metrics.incr("identity.fetch_failures")
+            self._metrics.incr(f"identity.fetch_failures.{backend}")
+            return False
+
+        self._ids[backend] = user.id
+        self._names[backend] = user.name or user.display_name or ""
+        self._fetched_at[backend] = time.monotonic()
+        log.info(f"Bot info for {backend}: id={user.id}, name={self._names[backend]}")
+        return True
+
+    def refresh_all(self, backends: Iterable[str], timeout: float | None = None) -> None:
+        """Fetch identities for several backends concurrently.
+
+        Waits at most ``timeout`` seconds; fetches still running after that
+        complete in the background.
+        """
+        backends = list(backends)
+        if not backends:
+            return
+        executor = ThreadPoolExecutor(max_workers=len(backends), thread_name_prefix="csp-bot-identity")
+        futures = [executor.submit(self.refresh, backend) for backend in backends]
+        executor.shutdown(wait=False)
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            log.warning(f"Bot info fetch still running after {timeout}s; continuing with unknown identities")
+
+    def start(self, backends: Iterable[str], retry_seconds: float, refresh_seconds: float) -> None:
+        """Start the background refresh thread.
+
+        Unknown identities are retried every ``retry_seconds``; known ones are
+        re-fetched every ``refresh_seconds`` (0 disables re-fetching).
+        """
+        if self._thread is not None or retry_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(list(backends), retry_seconds, refresh_seconds),
+            name="csp-bot-identity-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        self._thread = None
+
+    def _run(self, backends: list[str], retry_seconds: float, refresh_seconds: float) -> None:
+        while not self._stop.wait(retry_seconds):
+            now = time.monotonic()
+            for backend in backends:
+                fetched_at = self._fetched_at.get(backend)
+                if backend not in self._ids or (refresh_seconds > 0 and (fetched_at is None or now - fetched_at >= refresh_seconds)):
+                    self.refresh(backend)
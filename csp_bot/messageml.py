@@ -0,0 +1,113 @@
+"""MessageML/PresentationML to plain-text extraction.
+
+Symphony delivers message bodies as markup. The bot only needs the plain
+text (to find commands) and the users mentioned inline via
+``<mention uid="..."/>`` tags, so both are produced together here instead
+of by a chain of regex substitutions followed by a separate mention parse.
+
+The text matches what the previous substitution chain produced:
+
+- ``<br>``, ``</p>`` and ``</div>`` become a newline and swallow any
+  whitespace that follows them (a closing ``</p>``/``</div>`` also swallows
+  the breaks that directly follow it, as the chain did)
+- every other tag is removed
+- HTML entities are unescaped
+- the result is stripped of leading and trailing whitespace
+"""
+
+import html
+import re
+
+__all__ = (
+    "MessageMLMention",
+    "MessageMLText",
+    "extract_text",
+)
+
+# All three block breaks in one pass; the alternation order reproduces the
+# br -> </p> -> </div> substitution order of the old chain.
+_BREAK_RE = re.compile(r"<(?i:/div>(?:\s|<br\s*/?>|</p>)*|/p>(?:\s|<br\s*/?>)*|br\s*/?>\s*)")
+_MENTION_RE = re.compile(r'<mention\s+(?:uid|email)="([^"]+)"\s*/>')
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Placeholder left where a mention tag was so its offset survives tag removal
+# and unescaping. NUL is not allowed in XML, so it cannot occur in MessageML.
+_MARK = "\x00"
+
+
+class MessageMLMention:
+    """A ``<mention/>`` tag found while extracting text.
+
+    Attributes:
+        user_id: The mentioned user's ID, or email for ``email=`` mentions.
+        offset: Position in the extracted plain text where the tag was.
+    """
+
+    __slots__ = ("offset", "user_id")
+
+    def __init__(self, user_id: str, offset: int):
+        self.user_id = user_id
+        self.offset = offset
+
+    def __repr__(self) -> str:
+        return f"MessageMLMention(user_id={self.user_id!r}, offset={self.offset})"
+
+
+class MessageMLText:
+    """Plain text and inline mentions extracted from a markup payload."""
+
+    __slots__ = ("mentions", "text")
+
+    def __init__(self, text: str, mentions: list[MessageMLMention]):
+        self.text = text
+        self.mentions = mentions
+
+    @property
+    def mention_ids(self) -> list[str]:
+        """IDs of mentioned users, in document order."""
+        return [m.user_id for m in self.mentions]
+
+
+def extract_text(content: str) -> MessageMLText:
+    """Extract plain text and ``<mention/>`` tags from MessageML.
+
+    Args:
+        content: MessageML or PresentationML markup.
+
+    Returns:
+        A MessageMLText holding the plain text and mentions. Mention offsets
+        refer to the returned (stripped) text.
+    """
+    if not content:
+        return MessageMLText("", [])
+
+    text = content
+    mention_ids: list[str] = []
+    if "<" in text:
+        text = _BREAK_RE.sub("\n", text)
+        if "<mention" in text:
+            mention_ids = _MENTION_RE.findall(text)
+            if mention_ids:
+                text = _MENTION_RE.sub(_MARK, text.replace(_MARK, ""))
+        text = _TAG_RE.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+
+    if not mention_ids:
+        return MessageMLText(text.strip(), [])
+
+    # Turn placeholders into offsets, removing them as we go
+    chunks = text.split(_MARK)
+    mentions = []
+    offset = 0
+    for user_id, chunk in zip(mention_ids, chunks):
+        offset += len(chunk)
+        mentions.append(MessageMLMention(user_id, offset))
+    text = "".join(chunks)
+
+    stripped = text.strip()
+    lead = len(text) - len(text.lstrip())
+    size = len(stripped)
+    for mention in mentions:
+        mention.offset = min(max(mention.offset - lead, 0), size)
+    return MessageMLText(stripped, mentions)
@@ -0,0 +1,39 @@
+"""In-process counters and gauges for bot health.
+
+Components record events here (failed fetches, dropped messages, cache
+hits, ...) and the ``/status`` command reports them. Names are dotted,
+e.g. ``identity.fetch_failures.slack``.
+"""
+
+import threading
+
+__all__ = ("Metrics",)
+
+
+class Metrics:
+    """Thread-safe named counters and gauges."""
+
+    __slots__ = ("_lock", "_values")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, float] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Add ``value`` to a counter."""
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        """Set a gauge to ``value``."""
+        with self._lock:
+            self._values[name] = value
+
+    def get(self, name: str, default: float = 0) -> float:
+        """Return the current value of a counter or gauge."""
+        return self._values.get(name, default)
+
+    def snapshot(self) -> dict[str, float]:
+        """Return a copy of all values, sorted by name."""
+        with self._lock:
+            return dict(sorted(self._values.items()))
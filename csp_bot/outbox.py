@@ -0,0 +1,206 @@
+"""Durable delivery of outgoing messages.
+
+Every outgoing message is recorded in a ``StateStore`` before it is handed
+to an adapter and removed once the adapter reports it as sent. A message
+that is not acknowledged in time is sent again, backing off exponentially
+(with jitter) while its backend keeps failing; after too many attempts it
+is moved to a dead-letter namespace. Messages still recorded when the bot
+restarts are sent again on startup.
+
+Delivery is at-least-once: a message whose acknowledgement is lost is
+posted twice.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from logging import getLogger
+
+from chatom import Message
+
+from .metrics import Metrics
+from .persistence import StateStore
+from .utils import message_backend
+
+__all__ = (
+    "Outbox",
+    "OutboxRecord",
+)
+
+log = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboxRecord:
+    """Persistent representation of an unacknowledged outgoing message."""
+
+    outbox_id: str
+    backend: str
+    message: Message
+    attempts: int
+    retry_at: datetime
+    created_at: datetime
+
+
+class Outbox:
+    """Typed repository and retry policy for outgoing messages.
+
+    Args:
+        store: Where pending and dead-lettered messages are kept.
+        ack_seconds: How long to wait for an acknowledgement before resending.
+        retry_seconds: Backoff after the first failure on a backend; doubles
+            with each further consecutive failure.
+        max_retry_seconds: Upper bound on the backoff.
+        max_attempts: Sends before a message is dead-lettered.
+        metrics: Where acknowledgements, retries and dead letters are counted.
+        jitter: Returns a float in [0, 1); the backoff is scaled by 0.5-1.0.
+    """
+
+    namespace = "csp_bot.outbox"
+    dead_letter_namespace = "csp_bot.outbox.dead"
+
+    def __init__(
+        self,
+        store: StateStore,
+        ack_seconds: float = 30.0,
+        retry_seconds: float = 2.0,
+        max_retry_seconds: float = 300.0,
+        max_attempts: int = 8,
+        metrics: Metrics | None = None,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self._store = store
+        self.ack_seconds = ack_seconds
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.max_attempts = max_attempts
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        # In-memory index of retry deadlines, mirrored from the store
+        self._retry_at: dict[str, datetime] = {}
+        self._failures: dict[str, int] = {}
+
+    def add(self, msg: Message, now: datetime) -> OutboxRecord:
+        """Record a message that is about to be sent for the first time.
+
+        Tags ``msg.metadata["outbox_id"]`` so the acknowledgement can be
+        matched back to the record.
+        """
+        outbox_id = uuid.uuid4().hex
+        msg.metadata = {**(msg.metadata or {}), "outbox_id": outbox_id}
+        record = OutboxRecord(
+            outbox_id=outbox_id,
+            backend=message_backend(msg),
+            message=msg,
+            attempts=1,
+            retry_at=self._retry_deadline(message_backend(msg), now),
+            created_at=now,
+        )
+        self._save(record)
+        return record
+
+    def ack(self, msg: Message) -> bool:
+        """Mark a message as sent. Safe to call from any thread."""
+        outbox_id = (msg.metadata or {}).get("outbox_id")
+        if not outbox_id:
+            return False
+        with self._lock:
+            self._retry_at.pop(outbox_id, None)
+            self._failures.pop(message_backend(msg), None)
+        removed = self._store.delete(self.namespace, outbox_id)
+        if removed:
+            self._metrics.incr("outbox.acked")
+        return removed
+
+    def due(self, now: datetime) -> list[Message]:
+        """Return messages whose acknowledgement is overdue, to be sent again.
+
+        Each overdue message counts as a failure for its backend. Messages
+        that have used up their attempts are dead-lettered instead.
+        """
+        with self._lock:
+            overdue = [outbox_id for outbox_id, retry_at in self._retry_at.items() if retry_at <= now]
+        messages = []
+        for outbox_id in overdue:
+            record = self.get(outbox_id)
+            if record is None:
+                with self._lock:
+                    self._retry_at.pop(outbox_id, None)
+                continue
+            with self._lock:
+                self._failures[record.backend] = self._failures.get(record.backend, 0) + 1
+            self._metrics.incr(f"outbox.unacknowledged.{record.backend}")
+            resent = self._resend(record, now)
+            if resent is not None:
+                messages.append(resent)
+        return messages
+
+    def replay(self, now: datetime) -> list[Message]:
+        """Return every pending message, oldest first, to be sent again after a restart."""
+        messages = []
+        for record in self.records():
+            resent = self._resend(record, now)
+            if resent is not None:
+                messages.append(resent)
+        if messages:
+            log.info(f"Replaying {len(messages)} unacknowledged outgoing messages")
+        return messages
+
+    def next_retry_at(self) -> datetime | None:
+        """Return when the next unacknowledged message becomes overdue."""
+        with self._lock:
+            return min(self._retry_at.values(), default=None)
+
+    def get(self, outbox_id: str) -> OutboxRecord | None:
+        record = self._store.get(self.namespace, outbox_id)
+        if isinstance(record, OutboxRecord):
+            return record
+        return None
+
+    def records(self) -> list[OutboxRecord]:
+        records = [record.value for record in self._store.records(self.namespace) if isinstance(record.value, OutboxRecord)]
+        return sorted(records, key=lambda record: (record.created_at, record.outbox_id))
+
+    def dead_letters(self) -> list[OutboxRecord]:
+        records = [record.value for record in self._store.records(self.dead_letter_namespace) if isinstance(record.value, OutboxRecord)]
+        return sorted(records, key=lambda record: (record.created_at, record.outbox_id))
+
+    def backoff(self, backend: str) -> float:
+        """Return the extra wait before resending on a backend, in seconds."""
+        with self._lock:
+            failures = self._failures.get(backend, 0)
+        if failures <= 0:
+            return 0.0
+        delay = min(self.max_retry_seconds, self.retry_seconds * 2 ** (failures - 1))
+        return delay * (0.5 + self._jitter() / 2)
+
+    def _resend(self, record: OutboxRecord, now: datetime) -> Message | None:
+        if record.attempts >= self.max_attempts:
+            self._dead_letter(record)
+            return None
+        record = replace(record, attempts=record.attempts + 1, retry_at=self._retry_deadline(record.backend, now))
+        self._save(record)
+        self._metrics.incr("outbox.retries")
+        return record.message
+
+    def _dead_letter(self, record: OutboxRecord) -> None:
+        with self._lock:
+            self._retry_at.pop(record.outbox_id, None)
+        self._store.put(self.dead_letter_namespace, record.outbox_id, record)
+        self._store.delete(self.namespace, record.outbox_id)
+        self._metrics.incr(f"outbox.dead_letters.{record.backend}")
+        log.error(f"Giving up on outgoing message {record.outbox_id} to {record.backend} after {record.attempts} attempts")
+
+    def _retry_deadline(self, backend: str, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.ack_seconds + self.backoff(backend))
+
+    def _save(self, record: OutboxRecord) -> None:
+        self._store.put(self.namespace, record.outbox_id, record)
+        with self._lock:
+            self._retry_at[record.outbox_id] = record.retry_at
@@ -0,0 +1,123 @@
+"""Bulkhead worker pools for command execution.
+
+Every command runs on the pool it declares (``"default"`` unless it says
+otherwise), so a slow command can only tie up the threads of its own pool
+and cannot starve commands in other pools. Each pool bounds how many of its
+commands may wait for a thread; a command submitted to a full pool is
+rejected instead of queued.
+"""
+
+import threading
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import getLogger
+from typing import Any
+
+from .bot_config import CommandPoolConfig
+
+__all__ = (
+    "DEFAULT_POOL",
+    "CommandPool",
+    "CommandPools",
+)
+
+log = getLogger(__name__)
+
+DEFAULT_POOL = "default"
+
+
+class CommandPool:
+    """A bounded thread pool for one class of commands.
+
+    Args:
+        name: Pool name, used for thread names and metrics.
+        workers: Threads executing commands. 0 means commands run inline.
+        max_queued: Commands that may wait for a thread. 0 means unbounded.
+        rejection: ``"reject"`` or ``"drop"``, see ``CommandPoolConfig``.
+    """
+
+    __slots__ = ("_executor", "_lock", "_pending", "max_queued", "name", "rejection", "workers")
+
+    def __init__(self, name: str, workers: int, max_queued: int = 0, rejection: str = "reject"):
+        self.name = name
+        self.workers = workers
+        self.max_queued = max_queued
+        self.rejection = rejection
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Commands running or waiting for a thread."""
+        return self._pending
+
+    def full(self) -> bool:
+        return self.max_queued > 0 and self._pending >= self.workers + self.max_queued
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Run ``fn(*args)`` on the pool, returning False if the pool is full."""
+        with self._lock:
+            if self.full():
+                return False
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"csp-bot-{self.name}")
+            executor = self._executor
+        executor.submit(fn, *args).add_done_callback(self._done)
+        return True
+
+    def shutdown(self) -> None:
+        """Stop the pool's threads once their running commands finish, dropping waiting ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+        if not future.cancelled() and future.exception() is not None:
+            log.error(f"Command in pool {self.name} failed", exc_info=future.exception())
+
+
+class CommandPools:
+    """The bot's command pools by name, created on first use.
+
+    Pools not listed in ``configs`` use the ``CommandPoolConfig`` defaults,
+    except the default pool, which uses ``default_workers`` threads and an
+    unbounded queue unless it is configured explicitly.
+
+    Args:
+        configs: Pool settings by name.
+        default_workers: Threads of the default pool when it is not configured.
+    """
+
+    __slots__ = ("_configs", "_default_workers", "_lock", "_pools")
+
+    def __init__(self, configs: Mapping[str, CommandPoolConfig], default_workers: int):
+        self._configs = dict(configs)
+        self._default_workers = default_workers
+        self._lock = threading.Lock()
+        self._pools: dict[str, CommandPool] = {}
+
+    def get(self, name: str) -> CommandPool:
+        name = name or DEFAULT_POOL
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                config = self._configs.get(name)
+                if config is None and name == DEFAULT_POOL:
+                    pool = CommandPool(name, self._default_workers)
+                else:
+                    config = config or CommandPoolConfig()
+                    pool = CommandPool(name, config.workers, config.max_queued, config.rejection)
+                self._pools[name] = pool
+            return pool
+
+    def shutdown(self) -> None:
+        """Shut down every pool created so far."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown()
@@ -0,0 +1,241 @@
+"""Token-bucket rate limiting for outgoing messages.
+
+Each backend has one bucket for the whole platform and one bucket per
+channel. A message is sent once both its channel's bucket and its
+backend's bucket have a token; otherwise it waits in its channel's queue.
+Channels are served round-robin so a burst to one channel cannot use up
+the backend's tokens ahead of every other channel, and a channel that is
+being throttled never delays messages to other channels.
+"""
+
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from logging import getLogger
+
+from chatom import Message
+
+from .metrics import Metrics
+from .structs import MessagePriority
+from .utils import message_backend, message_thread_id
+
+__all__ = (
+    "OutboundRateLimiter",
+    "TokenBucket",
+)
+
+log = getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens per second.
+
+    Args:
+        rate: Tokens added per second. 0 or less means unlimited.
+        burst: Maximum tokens held, i.e. the largest burst allowed at once.
+        now: Time the bucket is created, in seconds. It starts full.
+    """
+
+    __slots__ = ("burst", "rate", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def available(self, now: float) -> bool:
+        """Return whether a token can be taken at ``now``."""
+        if self.rate <= 0:
+            return True
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def take(self) -> None:
+        """Consume one token. Call only after :meth:`available` returned True."""
+        if self.rate > 0:
+            self.tokens -= 1.0
+
+    def wait(self, now: float) -> float:
+        """Return seconds until a token is available (0 if one is now)."""
+        if self.available(now):
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        """Return whether the bucket has fully refilled, i.e. has been idle."""
+        if self.rate <= 0:
+            return True
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class _ChannelQueue:
+    """Messages queued for one channel, one FIFO lane per priority."""
+
+    __slots__ = ("lanes",)
+
+    def __init__(self):
+        self.lanes: list[deque[Message]] = [deque() for _ in MessagePriority]
+
+    def head_priority(self) -> int:
+        for priority in range(len(self.lanes) - 1, -1, -1):
+            if self.lanes[priority]:
+                return priority
+        return -1
+
+    def next_lane(self) -> deque[Message]:
+        return self.lanes[self.head_priority()]
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+
+class OutboundRateLimiter:
+    """Per-(backend, channel) and per-backend limits for outgoing messages.
+
+    Queued messages are sent in :class:`MessagePriority` order: within a
+    channel the highest priority lane goes first, and channels whose next
+    message has a higher priority are served first when they compete for
+    the backend's tokens. A status message replaces a status message still
+    queued for the same channel and thread. When more than ``max_queued``
+    messages are waiting, status messages are shed first, then bulk
+    messages, then replies, always from the channel with the most queued
+    messages of that priority.
+
+    Args:
+        limits: Returns ``(channel_rate, channel_burst, backend_rate, backend_burst)``
+            for a backend. Rates are messages per second; 0 means unlimited.
+        coalesce: Optional function popping the next post from a channel's
+            queue, e.g. merging several queued messages into one.
+        max_queued: Maximum messages waiting; 0 means unbounded.
+        metrics: Where superseded and shed messages are counted.
+    """
+
+    def __init__(
+        self,
+        limits: Callable[[str], tuple[float, float, float, float]],
+        coalesce: Callable[[deque[Message]], Message] | None = None,
+        max_queued: int = 0,
+        metrics: Metrics | None = None,
+    ):
+        self._limits = limits
+        self._coalesce = coalesce
+        self.max_queued = max_queued
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._backends: dict[str, TokenBucket] = {}
+        self._channels: dict[tuple[str, str], TokenBucket] = {}
+        # Channels with queued messages, in round-robin order
+        self._queues: OrderedDict[tuple[str, str], _ChannelQueue] = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def key(msg: Message) -> tuple[str, str]:
+        """Return the (backend, channel) a message is rate limited under."""
+        channel = msg.channel.id if msg.channel else ""
+        return message_backend(msg), channel or ""
+
+    def push(self, messages: Iterable[Message]) -> None:
+        """Queue messages for sending, shedding low priority ones if full."""
+        for msg in messages:
+            key = self.key(msg)
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = _ChannelQueue()
+            priority = MessagePriority.of(msg)
+            lane = queue.lanes[priority.value]
+            if priority is MessagePriority.STATUS and self._supersede(lane, msg):
+                continue
+            lane.append(msg)
+            self._size += 1
+        if self.max_queued and self._size > self.max_queued:
+            self._shed()
+
+    def drain(self, now: float) -> list[Message]:
+        """Return every queued message that may be sent at ``now``.
+
+        Takes one post per channel per pass until no channel can send.
+        """
+        ready: list[Message] = []
+        progressed = True
+        while progressed and self._queues:
+            progressed = False
+            # Stable sort keeps the round-robin order within a priority
+            for key in sorted(self._queues, key=lambda key: -self._queues[key].head_priority()):
+                backend_bucket, channel_bucket = self._buckets(key, now)
+                if not (channel_bucket.available(now) and backend_bucket.available(now)):
+                    continue
+                channel_bucket.take()
+                backend_bucket.take()
+                queue = self._queues.pop(key)
+                lane = queue.next_lane()
+                queued = len(lane)
+                ready.append(self._coalesce(lane) if self._coalesce is not None else lane.popleft())
+                self._size -= queued - len(lane)
+                if queue:
+                    # Move to the back of the round-robin order
+                    self._queues[key] = queue
+                progressed = True
+        self._prune(now)
+        return ready
+
+    def next_wakeup(self, now: float) -> float | None:
+        """Return seconds until a queued message can be sent, or None when idle."""
+        waits = []
+        for key in self._queues:
+            backend_bucket, channel_bucket = self._buckets(key, now)
+            waits.append(max(channel_bucket.wait(now), backend_bucket.wait(now)))
+        return min(waits) if waits else None
+
+    def queued(self, key: tuple[str, str]) -> int:
+        """Return how many messages are waiting for a (backend, channel)."""
+        queue = self._queues.get(key)
+        return len(queue) if queue is not None else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _supersede(self, lane: deque[Message], msg: Message) -> bool:
+        thread_id = message_thread_id(msg)
+        for i, queued in enumerate(lane):
+            if message_thread_id(queued) == thread_id:
+                lane[i] = msg
+                self._metrics.incr("outbound.superseded")
+                return True
+        return False
+
+    def _shed(self) -> None:
+        for priority in MessagePriority:
+            while self._size > self.max_queued:
+                lanes = [queue.lanes[priority.value] for queue in self._queues.values()]
+                lane = max(lanes, key=len, default=None)
+                if not lane:
+                    break
+                dropped = lane.popleft()
+                self._size -= 1
+                self._metrics.incr(f"outbound.shed.{priority.name.lower()}")
+                log.warning(f"Outgoing queue full; dropping {priority.name.lower()} message to {self.key(dropped)}")
+        for key in [key for key, queue in self._queues.items() if not queue]:
+            del self._queues[key]
+
+    def _buckets(self, key: tuple[str, str], now: float) -> tuple[TokenBucket, TokenBucket]:
+        backend = key[0]
+        backend_bucket = self._backends.get(backend)
+        channel_bucket = self._channels.get(key)
+        if backend_bucket is None or channel_bucket is None:
+            channel_rate, channel_burst, backend_rate, backend_burst = self._limits(backend)
+            if backend_bucket is None:
+                backend_bucket = self._backends[backend] = TokenBucket(backend_rate, backend_burst, now)
+            if channel_bucket is None:
+                channel_bucket = self._channels[key] = TokenBucket(channel_rate, channel_burst, now)
+        return backend_bucket, channel_bucket
+
+    def _prune(self, now: float) -> None:
+        # An idle, full bucket is indistinguishable from a new one
+        idle = [key for key, bucket in self._channels.items() if key not in self._queues and bucket.full(now)]
+        for key in idle:
+            del self._channels[key]
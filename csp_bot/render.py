@@ -0,0 +1,103 @@
+"""Memoized rendering of command output that repeats.
+
+Help text, schedule listings and similar tables are rebuilt from the same
+rows on almost every invocation. Hashing a ``FormattedMessage`` node tree
+costs more than rendering it, so instead of keying on the tree, callers
+key the cache on the plain data the tree is built from (the help rows, the
+table cells) plus the backend, and only build and render the tree on a
+miss.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from typing import Any
+
+from chatom.format import Table, get_format_for_backend
+
+__all__ = (
+    "RenderCache",
+    "get_render_cache",
+    "render_table",
+    "rows_key",
+)
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered strings keyed by backend and content key.
+
+    Args:
+        max_entries: Maximum rendered strings remembered.
+        max_chars: Maximum total characters held.
+    """
+
+    def __init__(self, max_entries: int = 256, max_chars: int = 4 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries: OrderedDict[tuple[str, Hashable], str] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, backend: str, key: Hashable, render: Callable[[], str]) -> str:
+        """Return the cached rendering for ``key`` on ``backend``, rendering on a miss."""
+        cache_key = (backend, key)
+        with self._lock:
+            rendered = self._entries.get(cache_key)
+            if rendered is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return rendered
+            self.misses += 1
+        rendered = render()
+        with self._lock:
+            if cache_key not in self._entries:
+                self._entries[cache_key] = rendered
+                self._chars += len(rendered)
+                self._evict()
+        return rendered
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counts and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "chars": self._chars}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+            _, rendered = self._entries.popitem(last=False)
+            self._chars -= len(rendered)
+
+
+def rows_key(rows: Sequence[Mapping[str, Any]], columns: Sequence[str]) -> tuple:
+    """Return a hashable key for the cells of ``rows`` in ``columns``."""
+    return tuple(columns), tuple(tuple(str(row.get(column, "")) for column in columns) for row in rows)
+
+
+def render_table(rows: Sequence[Mapping[str, Any]], columns: Sequence[str], backend: str) -> str:
+    """Render a table fragment for ``backend``, cached by its cells.
+
+    The fragment can be appended to ``FormattedMessage.content`` as a
+    string; it is emitted as-is.
+    """
+    return get_render_cache().get_or_render(
+        backend,
+        ("table", rows_key(rows, columns)),
+        lambda: Table.from_dict_list(list(rows), columns=list(columns)).render(get_format_for_backend(backend)),
+    )
+
+
+_cache = RenderCache()
+
+
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache."""
+    return _cache
@@ -0,0 +1,63 @@
+"""Backpressure for commands that stream their output.
+
+Generator commands running on a worker thread emit each item into the
+graph as soon as it is produced. Before emitting a message, a streaming
+command waits while the outbound rate limiter already holds
+``max_queued`` messages for the channel it is writing to, so a fast
+producer is slowed to the channel's send rate instead of filling memory.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+
+__all__ = ("StreamBackpressure",)
+
+
+class StreamBackpressure:
+    """Outgoing queue depth per channel, as seen by streaming commands.
+
+    Worker threads call :meth:`acquire` before emitting a message; the csp
+    node owning the rate limiter calls :meth:`update` after draining it.
+
+    Args:
+        max_queued: Messages a channel may have waiting before streams
+            writing to it are paused.
+    """
+
+    __slots__ = ("_backlog", "_cond", "max_queued")
+
+    def __init__(self, max_queued: int = 2):
+        self.max_queued = max_queued
+        self._cond = threading.Condition()
+        self._backlog: dict[Hashable, int] = {}
+
+    def acquire(self, key: Hashable, abandoned: Callable[[], bool], poll: float = 1.0) -> bool:
+        """Wait until ``key`` has room for another message, then count it as queued.
+
+        Returns False without waiting further once ``abandoned()`` is true,
+        e.g. because the graph has stopped.
+        """
+        with self._cond:
+            while self._backlog.get(key, 0) >= self.max_queued:
+                if abandoned():
+                    return False
+                self._cond.wait(poll)
+            # Counted until the next update reports the real depth
+            self._backlog[key] = self._backlog.get(key, 0) + 1
+            return True
+
+    def update(self, depth: Callable[[Hashable], int]) -> None:
+        """Refresh the depth of every channel being streamed to and wake waiters."""
+        with self._cond:
+            if not self._backlog:
+                return
+            for key in list(self._backlog):
+                queued = depth(key)
+                if queued:
+                    self._backlog[key] = queued
+                else:
+                    del self._backlog[key]
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._backlog)
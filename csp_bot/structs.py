@@ -15,6 +15,7 @@ __all__ = (
     "BotCommand",
     "BotMessage",
     "CommandVariant",
+    "MessagePriority",
 )
 
 
@@ -41,6 +42,33 @@ class CommandVariant(Enum):
     """Bot replies mentioning all tagged users."""
 
 
+class MessagePriority(Enum):
+    """Delivery priority of an outgoing message.
+
+    Set as ``metadata["priority"]`` (the member or its name); messages
+    without one are replies. Higher priorities are sent first and shed last.
+    """
+
+    STATUS = 0
+    """Progress chatter, e.g. "Thinking...". A newer status supersedes a queued one."""
+
+    BULK = 1
+    """Scheduled and broadcast output."""
+
+    REPLY = 2
+    """Direct replies to a user's command."""
+
+    @classmethod
+    def of(cls, msg: ChatomMessage) -> "MessagePriority":
+        """Return the priority of an outgoing message."""
+        value = (msg.metadata or {}).get("priority")
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str) and value.upper() in cls.__members__:
+            return cls[value.upper()]
+        return cls.REPLY
+
+
 class BotMessage(GatewayStruct):
     """Message representation for bot responses.
 
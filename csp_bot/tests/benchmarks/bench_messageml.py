@@ -0,0 +1,80 @@
+"""Benchmark MessageML extraction against the previous regex chain.
+
+Builds realistic Symphony payloads (cards, tables, mentions, entities) of
+roughly 10-100 KB and times ``extract_text`` against the previous
+``re.sub`` chain followed by ``parse_mentions``.
+
+Run with::
+
+    python -m csp_bot.tests.benchmarks.bench_messageml
+"""
+
+import html
+import re
+import timeit
+
+from chatom.base import parse_mentions
+
+from csp_bot.messageml import extract_text
+
+_SIZES_KB = (10, 25, 50, 100)
+
+
+def regex_chain(content: str) -> tuple[str, list[str]]:
+    """The previous multi-pass implementation."""
+    text = re.sub(r"<br\s*/?>\s*", "\n", content, flags=re.IGNORECASE)
+    text = re.sub(r"</p>\s*", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</div>\s*", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = html.unescape(text).strip()
+    mentions = [m.user_id for m in parse_mentions(content, "symphony")]
+    return text, mentions
+
+
+def symphony_message(size_kb: int) -> str:
+    """Build a MessageML payload of approximately ``size_kb`` kilobytes."""
+    header = (
+        '<div data-format="PresentationML" data-version="2.0" class="wysiwyg">'
+        '<p><mention uid="349026222344902"/> /report <b>daily</b> &amp; weekly</p>'
+        '<div class="card barStyle" data-icon-src="https://example.com/i.png">'
+        '<div class="cardHeader"><h3>Risk summary for &lt;desk&gt;</h3></div>'
+        '<div class="cardBody">'
+    )
+    row = (
+        '<tr><td>{i}</td><td>ACME Corp &amp; Sons</td><td class="num">1,234.{i}</td>'
+        '<td><span class="entity" data-entity-id="cashtag{i}">$ACME</span></td>'
+        "<td>{owner}</td></tr>"
+    )
+    footer = "</tbody></table></div></div><br/>Regards,<br /> the risk bot</div>"
+    parts = [header, "<table><thead><tr><th>#</th><th>Name</th><th>PnL</th><th>Tag</th><th>Owner</th></tr></thead><tbody>"]
+    size = sum(len(p) for p in parts) + len(footer)
+    i = 0
+    while size < size_kb * 1024:
+        # Row owners are tagged occasionally, as in escalation tables
+        owner = f'<mention uid="7{i:05d}"/>' if i % 25 == 0 else "desk"
+        chunk = row.format(i=i, owner=owner)
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    parts.append(footer)
+    return "".join(parts)
+
+
+def _best(fn, payload: str, number: int, repeat: int) -> float:
+    return min(timeit.repeat(lambda: fn(payload), number=number, repeat=repeat)) / number
+
+
+def main(number: int = 20, repeat: int = 5) -> None:
+    print(f"{'size':>8} {'regex chain':>14} {'extract_text':>14} {'speedup':>8}")
+    for size_kb in _SIZES_KB:
+        payload = symphony_message(size_kb)
+        expected = regex_chain(payload)
+        result = extract_text(payload)
+        assert (result.text, result.mention_ids) == expected, "extract_text diverged from the regex chain"
+        chain = _best(regex_chain, payload, number, repeat)
+        single = _best(extract_text, payload, number, repeat)
+        print(f"{len(payload) // 1024:>6}KB {chain * 1e3:>12.3f}ms {single * 1e3:>12.3f}ms {chain / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
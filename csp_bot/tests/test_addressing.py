@@ -0,0 +1,179 @@
+"""Tests for the per-backend address matcher."""
+
+from datetime import datetime, timedelta
+
+import csp
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotConfig
+from csp_bot.addressing import AddressMatcher, AddressReason
+from csp_bot.bot_config import SlackConfig
+from csp_bot.commands import EchoCommand
+
+
+class TestAddressMatcher:
+    def test_mention_by_id_strips_mention(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        match = matcher.match("<@UBOT> /echo hi", [User(id="UBOT")])
+
+        assert match is not None
+        assert match.reason == AddressReason.MENTION
+        assert match.text == "/echo hi"
+
+    def test_discord_nickname_mention_is_stripped(self):
+        matcher = AddressMatcher("discord", "123", "TestBot")
+
+        assert matcher.command_text("<@!123>/ping") == "/ping"
+
+    def test_mention_in_content_without_parsed_mentions(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        match = matcher.match("hey <@UBOT> /help", [])
+
+        assert match is not None
+        assert match.reason == AddressReason.MENTION
+        assert match.text == "hey  /help"
+
+    def test_name_mention(self):
+        matcher = AddressMatcher("symphony", "123", "TestBot")
+
+        match = matcher.match("@TestBot /status", [])
+
+        assert match is not None
+        assert match.reason == AddressReason.NAME
+        assert match.text == "/status"
+
+    def test_dm_from_other_user(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        match = matcher.match("!help", [], is_dm=True, author_id="U1")
+
+        assert match is not None
+        assert match.reason == AddressReason.DM
+        assert match.text == "!help"
+
+    def test_dm_from_bot_is_ignored(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        assert matcher.match("!help", [], is_dm=True, author_id="UBOT") is None
+
+    def test_other_user_mention_is_not_addressed(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        assert matcher.match("<@UOTHER> hello", [User(id="UOTHER")]) is None
+
+    def test_unknown_identity_matches_nothing_but_dms(self):
+        matcher = AddressMatcher("slack")
+
+        assert matcher.match("<@UBOT> /help", [User(id="UBOT")]) is None
+        assert matcher.match("/help", [], is_dm=True, author_id="U1") is not None
+
+    def test_command_text_is_idempotent(self):
+        matcher = AddressMatcher("slack", "UBOT", "TestBot")
+
+        once = matcher.command_text("<@UBOT> /echo a")
+
+        assert matcher.command_text(once) == once
+
+
+class TestBotAddressMatcherCache:
+    def test_matcher_is_reused_for_same_identity(self):
+        bot = Bot(config=BotConfig())
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+
+        assert bot._address_matcher("slack") is bot._address_matcher("slack")
+
+    def test_matcher_is_rebuilt_when_identity_changes(self):
+        bot = Bot(config=BotConfig())
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        first = bot._address_matcher("slack")
+
+        bot._bot_user_ids["slack"] = "UBOT2"
+        second = bot._address_matcher("slack")
+
+        assert second is not first
+        assert second.bot_id == "UBOT2"
+
+    def test_is_message_to_bot_returns_command_text(self):
+        bot = Bot(config=BotConfig())
+        bot._configs["slack"] = SlackConfig()
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        msg = Message(
+            id="m1",
+            content="<@UBOT> /echo hi",
+            author=User(id="U1"),
+            channel=Channel(id="C1"),
+        )
+
+        is_to_bot, channel_id, text, mentions = bot._is_message_to_bot(msg, "slack")
+
+        assert is_to_bot is True
+        assert channel_id == "C1"
+        assert text == "/echo hi"
+        assert [u.id for u in mentions] == ["UBOT"]
+
+    def test_mention_is_stripped_once_per_message(self, monkeypatch):
+        bot = Bot(config=BotConfig())
+        bot._configs["slack"] = SlackConfig()
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        bot._commands["echo"] = EchoCommand()
+        msg = Message(id="m1", content="<@UBOT> /echo hi", author=User(id="U1"), channel=Channel(id="C1"))
+        strips = []
+        strip = AddressMatcher._strip
+        monkeypatch.setattr(AddressMatcher, "_strip", lambda self, content: strips.append(content) or strip(self, content))
+
+        _, channel_id, text, mentions = bot._is_message_to_bot(msg, "slack")
+        cmd = bot._extract_commands(msg, "slack", channel_id, text, mentions)
+
+        assert cmd.command == "echo"
+        assert strips == ["<@UBOT> /echo hi"]
+
+
+class TestPrefilter:
+    def _bot(self) -> Bot:
+        bot = Bot(config=BotConfig())
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        return bot
+
+    def test_may_address_checks_id_name_mentions_and_data(self):
+        matcher = AddressMatcher("symphony", "12345", "Test & Bot")
+
+        assert matcher.may_address("hello <@12345>") is True
+        assert matcher.may_address("hello", [User(id="12345")]) is True
+        assert matcher.may_address("<span>@x</span>", data='{"0": {"id": [{"value": 12345}]}}') is True
+        assert matcher.may_address("<p>@Test &amp; Bot hi</p>") is True
+        assert matcher.may_address("<p>just chatting</p>", [User(id="999")], data="{}") is False
+
+    def test_may_address_passes_everything_without_identity(self):
+        assert AddressMatcher("slack").may_address("just chatting") is True
+
+    def test_chatter_is_not_a_candidate(self):
+        msg = Message(id="m1", content="lunch?", author=User(id="U1"), channel=Channel(id="C1"))
+
+        assert self._bot()._is_candidate_message(msg, "slack") is False
+
+    def test_dm_is_a_candidate(self):
+        msg = Message(id="m1", content="help", author=User(id="U1"), channel=Channel(id="D1"))
+
+        assert self._bot()._is_candidate_message(msg, "slack") is True
+
+    def test_prefilter_node_drops_chatter(self):
+        bot = self._bot()
+        messages = [
+            Message(id="m1", content="lunch?", author=User(id="U1"), channel=Channel(id="C1")),
+            Message(id="m2", content="<@UBOT> /help", author=User(id="U1"), channel=Channel(id="C1")),
+        ]
+
+        @csp.graph
+        def graph():
+            csp.add_graph_output("out", bot._prefilter_messages("slack", csp.unroll(csp.const(messages))))
+
+        out = csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=1))
+
+        assert [msg.id for _, msg in out["out"]] == ["m2"]
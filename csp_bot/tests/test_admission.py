@@ -0,0 +1,92 @@
+"""Tests for admission control of incoming commands."""
+
+from chatom import User
+
+from csp_bot import AdmissionConfig, BotCommand
+from csp_bot.admission import REFUSED, WAITING, AdmissionControl
+
+
+def bot_command(user: str, channel: str = "C1", name: str = "price") -> BotCommand:
+    return BotCommand(backend="slack", channel_id=channel, command=name, source=User(id=user), delay=None, schedule="")
+
+
+class TestAdmissionControl:
+    def test_unlimited_by_default(self):
+        admission = AdmissionControl(AdmissionConfig())
+        commands = [bot_command("U1") for _ in range(11)]
+
+        assert {admission.offer(c, 0.0) for c in commands[:10]} == {WAITING}
+        assert admission.ready() == commands[:10]
+        assert admission.offer(commands[10], 0.0) == WAITING
+        assert admission.ready() == [commands[10]]
+        assert admission.running == 11
+
+    def test_rate_quotas_refuse(self):
+        admission = AdmissionControl(AdmissionConfig(user_per_second=1.0, user_burst=2, channel_per_second=1.0, channel_burst=3))
+
+        assert [admission.offer(bot_command("U1"), 0.0) for _ in range(3)] == [WAITING, WAITING, REFUSED]
+        assert admission.offer(bot_command("U2"), 0.0) == WAITING
+        # The channel's quota is used up by both users
+        assert admission.offer(bot_command("U3"), 0.0) == REFUSED
+        assert admission.offer(bot_command("U3", channel="C2"), 0.0) == WAITING
+        assert admission.offer(bot_command("U1"), 1.0) == WAITING
+
+    def test_concurrency_quotas_queue_until_released(self):
+        admission = AdmissionControl(AdmissionConfig(user_max_running=1, channel_max_running=2))
+        first, second, other, third = bot_command("U1"), bot_command("U1"), bot_command("U2"), bot_command("U3")
+        for command in (first, second, other, third):
+            admission.offer(command, 0.0)
+
+        assert admission.ready() == [first, other]
+        assert admission.waiting == 2
+
+        # U3 has not had a turn yet, and then the channel is full again
+        admission.release(first)
+        assert admission.ready() == [third]
+        admission.release(other)
+        assert admission.ready() == [second]
+
+    def test_waiting_commands_per_user_are_bounded(self):
+        admission = AdmissionControl(AdmissionConfig(max_running=1, user_max_waiting=2))
+
+        assert [admission.offer(bot_command("U1"), 0.0) for _ in range(3)] == [WAITING, WAITING, REFUSED]
+
+    def test_backlogged_user_does_not_delay_others(self):
+        admission = AdmissionControl(AdmissionConfig(max_running=1, user_max_waiting=100))
+        backlog = [bot_command("U1", name=f"bulk{i}") for i in range(5)]
+        for command in backlog:
+            admission.offer(command, 0.0)
+
+        order = []
+        for step in range(6):
+            if step == 1:
+                admission.offer(bot_command("U2", name="quick"), 0.0)
+            [command] = admission.ready()
+            order.append(command.command)
+            admission.release(command)
+
+        assert order == ["bulk0", "quick", "bulk1", "bulk2", "bulk3", "bulk4"]
+
+    def test_weights_share_waiting_slots(self):
+        admission = AdmissionControl(AdmissionConfig(max_running=1, user_weights={"U1": 3.0}))
+        for _ in range(4):
+            admission.offer(bot_command("U1"), 0.0)
+            admission.offer(bot_command("U2"), 0.0)
+
+        users = []
+        for _ in range(5):
+            [command] = admission.ready()
+            users.append(command.source.id)
+            admission.release(command)
+
+        assert users.count("U1") == 4
+
+    def test_slow_down_replies_are_rate_limited(self):
+        admission = AdmissionControl(AdmissionConfig(slow_down_interval_seconds=30.0))
+        command = bot_command("U1")
+
+        assert admission.reply_allowed(command, 0.0)
+        assert not admission.reply_allowed(command, 10.0)
+        assert admission.reply_allowed(bot_command("U2"), 10.0)
+        assert admission.reply_allowed(command, 31.0)
+        assert not AdmissionControl(AdmissionConfig(slow_down_message="")).reply_allowed(command, 0.0)
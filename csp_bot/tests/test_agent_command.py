@@ -11,7 +11,7 @@ from chatom import Message, User
 from chatom.backend import BackendBase
 
 from csp_bot.commands.agent import AgentCommand, AgentSession, SessionStore, _run_agent
-from csp_bot.structs import BotCommand, CommandVariant
+from csp_bot.structs import BotCommand, CommandVariant, MessagePriority
 
 
 class ConcreteAgentCommand(AgentCommand):
@@ -116,6 +116,25 @@ class TestPreexecute:
             # Should only submit once
             assert mock_executor.submit.call_count == 1
 
+    def test_concurrent_preexecute_submits_once(self, cmd, bot_command):
+        both_building = threading.Barrier(2, timeout=5)
+        build_agent = cmd.build_agent
+
+        def build(command):
+            both_building.wait()
+            return build_agent(command)
+
+        with patch("csp_bot.commands.agent._executor") as mock_executor, patch.object(cmd, "build_agent", side_effect=build):
+            mock_executor.submit.return_value = MagicMock(spec=Future)
+            threads = [threading.Thread(target=cmd.preexecute, args=(bot_command,)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+            assert mock_executor.submit.call_count == 1
+            assert len(AgentCommand._futures) == 1
+
     def test_handles_build_agent_error(self, cmd, bot_command):
         with patch.object(cmd, "build_agent", side_effect=RuntimeError("fail")):
             result = cmd.preexecute(bot_command)
@@ -158,6 +177,7 @@ class TestExecute:
         # First poll sends initial "Thinking..." status
         assert len(messages) == 1
         assert "Thinking" in messages[0].content
+        assert MessagePriority.of(messages[0]) is MessagePriority.STATUS
 
     def test_returns_result_when_future_done(self, cmd, bot_command):
         key = cmd._command_key(bot_command)
@@ -452,6 +472,22 @@ class TestSessionStoreInjection:
             AgentCommand._sessions = SessionStore(ttl_seconds=900.0)
 
 
+class TestAgentWorkers:
+    """Agent LLM calls are bounded by the "agent" command pool."""
+
+    def test_workers_follow_agent_pool_config(self):
+        from csp_bot import Bot, BotConfig
+        from csp_bot.bot_config import CommandPoolConfig
+        from csp_bot.commands import agent
+
+        bot = Bot(config=BotConfig(command_pools={"agent": CommandPoolConfig(workers=2)}))
+        try:
+            bot._inject_backends_into_agent_commands()
+            assert agent._executor._max_workers == 2
+        finally:
+            AgentCommand.set_workers(4)
+
+
 class TestSessionIntegration:
     """Test session creation and resumption through AgentCommand."""
 
@@ -1,8 +1,14 @@
 """Tests for the Bot class."""
 
+import time
+from datetime import datetime, timedelta
+
+import csp
 from chatom.base import Channel, User
 
-from csp_bot import Bot, BotConfig, Message
+from csp_bot import AdmissionConfig, Bot, BotCommand, BotConfig, CommandPoolConfig, Message
+from csp_bot.commands import EventLoopPool, configure_event_loops, get_event_loop_pool
+from csp_bot.commands.framework import CommandEntry
 
 
 class TestBotInit:
@@ -44,3 +50,94 @@ class TestMessageHandling:
         assert len(msg.mention_ids) == 2
         assert "U123" in msg.mention_ids
         assert "U456" in msg.mention_ids
+
+
+class TestCommandWorkers:
+    """Tests for executing commands off the engine thread."""
+
+    def _commands(self):
+        return [BotCommand(backend="slack", channel_id=name, command=name, delay=None, schedule="") for name in ("slow", "fast")]
+
+    def _run(self, bot: Bot, commands: list[BotCommand] | None = None) -> list[str]:
+        def execute(cmd):
+            if cmd.command.startswith("slow"):
+                time.sleep(0.3)
+            return Message(id=cmd.command, content=cmd.command, channel=Channel(id=cmd.channel_id), metadata={"backend": "slack"})
+
+        bot._execute_command = execute
+        bot._command_completions = csp.GenericPushAdapter(object)
+        commands = commands or self._commands()
+
+        @csp.graph
+        def graph():
+            outputs = bot._handle_commands(csp.unroll(csp.const(commands)), bot._command_completions.out(), csp.null_ts([Message]))
+            csp.add_graph_output("messages", outputs.messages)
+
+        out = csp.run(graph, endtime=timedelta(seconds=1), realtime=True)
+        return [m.id or m.content for _, msgs in out["messages"] for m in msgs]
+
+    def test_slow_command_does_not_block_others(self):
+        assert self._run(Bot(config=BotConfig(command_workers=2))) == ["fast", "slow"]
+
+    def test_inline_execution(self):
+        assert self._run(Bot(config=BotConfig(command_workers=0))) == ["slow", "fast"]
+
+    def test_full_pool_rejects_without_blocking_other_pools(self):
+        bot = Bot(config=BotConfig(command_pools={"reports": CommandPoolConfig(workers=1, max_queued=1)}))
+        for name in ("slow1", "slow2", "slow3"):
+            bot._commands[name] = CommandEntry(name=name, help="", handler=None, pool="reports")
+        commands = [
+            BotCommand(backend="slack", channel_id=name, command=name, delay=None, schedule="") for name in ("slow1", "slow2", "slow3", "fast")
+        ]
+
+        results = self._run(bot, commands)
+
+        assert results[:2] == ["/slow3 is busy right now, please try again shortly.", "fast"]
+        assert sorted(results[2:]) == ["slow1", "slow2"]
+        assert bot._metrics.get("commands.rejected.reports") == 1
+
+    def test_user_concurrency_quota_queues_only_that_user(self):
+        bot = Bot(config=BotConfig(admission=AdmissionConfig(user_max_running=1)))
+        commands = [
+            BotCommand(backend="slack", channel_id=name, command=name, source=User(id=user), delay=None, schedule="")
+            for name, user in (("slow1", "U1"), ("slow2", "U1"), ("fast", "U2"))
+        ]
+
+        assert self._run(bot, commands) == ["fast", "slow1", "slow2"]
+
+    def test_over_rate_quota_gets_slow_down_reply(self):
+        bot = Bot(config=BotConfig(admission=AdmissionConfig(user_per_second=0.01, user_burst=1, slow_down_message="Slow down")))
+        commands = [
+            BotCommand(backend="slack", channel_id=name, command="fast", source=User(id="U1"), delay=None, schedule="", message=Message(id=name))
+            for name in ("C1", "C2", "C3")
+        ]
+
+        # The second refusal is not answered: slow-down replies are rate limited too
+        assert self._run(bot, commands) == ["<@U1> Slow down", "fast"]
+        assert bot._metrics.get("commands.refused.user_rate") == 2
+
+    def test_pools_are_shut_down_when_the_graph_stops(self):
+        previous = get_event_loop_pool()
+        loops = EventLoopPool(size=1)
+        configure_event_loops(loops)
+        try:
+            bot = Bot(config=BotConfig())
+            pool = bot._get_command_pools().get("default")
+            pool.submit(lambda: None)
+            executor = pool._executor
+            loop = loops.loop_for(None)
+
+            @csp.graph
+            def graph():
+                bot._shutdown_on_stop()
+
+            csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=1))
+
+            assert bot._command_pools is None
+            assert executor._shutdown
+            deadline = time.monotonic() + 5
+            while loop.is_running() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert not loop.is_running()
+        finally:
+            configure_event_loops(previous)
@@ -8,8 +8,10 @@ These tests cover critical integration points that have caused production bugs:
 """
 
 import asyncio
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
+import csp
 import pytest
 from chatom import Channel, ChannelType, Message, User
 from chatom.discord import DiscordChannel
@@ -100,7 +102,7 @@ class TestMetadataPropagation:
 
     Bug context: Commands returning Message objects directly (like trout/slap)
     were not being routed to backends because metadata["backend"] wasn't set.
-    The _filter_messages_for_backend node filters on metadata, not msg.backend.
+    The _route_outbound node routes on metadata, not msg.backend.
     """
 
     def test_execute_command_sets_metadata_on_message(self, bot_with_symphony, sample_bot_command):
@@ -265,6 +267,29 @@ class TestMetadataPropagation:
         assert result.metadata.get("backend") == "slack"
 
 
+class TestOutboundRouting:
+    """Tests for routing outgoing messages to their backend."""
+
+    def test_each_message_goes_to_exactly_one_backend(self, bot_with_symphony):
+        messages = [Message(id=f"m-{backend}", content="hi", metadata={"backend": backend}) for backend in ("slack", "symphony", "teams")]
+
+        @csp.graph
+        def graph():
+            routes = bot_with_symphony._route_outbound(["slack", "symphony"], csp.unroll(csp.const(messages)))
+            for backend in ("slack", "symphony"):
+                csp.add_graph_output(backend, routes.routed[backend])
+            csp.add_graph_output("unroutable", routes.unroutable)
+
+        out = csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=1))
+
+        assert {name: [m.id for _, m in ticks] for name, ticks in out.items()} == {
+            "slack": ["m-slack"],
+            "symphony": ["m-symphony"],
+            "unroutable": ["m-teams"],
+        }
+        assert bot_with_symphony._metrics.get("outbound.unroutable") == 1
+
+
 class TestNewFrameworkIntegration:
     """Integration tests for new command framework execution in Bot."""
 
@@ -774,7 +799,7 @@ class TestExtractCommands:
         ],
     )
     def test_extract_command_strips_bot_mention(self, bot_with_symphony, text, backend, bot_id):
-        """Test that <@BOT_ID> mentions are stripped before command parsing."""
+        """Test that <@BOT_ID> mentions are stripped once, before command parsing."""
         bot_with_symphony._configs[backend] = MagicMock()
         bot_with_symphony._bot_user_ids[backend] = bot_id
         bot_with_symphony._bot_names[backend] = "TestBot"
@@ -802,11 +827,15 @@ class TestExtractCommands:
             metadata={"backend": backend},
         )
 
+        is_to_bot, _, command_text, _ = bot_with_symphony._is_message_to_bot(msg, backend)
+        assert is_to_bot
+        assert command_text.startswith(("/", "!"))
+
         result = bot_with_symphony._extract_commands(
             msg=msg,
             backend=backend,
             channel_id="ch1",
-            text=text,
+            text=command_text,
             mentions=[User(id=bot_id)],
         )
 
@@ -832,7 +861,7 @@ class TestExtractCommands:
             msg=msg,
             backend="slack",
             channel_id="ch1",
-            text="<@UBOT> just some text",
+            text="just some text",
             mentions=[User(id="UBOT")],
         )
 
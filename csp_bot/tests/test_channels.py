@@ -0,0 +1,181 @@
+"""Tests for the channel directory and non-blocking channel resolution."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import csp
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotConfig
+from csp_bot.bot_config import SlackConfig
+from csp_bot.channels import ChannelDirectory
+from csp_bot.commands import ReplyCommand
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestChannelDirectory:
+    def test_resolved_channel_is_cached_under_id_and_name(self):
+        directory = ChannelDirectory()
+        channel = Channel(id="C1", name="general")
+
+        directory.put("slack", "#general", channel)
+
+        for key in ("#general", "C1", "general"):
+            assert directory.get("slack", key).channel is channel
+        assert directory.get("discord", "C1") is None
+
+    def test_entries_expire_but_are_kept(self):
+        clock = FakeClock()
+        directory = ChannelDirectory(ttl=10, clock=clock)
+        directory.put("slack", "general", Channel(id="C1", name="general"))
+
+        clock.now = 11
+        entry = directory.get("slack", "general")
+
+        assert entry is not None
+        assert directory.is_fresh(entry) is False
+
+    def test_misses_use_negative_ttl(self):
+        clock = FakeClock()
+        directory = ChannelDirectory(ttl=100, negative_ttl=5, clock=clock)
+        directory.put("slack", "nope", None)
+
+        assert directory.is_fresh(directory.get("slack", "nope")) is True
+        clock.now = 6
+        assert directory.is_fresh(directory.get("slack", "nope")) is False
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        directory = ChannelDirectory()
+
+        assert directory.begin("slack", "general", waiter="a") is True
+        assert directory.begin("slack", "general", waiter="b") is False
+        assert directory.put("slack", "general", None) == ["a", "b"]
+        assert directory.begin("slack", "general") is True
+
+    def test_least_recently_used_entries_are_evicted(self):
+        directory = ChannelDirectory(max_entries=2)
+        directory.put("slack", "a", None)
+        directory.put("slack", "b", None)
+        directory.get("slack", "a")
+
+        directory.put("slack", "c", None)
+
+        assert directory.get("slack", "b") is None
+        assert directory.get("slack", "a") is not None
+        assert len(directory) == 2
+
+
+class RoomCommand(ReplyCommand):
+    def command(self):
+        return "room"
+
+    def name(self):
+        return "Room"
+
+    def help(self):
+        return "Room"
+
+    def execute(self, cmd):
+        return None
+
+
+class TestBotChannelLookup:
+    def _bot(self) -> Bot:
+        bot = Bot(config=BotConfig())
+        bot._configs["slack"] = SlackConfig()
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        bot._commands["room"] = RoomCommand()
+        return bot
+
+    def _message(self) -> Message:
+        return Message(
+            id="m1",
+            content="<@UBOT> /room /room general",
+            author=User(id="U1", name="user"),
+            channel=Channel(id="C0"),
+            metadata={"backend": "slack"},
+        )
+
+    def test_resolves_inline_without_a_running_graph(self):
+        bot = self._bot()
+        bot._resolve_channel = MagicMock(return_value=Channel(id="C1", name="general"))
+
+        cmd = bot._extract_commands(self._message(), "slack", "C0", "/room /room general", [])
+
+        assert cmd.channel_id == "C1"
+        assert bot._get_channel_directory().get("slack", "general").channel.id == "C1"
+
+    def test_cached_channel_is_not_fetched(self):
+        bot = self._bot()
+        bot._get_channel_directory().put("slack", "general", Channel(id="C1", name="general"))
+        bot._resolve_channel = MagicMock()
+
+        cmd = bot._extract_commands(self._message(), "slack", "C0", "/room /room general", [])
+
+        assert cmd.channel_id == "C1"
+        bot._resolve_channel.assert_not_called()
+
+    def test_remembered_miss_keeps_identifier(self):
+        bot = self._bot()
+        bot._get_channel_directory().put("slack", "general", None)
+        bot._resolve_channel = MagicMock()
+
+        cmd = bot._extract_commands(self._message(), "slack", "C0", "/room /room general", [])
+
+        assert cmd.channel_id == "general"
+        bot._resolve_channel.assert_not_called()
+
+    def test_miss_is_deferred_and_reinjected(self):
+        bot = self._bot()
+        resolved = Channel(id="C1", name="general")
+        bot._resolve_channel = MagicMock(return_value=resolved)
+        retries = bot._channel_retries["slack"] = csp.GenericPushAdapter(Message)
+        messages = [self._message()]
+
+        @csp.graph
+        def graph():
+            outputs = bot._process_incoming_messages(csp.unroll(csp.const(messages)), retries.out())
+            csp.add_graph_output("commands", outputs.bot_commands)
+
+        out = csp.run(graph, endtime=timedelta(seconds=1), realtime=True)
+
+        commands = [cmd for _, cmds in out["commands"] for cmd in cmds]
+        assert [cmd.channel_id for cmd in commands] == ["C1"]
+        bot._resolve_channel.assert_called_once_with("general", "slack")
+
+
+class TestIngestionLanes:
+    def test_each_backend_has_its_own_lane(self):
+        bot = Bot(config=BotConfig())
+        for backend in ("slack", "discord"):
+            bot._configs[backend] = SlackConfig()
+            bot._bot_user_ids[backend] = "UBOT"
+            bot._bot_names[backend] = "TestBot"
+        bot._commands["room"] = RoomCommand()
+
+        def message(backend: str) -> Message:
+            return Message(
+                id=f"m-{backend}",
+                content="<@UBOT> /room",
+                author=User(id="U1", name="user"),
+                channel=Channel(id="C0"),
+                metadata={"backend": backend},
+            )
+
+        @csp.graph
+        def graph():
+            lanes = [bot._ingestion_lane(backend, csp.const(message(backend))) for backend in ("slack", "discord")]
+            csp.add_graph_output("commands", csp.flatten([commands for commands, _ in lanes]))
+
+        out = csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=1))
+
+        assert sorted(cmd.backend for _, cmd in out["commands"]) == ["discord", "slack"]
+        assert set(bot._channel_retries) == {"slack", "discord"}
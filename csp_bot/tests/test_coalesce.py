@@ -0,0 +1,64 @@
+"""Tests for merging queued outgoing messages."""
+
+from collections import deque
+
+from chatom import Attachment, Channel, Message
+
+from csp_bot.coalesce import MAX_MESSAGE_LENGTH, can_coalesce, join_content, pop_coalesced
+from csp_bot.ratelimit import OutboundRateLimiter
+
+
+def message(content: str, channel: str = "C1", backend: str = "slack", **kwargs) -> Message:
+    return Message(content=content, channel=Channel(id=channel), metadata={"backend": backend}, **kwargs)
+
+
+class TestCanCoalesce:
+    def test_same_channel_and_thread(self):
+        assert can_coalesce(message("a"), message("b"))
+        assert not can_coalesce(message("a"), message("b", channel="C2"))
+        assert not can_coalesce(message("a", thread_id="T1"), message("b", thread_id="T2"))
+
+    def test_attachments_are_kept_separate(self):
+        attachment = Attachment(id="A1", filename="report.csv")
+
+        assert not can_coalesce(message("a"), message("b", attachments=[attachment]))
+
+    def test_messageml_is_not_mixed_with_plain_text(self):
+        wrapped = message("<messageML><b>a</b></messageML>", backend="symphony")
+
+        assert can_coalesce(wrapped, message("<messageML>b</messageML>", backend="symphony"))
+        assert not can_coalesce(wrapped, message("a < b & c", backend="symphony"))
+        assert can_coalesce(message("a < b", backend="symphony"), message("c", backend="symphony"))
+
+
+class TestJoinContent:
+    def test_markdown_and_text_join_with_newlines(self):
+        assert join_content("slack", ["*a*", "b"]) == "*a*\nb"
+
+    def test_messageml_is_merged_into_one_element(self):
+        assert join_content("symphony", ["<messageML>a</messageML>", "<messageML><b>b</b></messageML>"]) == "<messageML>a<br/><b>b</b></messageML>"
+
+
+class TestPopCoalesced:
+    def test_merges_until_incompatible_message(self):
+        queue = deque([message("a", mention_ids=["U1"]), message("b", mention_ids=["U2"]), message("c", thread_id="T1"), message("d")])
+
+        merged = pop_coalesced(queue)
+
+        assert merged.content == "a\nb"
+        assert merged.model_extra["mention_ids"] == ["U1", "U2"]
+        assert [m.content for m in queue] == ["c", "d"]
+
+    def test_respects_platform_size_limit(self):
+        half = "x" * (MAX_MESSAGE_LENGTH["discord"] // 2)
+        queue = deque([message(half, backend="discord") for _ in range(3)])
+
+        # Two halves plus the separator are one character over the limit
+        assert pop_coalesced(queue).content == half
+        assert len(queue) == 2
+
+    def test_rate_limiter_sends_one_merged_post(self):
+        limiter = OutboundRateLimiter(lambda backend: (1.0, 1, 0.0, 1), coalesce=pop_coalesced)
+        limiter.push([message("a"), message("b"), message("c", channel="C2")])
+
+        assert [m.content for m in limiter.drain(0.0)] == ["a\nb", "c"]
@@ -0,0 +1,144 @@
+"""Tests for declarative result caching of commands."""
+
+import uuid
+
+import pytest
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotCommand, BotConfig, FsspecStateStore
+from csp_bot.commands import CachePolicy, ResultCache, compile_invoker
+from csp_bot.commands.framework import CommandEntry, clear_registry, command, get_registered_commands
+
+
+def bot_command(
+    name: str = "quote", args: tuple = ("AAPL",), channel_id: str = "C1", user_id: str = "U1", backend: str = "slack", thread: str = ""
+) -> BotCommand:
+    return BotCommand(
+        command=name,
+        backend=backend,
+        channel_id=channel_id,
+        channel_name="",
+        message=Message(id="m1", thread_id=thread) if thread else Message(id="m1"),
+        source=User(id=user_id),
+        targets=(),
+        args=args,
+        delay=None,
+        schedule="",
+    )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResultCache:
+    def test_hit_returns_copies(self):
+        cache = ResultCache("quote", CachePolicy())
+        cache.put(bot_command(), [Message(content="AAPL 100", channel=Channel(id="C1"), metadata={"backend": "slack"})])
+
+        first = cache.get(bot_command())
+        first[0].metadata["priority"] = "BULK"
+
+        [second] = cache.get(bot_command())
+        assert second.content == "AAPL 100"
+        assert "priority" not in second.metadata
+
+    def test_key_parts(self):
+        cache = ResultCache("quote", CachePolicy(key=["args", "user"]))
+        cache.put(bot_command(), [Message(content="AAPL 100")])
+
+        assert cache.get(bot_command(channel_id="C2")) is not None
+        assert cache.get(bot_command(args=("MSFT",))) is None
+        assert cache.get(bot_command(user_id="U2")) is None
+        # Rendered output is specific to a backend
+        assert cache.get(bot_command(backend="discord")) is None
+
+    def test_entries_expire(self):
+        clock = Clock()
+        cache = ResultCache("quote", CachePolicy(ttl_seconds=30), clock=clock)
+        cache.put(bot_command(), [Message(content="AAPL 100")])
+
+        clock.now += 29
+        assert cache.get(bot_command()) is not None
+        clock.now += 2
+        assert cache.get(bot_command()) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache("quote", CachePolicy(max_entries=2))
+        for symbol in ("A", "B"):
+            cache.put(bot_command(args=(symbol,)), [Message(content=symbol)])
+        cache.get(bot_command(args=("A",)))
+        cache.put(bot_command(args=("C",)), [Message(content="C")])
+
+        assert cache.get(bot_command(args=("A",))) is not None
+        assert cache.get(bot_command(args=("B",))) is None
+        assert len(cache) == 2
+
+    def test_reply_is_readdressed_to_invoking_channel_and_thread(self):
+        cache = ResultCache("quote", CachePolicy())
+        cache.put(bot_command(thread="T1"), [Message(content="AAPL 100", channel=Channel(id="C1"), thread_id="T1")])
+
+        [msg] = cache.get(bot_command(channel_id="C2", thread="T9"))
+
+        assert msg.channel.id == "C2"
+        assert msg.model_extra["thread_id"] == "T9"
+
+    def test_persisted_results_survive_a_new_cache(self):
+        store = FsspecStateStore(f"memory://command-cache-{uuid.uuid4().hex}")
+        policy = CachePolicy(persist=True)
+        ResultCache("quote", policy, store).put(bot_command(), [Message(content="AAPL 100", metadata={"backend": "slack"})])
+
+        [msg] = ResultCache("quote", policy, store).get(bot_command())
+
+        assert msg.content == "AAPL 100"
+        # Not persisted unless asked for
+        assert ResultCache("quote", CachePolicy(), store).get(bot_command()) is None
+
+
+class TestCachedDispatch:
+    def setup_method(self):
+        clear_registry()
+
+    def teardown_method(self):
+        clear_registry()
+
+    def test_hit_skips_execution(self):
+        calls = []
+
+        @command(name="quote", cache=CachePolicy(ttl_seconds=60))
+        def quote(ctx):
+            calls.append(ctx.args_text)
+            return f"{ctx.args_text} 100"
+
+        bot = Bot(config=BotConfig())
+        invoker = compile_invoker("quote", get_registered_commands()["quote"], "slack")
+
+        first = invoker.execute(bot_command(), bot)
+        second = invoker.execute(bot_command(), bot)
+
+        assert calls == ["AAPL"]
+        assert [m.content for m in second] == [m.content for m in first] == ["AAPL 100"]
+        assert bot._metrics.get("commands.cache.hits.quote") == 1
+        assert bot._metrics.get("commands.cache.misses.quote") == 1
+
+    def test_failures_are_not_cached(self):
+        calls = []
+
+        def flaky(ctx):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("upstream down")
+            return "ok"
+
+        bot = Bot(config=BotConfig())
+        invoker = compile_invoker("flaky", CommandEntry(name="flaky", help="", handler=flaky, cache=CachePolicy()), "slack")
+
+        with pytest.raises(RuntimeError):
+            invoker.execute(bot_command("flaky"), bot)
+        assert [m.content for m in invoker.execute(bot_command("flaky"), bot)] == ["ok"]
+        assert len(calls) == 2
@@ -6,6 +6,8 @@ the executor, and the legacy adapter.
 """
 
 import asyncio
+import threading
+import time
 
 import pytest
 from chatom import Channel, Message, User
@@ -14,7 +16,7 @@ from pydantic import Field
 
 from csp_bot.commands.base import ReplyToOtherCommand
 from csp_bot.commands.context import BotInfo, CommandContext
-from csp_bot.commands.executor import _coerce_response, execute_command_func
+from csp_bot.commands.executor import CommandTimeout, _coerce_response, execute_command_func
 from csp_bot.commands.framework import Command, clear_registry, command, get_registered_commands
 from csp_bot.commands.legacy import LegacyCommandAdapter
 from csp_bot.structs import BotCommand, CommandVariant
@@ -528,6 +530,64 @@ class TestExecutorWithCommandClass:
         assert len(results) == 2
 
 
+class TestExecutorTimeouts:
+    def test_async_function_is_cancelled(self):
+        cancelled = threading.Event()
+
+        async def hang(ctx):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(CommandTimeout):
+            execute_command_func(hang, _make_ctx(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_async_generator_is_cancelled(self):
+        cancelled = threading.Event()
+
+        async def hang(ctx):
+            yield "first"
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(CommandTimeout):
+            execute_command_func(hang, _make_ctx(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_sync_generator_is_closed_at_next_yield(self):
+        produced = []
+        closed = []
+
+        def slow(ctx):
+            try:
+                for i in range(10):
+                    produced.append(i)
+                    time.sleep(0.03)
+                    yield str(i)
+            finally:
+                closed.append(True)
+
+        with pytest.raises(CommandTimeout):
+            execute_command_func(slow, _make_ctx(), timeout=0.05)
+        assert len(produced) < 10
+        assert closed == [True]
+
+    def test_sync_function_overrun_is_discarded(self):
+        def slow(ctx):
+            time.sleep(0.1)
+            return "late"
+
+        with pytest.raises(CommandTimeout):
+            execute_command_func(slow, _make_ctx(), timeout=0.05)
+        assert execute_command_func(slow, _make_ctx(), timeout=None)[0].content == "late"
+
+
 class TestCoerceResponse:
     def test_none(self):
         assert _coerce_response(None, "slack") is None
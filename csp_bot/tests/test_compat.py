@@ -0,0 +1,24 @@
+"""Checks that the package stays importable on every supported Python."""
+
+import importlib
+import pkgutil
+import re
+
+import pytest
+
+import csp_bot
+
+# Possessive quantifiers and atomic groups need Python 3.11
+_PY311_REGEX = re.compile(r"(?<!\\)[*+?}]\+|\(\?>")
+
+_MODULES = sorted(m.name for m in pkgutil.walk_packages(csp_bot.__path__, "csp_bot.") if ".tests" not in m.name and ".benchmarks" not in m.name)
+
+
+@pytest.mark.parametrize("name", _MODULES)
+def test_regexes_compile_on_python_310(name):
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        pytest.skip(f"optional dependencies of {name} are not installed")
+    patterns = [value.pattern for value in vars(module).values() if isinstance(value, re.Pattern) and isinstance(value.pattern, str)]
+    assert [p for p in patterns if _PY311_REGEX.search(p)] == []
@@ -0,0 +1,83 @@
+"""Tests for outgoing message deduplication."""
+
+from datetime import datetime, timedelta
+
+import csp
+from chatom import Channel, Message
+
+from csp_bot import Bot, BotCommand, BotConfig
+from csp_bot.dedup import DedupIndex, message_key
+
+
+def message(content: str = "hi", id: str = "", channel: str = "C1") -> Message:
+    return Message(id=id, content=content, channel=Channel(id=channel), metadata={"backend": "slack"})
+
+
+class TestMessageKey:
+    def test_id_or_content(self):
+        assert message_key(message(id="m1")) == ("id", "m1")
+        assert message_key(message()) == message_key(message())
+        assert message_key(message()) != message_key(message(channel="C2"))
+
+
+class TestDedupIndex:
+    def test_window(self):
+        index = DedupIndex()
+
+        assert index.seen("a", now=0.0, ttl=10) is False
+        assert index.seen("a", now=5.0, ttl=10) is True
+        # The window is not extended by duplicates
+        assert index.seen("a", now=10.0, ttl=10) is False
+
+    def test_bounded_lru(self):
+        index = DedupIndex(max_entries=2)
+        index.seen("a", 0.0, 10)
+        index.seen("b", 0.0, 10)
+        index.seen("a", 0.0, 10)
+        index.seen("c", 0.0, 10)
+
+        assert "b" not in index
+        assert "a" in index
+        assert len(index) == 2
+
+    def test_expired_entries_are_dropped(self):
+        index = DedupIndex()
+        index.seen("a", 0.0, 1)
+        index.seen("b", 5.0, 1)
+
+        assert "a" not in index
+
+
+class TestBotDedup:
+    def test_suppresses_and_counts_duplicates(self):
+        bot = Bot(config=BotConfig(dedup_content_seconds=2.0))
+        index = DedupIndex()
+
+        assert bot._is_duplicate(index, message(id="m1"), 0.0) is False
+        assert bot._is_duplicate(index, message(id="m1"), 100.0) is True
+        assert bot._is_duplicate(index, message(), 0.0) is False
+        assert bot._is_duplicate(index, message(), 1.0) is True
+        assert bot._is_duplicate(index, message(), 3.0) is False
+        assert bot._metrics.get("outbound.duplicates_suppressed") == 2
+
+    def test_content_dedup_can_be_disabled(self):
+        bot = Bot(config=BotConfig(dedup_content_seconds=0))
+        index = DedupIndex()
+
+        assert bot._is_duplicate(index, message(), 0.0) is False
+        assert bot._is_duplicate(index, message(), 0.0) is False
+
+    def test_identical_replies_to_distinct_commands_are_delivered(self):
+        bot = Bot(config=BotConfig(ratelimit_seconds=0))
+        bot._execute_command = lambda cmd: [message(content="hi")]
+        commands = [BotCommand(backend="slack", channel_id="C1", command="echo", args=("hi",), delay=None, schedule="") for _ in range(2)]
+
+        @csp.graph
+        def graph():
+            outputs = bot._handle_commands(csp.unroll(csp.const(commands)), csp.null_ts(object), csp.null_ts([Message]))
+            csp.add_graph_output("messages", outputs.messages)
+
+        out = csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=1))
+
+        assert [m.content for _, msgs in out["messages"] for m in msgs] == ["hi", "hi"]
+        assert bot._metrics.get("outbound.duplicates_suppressed") == 0
@@ -0,0 +1,180 @@
+"""Tests for precompiled command dispatch."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+from chatom import Channel, Message, User
+from pydantic import Field
+
+from csp_bot import Bot, BotConfig
+from csp_bot.bot_config import SlackConfig
+from csp_bot.commands import Command, EchoCommand, StatusCommand, command_strategy, compile_invoker
+from csp_bot.commands.framework import CommandEntry, clear_registry, command
+from csp_bot.structs import CommandVariant
+
+
+class SlackOnly(Command):
+    name: str = "slackonly"
+    backends: list[str] = Field(default_factory=lambda: ["slack"])
+
+    def execute(self, ctx):
+        return "ok"
+
+
+class TestCompileInvoker:
+    def test_legacy_command(self):
+        invoker = compile_invoker("echo", EchoCommand(), "slack")
+
+        assert invoker.supported is True
+        assert invoker.variant == EchoCommand.kind()
+
+    def test_declared_backends(self):
+        runner = SlackOnly()
+
+        assert compile_invoker("slackonly", runner, "slack").supported is True
+        assert compile_invoker("slackonly", runner, "discord").supported is False
+
+    def test_decorated_command_has_identity_preexecute(self):
+        entry = CommandEntry(name="hi", help="", handler=lambda ctx: "hi")
+        invoker = compile_invoker("hi", entry, "slack")
+        cmd = MagicMock()
+
+        assert invoker.variant == CommandVariant.REPLY
+        assert invoker.preexecute(cmd, MagicMock()) is cmd
+
+    def test_declared_pool(self):
+        entry = CommandEntry(name="report", help="", handler=lambda ctx: "ok", pool="reports")
+
+        assert compile_invoker("report", entry, "slack").pool == "reports"
+        assert compile_invoker("slackonly", SlackOnly(pool="reports"), "slack").pool == "reports"
+        assert compile_invoker("echo", EchoCommand(), "slack").pool == "default"
+
+    def test_status_preexecute_receives_bot(self):
+        runner = StatusCommand()
+        bot = Bot(config=BotConfig())
+        bot._adapters["slack"] = MagicMock()
+
+        compile_invoker("status", runner, "slack").preexecute(MagicMock(), bot)
+
+        assert runner._adapters == ["slack"]
+
+
+class TestCommandStrategy:
+    def test_sync_and_generator(self):
+        ctx = MagicMock(backend="slack")
+
+        def sync(ctx):
+            return "a"
+
+        def gen(ctx):
+            yield "b"
+            yield "c"
+
+        assert [m.content for m in command_strategy(sync)(ctx)] == ["a"]
+        assert [m.content for m in command_strategy(gen)(ctx)] == ["b", "c"]
+
+    def test_async(self):
+        async def run(ctx):
+            return "d"
+
+        assert [m.content for m in command_strategy(run)(MagicMock(backend="slack"))] == ["d"]
+
+
+class TestBotDispatch:
+    def setup_method(self):
+        clear_registry()
+
+    def teardown_method(self):
+        clear_registry()
+
+    def _bot(self) -> Bot:
+        bot = Bot(config=BotConfig(slack=SlackConfig()))
+        bot._configs["slack"] = MagicMock()
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "TestBot"
+        return bot
+
+    def _message(self, content: str) -> Message:
+        return Message(id="m1", content=content, author=User(id="U1", name="user"), channel=Channel(id="C1"))
+
+    def test_load_commands_compiles_active_backends(self):
+        @command(name="greet")
+        def greet(ctx):
+            return "hi"
+
+        bot = self._bot()
+
+        bot.load_commands([])
+
+        assert ("slack", "greet") in bot._invokers
+        assert bot._invoker("slack", "greet") is bot._invokers[("slack", "greet")]
+
+    def test_replaced_runner_is_recompiled(self):
+        bot = self._bot()
+        bot._commands["echo"] = EchoCommand()
+        first = bot._invoker("slack", "echo")
+
+        bot._commands["echo"] = EchoCommand()
+        second = bot._invoker("slack", "echo")
+
+        assert second is not first
+        assert second.runner is bot._commands["echo"]
+
+    def test_unknown_command(self):
+        assert self._bot()._invoker("slack", "missing") is None
+
+    def test_decorated_command_extracts_and_executes(self):
+        @command(name="greet")
+        def greet(ctx):
+            return f"hi {ctx.args_text}"
+
+        bot = self._bot()
+        bot.load_commands([])
+
+        cmd = bot._extract_commands(self._message("<@UBOT> /greet there"), "slack", "C1", "/greet there", [])
+        responses = bot._execute_command(cmd)
+
+        assert cmd.command == "greet"
+        assert [r.content for r in responses] == ["hi there"]
+
+    def test_unsupported_backend_is_rejected(self):
+        bot = self._bot()
+        bot._commands["slackonly"] = SlackOnly()
+
+        assert bot._extract_commands(self._message("/slackonly"), "discord", "C1", "/slackonly", []) is None
+
+    def test_timeout_is_enforced_and_counted(self):
+        @command(name="hang", timeout=0.05)
+        async def hang(ctx):
+            await asyncio.sleep(10)
+
+        bot = self._bot()
+        bot.load_commands([])
+
+        cmd = bot._extract_commands(self._message("<@UBOT> /hang"), "slack", "C1", "/hang", [])
+
+        assert bot._execute_command(cmd) is None
+        assert bot._metrics.get("commands.timeouts.hang") == 1
+
+    def test_legacy_command_timeout_is_enforced_and_counted(self):
+        class SlowEcho(EchoCommand):
+            def execute(self, command):
+                time.sleep(0.1)
+                return super().execute(command)
+
+        bot = self._bot()
+        bot.config.command_timeouts = {"echo": 0.05}
+        bot._commands["echo"] = SlowEcho()
+
+        cmd = bot._extract_commands(self._message("<@UBOT> /echo hi"), "slack", "C1", "/echo hi", [])
+
+        assert bot._execute_command(cmd) is None
+        assert bot._metrics.get("commands.timeouts.echo") == 1
+
+    def test_configured_timeout_overrides_declared(self):
+        bot = Bot(config=BotConfig(command_timeout_seconds=30, command_timeouts={"report": 300}))
+
+        assert bot._command_timeout("report", 5) == 300
+        assert bot._command_timeout("echo", 5) == 5
+        assert bot._command_timeout("echo", None) == 30
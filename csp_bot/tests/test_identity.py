@@ -0,0 +1,109 @@
+"""Tests for the bot identity registry."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from chatom import User
+
+from csp_bot import Bot, BotConfig
+from csp_bot.identity import IdentityRegistry, IdentityState
+from csp_bot.metrics import Metrics
+
+
+def _registry(fetch) -> tuple[IdentityRegistry, dict, dict, Metrics]:
+    ids, names, metrics = {}, {}, Metrics()
+    return IdentityRegistry(fetch, ids, names, metrics), ids, names, metrics
+
+
+class TestIdentityRegistry:
+    def test_unknown_until_fetched(self):
+        registry, *_ = _registry(lambda backend: User(id="UBOT", name="TestBot"))
+
+        assert registry.get("slack").state == IdentityState.UNKNOWN
+
+        assert registry.refresh("slack") is True
+        identity = registry.get("slack")
+        assert identity.known
+        assert (identity.id, identity.name) == ("UBOT", "TestBot")
+
+    def test_failures_are_counted_and_keep_previous_identity(self):
+        fetch = MagicMock(side_effect=[User(id="UBOT", name="TestBot"), RuntimeError("down"), None])
+        registry, ids, _, metrics = _registry(fetch)
+
+        registry.refresh("slack")
+        assert registry.refresh("slack") is False
+        assert registry.refresh("slack") is False
+
+        assert ids["slack"] == "UBOT"
+        assert metrics.get("identity.fetch_failures") == 2
+        assert metrics.get("identity.fetch_failures.slack") == 2
+
+    def test_refresh_all_fetches_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch(backend):
+            # Deadlocks unless both backends are fetched at the same time
+            barrier.wait()
+            return User(id=f"{backend}-bot", name="TestBot")
+
+        registry, ids, *_ = _registry(fetch)
+
+        registry.refresh_all(["slack", "discord"], timeout=5)
+
+        assert ids == {"slack": "slack-bot", "discord": "discord-bot"}
+
+    def test_refresh_all_does_not_wait_past_timeout(self):
+        release = threading.Event()
+
+        def fetch(backend):
+            release.wait(5)
+            return User(id="UBOT")
+
+        registry, *_ = _registry(fetch)
+
+        start = time.monotonic()
+        registry.refresh_all(["slack"], timeout=0.05)
+        elapsed = time.monotonic() - start
+        release.set()
+
+        assert elapsed < 1
+
+    def test_background_thread_retries_unknown(self):
+        fetch = MagicMock(side_effect=[None, User(id="UBOT", name="TestBot")])
+        registry, ids, *_ = _registry(fetch)
+
+        registry.refresh("slack")
+        registry.start(["slack"], retry_seconds=0.01, refresh_seconds=0)
+        try:
+            deadline = time.monotonic() + 5
+            while "slack" not in ids and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            registry.stop()
+
+        assert ids["slack"] == "UBOT"
+
+
+class TestBotIdentityReads:
+    def test_reads_never_fetch(self):
+        bot = Bot(config=BotConfig())
+        bot._ensure_backend_connected = MagicMock()
+
+        assert bot._get_bot_id("slack") is None
+        assert bot._get_bot_name("slack") is None
+        assert bot._bot_identity("slack").state == IdentityState.UNKNOWN
+        bot._ensure_backend_connected.assert_not_called()
+
+    def test_identity_uses_configured_name(self):
+        bot = Bot(config=BotConfig())
+        config = MagicMock()
+        config.bot_name = "Configured"
+        bot._configs["slack"] = config
+        bot._bot_user_ids["slack"] = "UBOT"
+        bot._bot_names["slack"] = "Fetched"
+
+        identity = bot._bot_identity("slack")
+
+        assert identity.known
+        assert identity.name == "Configured"
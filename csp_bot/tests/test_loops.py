@@ -0,0 +1,96 @@
+"""Tests for the pool of event loops running async commands."""
+
+import threading
+import time
+
+import pytest
+from chatom import Channel
+
+from csp_bot.commands import EventLoopPool, configure_event_loops, execute_command_func, get_event_loop_pool
+from csp_bot.metrics import Metrics
+
+
+class Ctx:
+    def __init__(self, command_name: str = "cmd", channel: str = "C1"):
+        self.command_name = command_name
+        self.channel = Channel(id=channel)
+        self.backend = "slack"
+
+
+class TestSharding:
+    def test_same_key_same_loop(self):
+        pool = EventLoopPool(size=4)
+        try:
+            assert pool.loop_for("report") is pool.loop_for("report")
+            assert len({id(pool.loop_for(f"cmd{i}")) for i in range(50)}) == 4
+        finally:
+            pool.close()
+
+    def test_resizing_moves_few_keys(self):
+        keys = [f"cmd{i}" for i in range(1000)]
+        before = {key: EventLoopPool(size=4).ranking(key)[0] for key in keys}
+        after = {key: EventLoopPool(size=5).ranking(key)[0] for key in keys}
+
+        moved = sum(before[key] != after[key] for key in keys)
+
+        assert moved < 300
+        assert all(after[key] == 4 for key in keys if before[key] != after[key])
+
+    def test_shard_by_channel(self):
+        pool = EventLoopPool(size=4, shard_by="channel")
+
+        assert pool.key_for(Ctx("a", "C9")) == pool.key_for(Ctx("b", "C9")) == "C9"
+        assert EventLoopPool(size=4).key_for(Ctx("a", "C9")) == "a"
+
+    def test_uvloop(self):
+        uvloop = pytest.importorskip("uvloop")
+        pool = EventLoopPool(size=1, use_uvloop=True)
+        try:
+            assert isinstance(pool.loop_for("report"), uvloop.Loop)
+        finally:
+            pool.close()
+
+
+class TestHealth:
+    def test_blocked_loop_is_detected_and_avoided(self):
+        metrics = Metrics()
+        pool = EventLoopPool(size=2, slow_callback_seconds=0.05, heartbeat_seconds=0.05, metrics=metrics)
+        try:
+            key = "report"
+            first = pool.ranking(key)[0]
+            loop = pool.loop_for(key)
+            # Let the heartbeats start
+            time.sleep(0.1)
+
+            # A blocking call on the loop, as a misbehaving command would make
+            loop.call_soon_threadsafe(time.sleep, 0.4)
+            time.sleep(0.25)
+
+            assert pool.blocked() == [first]
+            assert pool.loop_for(key) is not loop
+
+            time.sleep(0.4)
+
+            assert pool.blocked() == []
+            assert pool.loop_for(key) is loop
+            assert metrics.get(f"async.slow_callbacks.{first}") >= 1
+            assert pool.lags()[first] < 0.05
+        finally:
+            pool.close()
+
+
+class TestExecutorLoops:
+    def test_async_commands_run_on_their_shard(self):
+        previous = get_event_loop_pool()
+        pool = EventLoopPool(size=3)
+        configure_event_loops(pool)
+        try:
+
+            async def where(ctx):
+                return threading.current_thread().name
+
+            names = {execute_command_func(where, Ctx(command_name=f"cmd{i}"))[0].content for i in range(30)}
+
+            assert names == {f"csp-bot-async-loop-{i}" for i in range(3)}
+        finally:
+            configure_event_loops(previous)
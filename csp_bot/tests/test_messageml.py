@@ -0,0 +1,84 @@
+"""Tests for MessageML text extraction."""
+
+import html
+import re
+from unittest.mock import MagicMock
+
+import pytest
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotConfig
+from csp_bot.messageml import extract_text
+
+
+def _regex_chain(content: str) -> str:
+    """The substitution chain extract_text replaces."""
+    text = re.sub(r"<br\s*/?>\s*", "\n", content, flags=re.IGNORECASE)
+    text = re.sub(r"</p>\s*", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</div>\s*", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", "", text)
+    return html.unescape(text).strip()
+
+
+class TestExtractText:
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "",
+            "plain text",
+            "<p>hello</p>",
+            "<div><p>a</p>\n  <p>b</p></div>",
+            "line one<br/>line two<BR >line three<br>",
+            "</div><br/>after",
+            "</p> <br/> </div>  x",
+            "<P>upper</P>",
+            "a &amp; b &lt;c&gt; &quot;d&quot; &#39;e&#39;",
+            "a <> b",
+            "unterminated <tag",
+            '<span class="entity" data-entity-id="0">@Bot</span> /help',
+            '<div data-format="PresentationML"><p><mention uid="123"/> /echo hi</p></div>',
+            '<mention email="bot@example.com"/> /status',
+        ],
+    )
+    def test_text_matches_regex_chain(self, content):
+        assert extract_text(content).text == _regex_chain(content)
+
+    def test_mentions_in_document_order(self):
+        result = extract_text('<p><mention uid="1"/> and <mention email="x@y.com"/> hi</p>')
+
+        assert result.mention_ids == ["1", "x@y.com"]
+
+    def test_mention_offsets_refer_to_stripped_text(self):
+        result = extract_text('<div><p>  hi <mention uid="1"/>, &amp; <mention uid="2"/></p></div>')
+
+        assert result.text == "hi , &"
+        assert [m.offset for m in result.mentions] == [3, 6]
+
+    def test_leading_mention_offset_is_zero(self):
+        result = extract_text('<mention uid="1"/> /help')
+
+        assert result.text == "/help"
+        assert result.mentions[0].offset == 0
+
+    def test_no_mentions(self):
+        assert extract_text("<p>hello</p>").mentions == []
+
+
+class TestBotSymphonyExtraction:
+    def test_plain_message_uses_extracted_mentions(self):
+        bot = Bot(config=BotConfig())
+        bot._configs["symphony"] = MagicMock()
+        bot._bot_user_ids["symphony"] = "123"
+        bot._bot_names["symphony"] = "TestBot"
+        msg = Message(
+            id="m1",
+            content='<div><p><mention uid="123"/> /echo a &amp; b</p></div>',
+            author=User(id="U1"),
+            channel=Channel(id="C1"),
+        )
+
+        is_to_bot, _, text, mentions = bot._is_message_to_bot(msg, "symphony")
+
+        assert is_to_bot is True
+        assert text == "/echo a & b"
+        assert [u.id for u in mentions] == ["123"]
@@ -0,0 +1,173 @@
+"""Tests for durable outgoing message delivery."""
+
+from datetime import datetime, timedelta, timezone
+
+import csp
+from chatom import Channel, Message
+from csp import ts
+
+from csp_bot import Bot, BotCommand, BotConfig, OutboxConfig
+from csp_bot.metrics import Metrics
+from csp_bot.outbox import Outbox
+from csp_bot.persistence import InMemoryStateStore
+
+T0 = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def message(id: str = "m1", backend: str = "slack") -> Message:
+    return Message(id=id, content="report", channel=Channel(id="C1"), metadata={"backend": backend})
+
+
+class FakeAdapter:
+    """Stands in for a chatom BackendAdapter: "sends" on publish and reports
+    successful sends through the message callback.
+
+    Args:
+        failures: How many sends fail before sends start succeeding.
+    """
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.attempts: list[Message] = []
+        self.sent: list[Message] = []
+        self.times: list[datetime] = []
+        self._callback = None
+
+    def set_message_callback(self, callback) -> None:
+        self._callback = callback
+
+    @csp.node
+    def _write_message(self, msg: ts[Message]):
+        if csp.ticked(msg):
+            self.attempts.append(msg)
+            self.times.append(csp.now())
+            if len(self.attempts) > self.failures:
+                self.sent.append(msg)
+                if self._callback is not None:
+                    self._callback(msg, msg)
+
+    @csp.graph
+    def publish(self, msg: ts[Message]):
+        self._write_message(msg)
+
+
+class TestOutbox:
+    def _outbox(self, store=None, **kwargs) -> Outbox:
+        kwargs.setdefault("jitter", lambda: 1.0)
+        return Outbox(store if store is not None else InMemoryStateStore(), ack_seconds=10, retry_seconds=1, metrics=Metrics(), **kwargs)
+
+    def test_acknowledged_message_is_removed(self):
+        outbox = self._outbox()
+        msg = message()
+
+        record = outbox.add(msg, T0)
+
+        assert msg.metadata["outbox_id"] == record.outbox_id
+        assert outbox.next_retry_at() == T0 + timedelta(seconds=10)
+        assert outbox.ack(msg) is True
+        assert outbox.records() == []
+        assert outbox.next_retry_at() is None
+        assert outbox.due(T0 + timedelta(hours=1)) == []
+
+    def test_unacknowledged_message_is_resent_with_backoff(self):
+        outbox = self._outbox()
+        msg = message()
+        outbox.add(msg, T0)
+
+        assert outbox.due(T0 + timedelta(seconds=9)) == []
+        assert outbox.due(T0 + timedelta(seconds=10)) == [msg]
+        # One failure on the backend: wait for the ack plus 1s of backoff
+        assert outbox.next_retry_at() == T0 + timedelta(seconds=21)
+        assert outbox.records()[0].attempts == 2
+        assert outbox.due(T0 + timedelta(seconds=21)) == [msg]
+        assert outbox.next_retry_at() == T0 + timedelta(seconds=33)
+
+    def test_ack_resets_backend_backoff(self):
+        outbox = self._outbox()
+        first, second = message("m1"), message("m2")
+        outbox.add(first, T0)
+        outbox.due(T0 + timedelta(seconds=10))
+        assert outbox.backoff("slack") == 1.0
+
+        outbox.ack(first)
+        outbox.add(second, T0 + timedelta(seconds=11))
+
+        assert outbox.backoff("slack") == 0.0
+        assert outbox.backoff("discord") == 0.0
+
+    def test_exhausted_message_is_dead_lettered(self):
+        outbox = self._outbox(max_attempts=2)
+        outbox.add(message(), T0)
+
+        assert len(outbox.due(T0 + timedelta(seconds=10))) == 1
+        assert outbox.due(T0 + timedelta(minutes=5)) == []
+
+        assert outbox.records() == []
+        assert [record.message.id for record in outbox.dead_letters()] == ["m1"]
+        assert outbox.next_retry_at() is None
+
+    def test_pending_messages_are_replayed_after_restart(self):
+        store = InMemoryStateStore()
+        self._outbox(store).add(message(), T0)
+
+        restarted = self._outbox(store)
+
+        assert [msg.id for msg in restarted.replay(T0 + timedelta(seconds=1))] == ["m1"]
+        assert restarted.records()[0].attempts == 2
+        assert restarted.next_retry_at() == T0 + timedelta(seconds=11)
+
+
+def deliver(bot: Bot, adapter: FakeAdapter, responses: list[Message]) -> None:
+    """Wire responses through the rate limiter and outbox to ``adapter``, as ``Bot.connect`` does."""
+
+    @csp.graph
+    def graph():
+        bot._execute_command = lambda cmd: responses
+        commands = (
+            csp.const(BotCommand(backend="slack", channel_id="C1", command="report", delay=None, schedule=""))
+            if responses
+            else csp.null_ts(BotCommand)
+        )
+        resends = csp.feedback([Message])
+        outputs = bot._handle_commands(commands, csp.null_ts(object), resends.out())
+        delivery = bot._deliver_outbound(csp.unroll(outputs.messages))
+        resends.bind(delivery.resend)
+        adapter.publish(bot._route_outbound(["slack"], csp.unroll(delivery.sent)).routed["slack"])
+
+    csp.run(graph, starttime=datetime(2020, 1, 1), endtime=timedelta(seconds=30))
+
+
+class TestBotOutbox:
+    def test_failed_send_is_retried_until_acknowledged(self):
+        bot = Bot(config=BotConfig(outbox=OutboxConfig(ack_seconds=1, retry_seconds=1)))
+        adapter = FakeAdapter(failures=2)
+        adapter.set_message_callback(bot._on_message_sent)
+        bot._acked_backends.add("slack")
+
+        deliver(bot, adapter, [message()])
+
+        assert len(adapter.attempts) == 3
+        assert [m.id for m in adapter.sent] == ["m1"]
+        assert bot._get_outbox().records() == []
+        assert bot._metrics.get("outbox.retries") == 2
+        assert bot._metrics.get("outbox.acked") == 1
+
+    def test_replayed_messages_are_rate_limited(self):
+        store = InMemoryStateStore()
+        outbox = Outbox(store)
+        for n in range(3):
+            outbox.add(message(f"m{n}"), T0 + timedelta(seconds=n))
+        bot = Bot(config=BotConfig(ratelimit_seconds=1, outbox=OutboxConfig()))
+        bot.set_state_store(store)
+        adapter = FakeAdapter()
+        adapter.set_message_callback(bot._on_message_sent)
+        bot._acked_backends.add("slack")
+
+        deliver(bot, adapter, [])
+
+        assert [m.id for m in adapter.sent] == ["m0", "m1", "m2"]
+        assert [t - adapter.times[0] for t in adapter.times] == [timedelta(seconds=n) for n in range(3)]
+        assert bot._get_outbox().records() == []
+
+    def test_disabled_by_default(self):
+        assert Bot(config=BotConfig())._get_outbox() is None
@@ -0,0 +1,42 @@
+"""Tests for bulkhead command pools."""
+
+import threading
+
+from csp_bot import CommandPoolConfig
+from csp_bot.pools import CommandPool, CommandPools
+
+
+class TestCommandPool:
+    def test_full_pool_rejects(self):
+        pool = CommandPool("reports", workers=1, max_queued=1)
+        release = threading.Event()
+
+        assert pool.submit(release.wait) is True
+        assert pool.submit(release.wait) is True
+        assert pool.submit(release.wait) is False
+        assert pool.pending == 2
+
+        release.set()
+        pool._executor.shutdown(wait=True)
+        assert pool.pending == 0
+
+    def test_unbounded_pool_queues(self):
+        pool = CommandPool("default", workers=1)
+        release = threading.Event()
+
+        assert all(pool.submit(release.wait) for _ in range(5))
+
+        release.set()
+        pool._executor.shutdown(wait=True)
+
+
+class TestCommandPools:
+    def test_configured_and_default_pools(self):
+        pools = CommandPools({"reports": CommandPoolConfig(workers=2, max_queued=3, rejection="drop")}, default_workers=8)
+
+        reports = pools.get("reports")
+        assert (reports.workers, reports.max_queued, reports.rejection) == (2, 3, "drop")
+        assert pools.get("reports") is reports
+        assert (pools.get("default").workers, pools.get("default").max_queued) == (8, 0)
+        assert pools.get("") is pools.get("default")
+        assert pools.get("other").workers == CommandPoolConfig().workers
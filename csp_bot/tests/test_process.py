@@ -0,0 +1,145 @@
+"""Tests for running commands in worker processes."""
+
+import os
+import time
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pytest
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotCommand, BotConfig
+from csp_bot.commands import BotInfo, CommandContext, CommandTimeout, ProcessCommandPool, compile_invoker
+from csp_bot.commands.framework import CommandEntry
+from csp_bot.commands.process import _pack, slim_context
+
+
+def pid(ctx):
+    return str(os.getpid())
+
+
+def totals(ctx):
+    frame = pd.DataFrame({"desk": ["rates", "fx"], "pnl": [1.5, -2.0]})
+    return ctx.reply(f"{ctx.args_text}: ", ctx.table(frame))
+
+
+def lines(ctx):
+    yield from ctx.args
+    yield None
+    yield "unreachable"
+
+
+def big(ctx):
+    return "x" * 4096
+
+
+def hang(ctx):
+    time.sleep(60)
+
+
+def context(args: list[str] | None = None) -> CommandContext:
+    args = args or []
+    return CommandContext(
+        command_name="report",
+        source=User(id="U1"),
+        targets=[],
+        channel=Channel(id="C1"),
+        message=Message(id="m1", content="/report", raw=object()),
+        args=args,
+        args_text=" ".join(args),
+        backend="slack",
+        bot=BotInfo(id="B1"),
+        deps=object(),
+    )
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ProcessCommandPool(workers=1, shared_memory_bytes=1024)
+    yield pool
+    pool.shutdown()
+
+
+class TestProcessCommandPool:
+    def test_slim_context_drops_unpicklable_state(self):
+        ctx = slim_context(context())
+
+        assert ctx.deps is None
+        assert ctx.message.raw is None
+        assert ctx.message.id == "m1"
+
+    def test_runs_in_another_process(self, pool):
+        [msg] = pool.run(pid, context())
+
+        assert msg.content != str(os.getpid())
+        assert msg.metadata["backend"] == "slack"
+
+    def test_formatted_result_is_rendered_in_bot_process(self, pool):
+        [msg] = pool.run(totals, context(["today"]))
+
+        assert msg.content.startswith("today: ")
+        assert "rates" in msg.content and "-2.0" in msg.content
+        assert msg.metadata["formatted"] is not None
+
+    def test_generator_stops_at_none(self, pool):
+        assert [m.content for m in pool.run(lines, context(["a", "b"]))] == ["a", "b"]
+
+    def test_large_result_uses_shared_memory(self, pool):
+        [msg] = pool.run(big, context())
+
+        assert msg.content == "x" * 4096
+
+
+class TestProcessTimeout:
+    def test_timed_out_worker_is_terminated_and_replaced(self):
+        pool = ProcessCommandPool(workers=1)
+        try:
+            pool.start()
+            workers = list(pool._executor._processes.values())
+
+            with pytest.raises(CommandTimeout):
+                pool.run(hang, context(), timeout=0.5)
+
+            for worker in workers:
+                worker.join(5)
+                assert not worker.is_alive()
+            [msg] = pool.run(pid, context())
+            assert msg.content not in {str(worker.pid) for worker in workers}
+        finally:
+            pool.shutdown()
+
+
+class TestProcessShutdown:
+    @pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="shared memory is not listed under /dev/shm")
+    def test_unread_results_are_unlinked(self):
+        pool = ProcessCommandPool(workers=1, shared_memory_bytes=1)
+        # A result that arrived after its command timed out and was never read
+        _, name, _ = _pack(["x" * 64], 1, pool._block_prefix)
+
+        pool.shutdown()
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+class TestProcessDispatch:
+    def test_process_command_runs_in_pool(self, pool):
+        bot = Bot(config=BotConfig())
+        bot._process_pool = pool
+        invoker = compile_invoker("pid", CommandEntry(name="pid", help="", handler=pid, execution="process"), "slack")
+        cmd = BotCommand(
+            command="pid",
+            backend="slack",
+            channel_id="C1",
+            channel_name="",
+            message=Message(id="m1"),
+            source=User(id="U1"),
+            targets=(),
+            args=(),
+            delay=None,
+            schedule="",
+        )
+
+        [msg] = invoker.execute(cmd, bot)
+
+        assert msg.content != str(os.getpid())
@@ -0,0 +1,142 @@
+"""Tests for outgoing message rate limiting."""
+
+from datetime import datetime, timedelta
+
+import csp
+from chatom import Channel, Message
+
+from csp_bot import Bot, BotCommand, BotConfig, MessagePriority, RateLimitConfig
+from csp_bot.bot_config import DiscordConfig, SlackConfig
+from csp_bot.metrics import Metrics
+from csp_bot.ratelimit import OutboundRateLimiter, TokenBucket
+
+
+def message(channel: str, n: int = 0, backend: str = "slack") -> Message:
+    return Message(id=f"{channel}-{n}", content=str(n), channel=Channel(id=channel), metadata={"backend": backend})
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+
+        for _ in range(2):
+            assert bucket.available(0.0)
+            bucket.take()
+        assert not bucket.available(0.0)
+        assert bucket.wait(0.0) == 0.5
+        assert bucket.available(0.5)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(rate=0, burst=1, now=0.0)
+        for _ in range(100):
+            bucket.take()
+        assert bucket.available(0.0)
+        assert bucket.wait(0.0) == 0.0
+
+
+class TestOutboundRateLimiter:
+    def test_burst_to_one_channel_does_not_delay_others(self):
+        limiter = OutboundRateLimiter(lambda backend: (1.0, 1, 0.0, 1))
+        limiter.push([message("C1", n) for n in range(3)] + [message("C2")])
+
+        ready = limiter.drain(0.0)
+
+        assert [m.id for m in ready] == ["C1-0", "C2-0"]
+        assert len(limiter) == 2
+        assert limiter.next_wakeup(0.0) == 1.0
+
+    def test_backend_limit_is_shared_round_robin(self):
+        limiter = OutboundRateLimiter(lambda backend: (0.0, 1, 1.0, 2))
+        limiter.push([message("C1", n) for n in range(3)] + [message("C2", n) for n in range(3)])
+
+        assert [m.id for m in limiter.drain(0.0)] == ["C1-0", "C2-0"]
+        assert [m.id for m in limiter.drain(1.0)] == ["C1-1"]
+        assert [m.id for m in limiter.drain(2.0)] == ["C2-1"]
+
+    def test_idle_limiter_has_no_wakeup_and_forgets_channels(self):
+        limiter = OutboundRateLimiter(lambda backend: (1.0, 1, 0.0, 1))
+        limiter.push([message("C1")])
+        limiter.drain(0.0)
+
+        assert limiter.next_wakeup(0.0) is None
+        limiter.drain(5.0)
+        assert limiter._channels == {}
+
+
+class TestPriorities:
+    def status(self, channel: str, n: int) -> Message:
+        msg = message(channel, n)
+        msg.metadata["priority"] = MessagePriority.STATUS.name
+        return msg
+
+    def test_replies_go_before_status_and_bulk(self):
+        limiter = OutboundRateLimiter(lambda backend: (0.0, 1, 1.0, 1))
+        bulk = message("C1", 0)
+        bulk.metadata["priority"] = MessagePriority.BULK
+        limiter.push([self.status("C2", 0), bulk, message("C3", 0)])
+
+        assert [m.id for m in limiter.drain(0.0)] == ["C3-0"]
+        assert [m.id for m in limiter.drain(1.0)] == ["C1-0"]
+        assert [m.id for m in limiter.drain(2.0)] == ["C2-0"]
+
+    def test_newer_status_supersedes_queued_status(self):
+        metrics = Metrics()
+        limiter = OutboundRateLimiter(lambda backend: (0.0, 1, 1.0, 1), metrics=metrics)
+        limiter.push([message("C0", 0)])
+        limiter.push([self.status("C1", 0), self.status("C1", 1)])
+
+        assert len(limiter) == 2
+        assert metrics.get("outbound.superseded") == 1
+        limiter.drain(0.0)
+        assert [m.id for m in limiter.drain(1.0)] == ["C1-1"]
+
+    def test_full_queue_sheds_lowest_priority_first(self):
+        metrics = Metrics()
+        limiter = OutboundRateLimiter(lambda backend: (1.0, 1, 0.0, 1), max_queued=3, metrics=metrics)
+        limiter.push([self.status("C1", 0), message("C2", 0), message("C2", 1), message("C2", 2)])
+
+        assert len(limiter) == 3
+        assert metrics.get("outbound.shed.status") == 1
+        limiter.push([message("C2", 3)])
+        assert metrics.get("outbound.shed.reply") == 1
+        assert [m.id for m in limiter.drain(0.0)] == ["C2-1"]
+
+
+class TestBotRateLimit:
+    def test_backend_config_limits(self):
+        bot = Bot(config=BotConfig())
+        bot._configs["slack"] = SlackConfig(rate_limit=RateLimitConfig(channel_per_second=2.0, channel_burst=4))
+
+        assert bot._rate_limits("slack") == (2.0, 4, 0.0, 1)
+        assert bot._rate_limits("discord") == (1.0, 1, 0.0, 1)
+
+    def test_ratelimit_seconds_applies_unless_rate_limit_is_set(self):
+        bot = Bot(config=BotConfig(ratelimit_seconds=4.0))
+        bot._configs["slack"] = SlackConfig()
+        bot._configs["discord"] = DiscordConfig(rate_limit=RateLimitConfig(channel_burst=2))
+
+        assert bot._rate_limits("slack") == (0.25, 1, 0.0, 1)
+        assert bot._rate_limits("discord") == (1.0, 2, 0.0, 1)
+
+    def test_throttled_channel_is_flushed_later(self):
+        bot = Bot(config=BotConfig())
+        bot._configs["slack"] = SlackConfig(rate_limit=RateLimitConfig(channel_per_second=1.0, channel_burst=1))
+        bot._execute_command = lambda cmd: [message(cmd.channel_id, n) for n in range(2)]
+        commands = [BotCommand(backend="slack", channel_id=channel, command="x", delay=None, schedule="") for channel in ("C1", "C2")]
+
+        @csp.graph
+        def graph():
+            outputs = bot._handle_commands(csp.unroll(csp.const(commands)), csp.null_ts(object), csp.null_ts([Message]))
+            csp.add_graph_output("messages", outputs.messages)
+
+        start = datetime(2020, 1, 1)
+        out = csp.run(graph, starttime=start, endtime=timedelta(seconds=5))
+
+        sent = {m.id: time - start for time, msgs in out["messages"] for m in msgs}
+        assert sent == {
+            "C1-0": timedelta(0),
+            "C2-0": timedelta(0),
+            "C1-1": timedelta(seconds=1),
+            "C2-1": timedelta(seconds=1),
+        }
+        assert bot._metrics.get("outbound.queued") == 0
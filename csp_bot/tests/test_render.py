@@ -0,0 +1,56 @@
+"""Tests for memoized rendering."""
+
+from chatom.format import FormattedMessage, Table
+
+from csp_bot.commands.help import _render_help
+from csp_bot.render import RenderCache, get_render_cache, render_table, rows_key
+
+
+class TestRenderCache:
+    def test_renders_once_per_backend_and_key(self):
+        cache = RenderCache()
+        calls = []
+
+        def render():
+            calls.append(1)
+            return "out"
+
+        assert cache.get_or_render("slack", "k", render) == "out"
+        assert cache.get_or_render("slack", "k", render) == "out"
+        assert cache.get_or_render("discord", "k", render) == "out"
+        assert len(calls) == 2
+        assert cache.stats() == {"hits": 1, "misses": 2, "entries": 2, "chars": 6}
+
+    def test_bounded(self):
+        cache = RenderCache(max_entries=10, max_chars=5)
+        cache.get_or_render("slack", "a", lambda: "aaa")
+        cache.get_or_render("slack", "b", lambda: "bbb")
+
+        assert len(cache) == 1
+
+    def test_rows_key_tracks_cells(self):
+        assert rows_key([{"a": 1, "b": 2}], ["a"]) == rows_key([{"a": "1", "b": 3}], ["a"])
+        assert rows_key([{"a": 1}], ["a"]) != rows_key([{"a": 2}], ["a"])
+
+
+class TestCachedOutput:
+    def setup_method(self):
+        get_render_cache().clear()
+
+    def test_table_fragment_matches_full_render(self):
+        rows = [{"ID": "s1", "Command": "/echo"}]
+        msg = FormattedMessage()
+        msg.content.append(Table.from_dict_list(rows, columns=["ID", "Command"]))
+
+        for backend in ("slack", "symphony"):
+            assert render_table(rows, ["ID", "Command"], backend) == msg.render_for(backend)
+
+    def test_help_is_rendered_once(self):
+        rows = [{"Command": "/echo", "Name": "Echo", "Info": "Echo text"}]
+
+        first = _render_help(rows, "slack")
+        second = _render_help([dict(row) for row in rows], "slack")
+
+        assert first == second
+        assert get_render_cache().stats()["hits"] == 1
+        assert _render_help([{**rows[0], "Info": "changed"}], "slack") != first
@@ -0,0 +1,133 @@
+"""Tests for single-flight execution of identical concurrent commands."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotCommand, BotConfig
+from csp_bot.commands import SingleFlight, compile_invoker
+from csp_bot.commands.framework import CommandEntry
+
+
+def bot_command(channel_id: str, args: tuple = ("XYZ",), thread: str = "") -> BotCommand:
+    return BotCommand(
+        command="price",
+        backend="slack",
+        channel_id=channel_id,
+        channel_name="",
+        message=Message(id=f"m-{channel_id}", thread_id=thread) if thread else Message(id=f"m-{channel_id}"),
+        source=User(id="U1"),
+        targets=(),
+        args=args,
+        delay=None,
+        schedule="",
+    )
+
+
+def wait_until(predicate) -> None:
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "100"
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(flights.run, "XYZ", "C1", fetch)
+            wait_until(lambda: len(flights) == 1)
+            followers = [executor.submit(flights.run, "XYZ", channel, fetch) for channel in ("C2", "C3")]
+            wait_until(lambda: flights.waiting("XYZ") == 2)
+            release.set()
+
+            assert leader.result() == ("100", None)
+            assert [f.result() for f in followers] == [("100", "C1"), ("100", "C1")]
+        assert len(calls) == 1
+        assert len(flights) == 0
+
+    def test_errors_reach_every_caller(self):
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise RuntimeError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flights.run, "XYZ", "C1", fail)
+            wait_until(lambda: len(flights) == 1)
+            follower = executor.submit(flights.run, "XYZ", "C2", fail)
+            wait_until(lambda: flights.waiting("XYZ") == 1)
+            release.set()
+
+            for future in (leader, follower):
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+    def test_sequential_calls_run_again(self):
+        flights = SingleFlight()
+
+        assert flights.run("XYZ", "C1", lambda: 1) == (1, None)
+        assert flights.run("XYZ", "C1", lambda: 2) == (2, None)
+
+
+class TestSingleFlightDispatch:
+    def test_waiters_get_replies_in_their_own_channel(self):
+        release = threading.Event()
+        calls = []
+
+        def price(ctx):
+            calls.append(ctx.channel.id)
+            release.wait(5)
+            return Message(content=f"{ctx.args_text} 100", channel=Channel(id=ctx.channel.id), thread_id=ctx.message.thread_id or "")
+
+        bot = Bot(config=BotConfig())
+        invoker = compile_invoker("price", CommandEntry(name="price", help="", handler=price, single_flight=True), "slack")
+        key = ("price", "slack", ("XYZ",))
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(invoker.execute, bot_command("C1"), bot)
+            wait_until(lambda: len(bot._single_flight) == 1)
+            follower = executor.submit(invoker.execute, bot_command("C2", args=(" XYZ",), thread="T2"), bot)
+            other = executor.submit(invoker.execute, bot_command("C3", args=("ABC",)), bot)
+            wait_until(lambda: bot._single_flight.waiting(key) == 1)
+            release.set()
+
+            [first] = leader.result()
+            [second] = follower.result()
+            other.result()
+
+        assert sorted(calls) == ["C1", "C3"]
+        assert second.content == first.content == "XYZ 100"
+        assert second.channel.id == "C2"
+        assert first.channel.id == "C1"
+        assert bot._metrics.get("commands.single_flight.joined.price") == 1
+
+    def test_output_is_collected_without_touching_the_worker_stream(self):
+        emitted = []
+
+        def ticks(ctx):
+            yield "1"
+            yield "2"
+
+        bot = Bot(config=BotConfig())
+        invoker = compile_invoker("price", CommandEntry(name="price", help="", handler=ticks, single_flight=True), "slack")
+        bot._worker_state.emit = emitted.append
+
+        responses = invoker.execute(bot_command("C1"), bot)
+
+        assert [m.content for m in responses] == ["1", "2"]
+        assert emitted == []
+        assert bot._worker_state.emit == emitted.append
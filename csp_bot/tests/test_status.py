@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 from chatom import Message, User
 
 from csp_bot.commands.status import StatusCommand
+from csp_bot.metrics import Metrics
 from csp_bot.structs import BotCommand
 
 
@@ -34,3 +35,16 @@ def test_status_execute_uses_aware_utc_timestamp():
 
     assert result is not None
     assert "+00:00" in result.content
+
+
+def test_status_reports_bot_metrics():
+    command = StatusCommand()
+    bot = MagicMock()
+    bot._adapters = {"slack": object()}
+    bot._metrics = Metrics()
+    bot._metrics.incr("identity.fetch_failures.slack", 3)
+
+    command.preexecute(_command(), bot)
+    result = command.execute(_command())
+
+    assert "identity.fetch_failures.slack" in result.content
@@ -0,0 +1,136 @@
+"""Tests for streaming generator command output."""
+
+import threading
+import time
+from datetime import timedelta
+
+import csp
+from chatom import Channel, Message, User
+
+from csp_bot import Bot, BotCommand, BotConfig
+from csp_bot.commands import StreamClosed, execute_command_func
+from csp_bot.commands.framework import CommandEntry
+from csp_bot.streaming import StreamBackpressure
+
+
+class TestStreamBackpressure:
+    def test_acquire_waits_for_room(self):
+        backpressure = StreamBackpressure(max_queued=1)
+        key = ("slack", "C1")
+        assert backpressure.acquire(key, lambda: False) is True
+
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: backpressure.acquire(key, lambda: False, poll=0.01) and acquired.set())
+        waiter.start()
+        assert not acquired.wait(0.1)
+
+        backpressure.update(lambda key: 0)
+        assert acquired.wait(1)
+        waiter.join()
+
+    def test_update_forgets_drained_channels(self):
+        backpressure = StreamBackpressure(max_queued=2)
+        backpressure.acquire(("slack", "C1"), lambda: False)
+        backpressure.acquire(("slack", "C2"), lambda: False)
+
+        backpressure.update(lambda key: 1 if key == ("slack", "C1") else 0)
+
+        assert len(backpressure) == 1
+
+    def test_abandoned_stream_stops_waiting(self):
+        backpressure = StreamBackpressure(max_queued=0)
+
+        assert backpressure.acquire(("slack", "C1"), lambda: True) is False
+
+
+class TestStreamingExecution:
+    def _ctx(self):
+        return type("Ctx", (), {"backend": "slack"})()
+
+    def test_generator_items_are_emitted_as_yielded(self):
+        emitted = []
+
+        def gen(ctx):
+            yield "a"
+            assert [m.content for m in emitted] == ["a"]
+            yield "b"
+
+        assert execute_command_func(gen, self._ctx(), emit=emitted.append) == []
+        assert [m.content for m in emitted] == ["a", "b"]
+
+    def test_async_generator_items_are_emitted(self):
+        emitted = []
+
+        async def gen(ctx):
+            yield "a"
+            yield "b"
+
+        assert execute_command_func(gen, self._ctx(), emit=emitted.append) == []
+        assert [m.content for m in emitted] == ["a", "b"]
+
+    def test_closed_stream_stops_generator(self):
+        produced = []
+
+        def gen(ctx):
+            for item in ("a", "b", "c"):
+                produced.append(item)
+                yield item
+
+        def emit(item):
+            raise StreamClosed
+
+        assert execute_command_func(gen, self._ctx(), emit=emit) == []
+        assert produced == ["a"]
+
+    def test_time_blocked_on_a_slow_consumer_is_not_timed(self):
+        def gen(ctx):
+            yield from ("a", "b", "c")
+
+        async def agen(ctx):
+            for item in ("a", "b", "c"):
+                yield item
+
+        def slow_emit(item):
+            emitted.append(item.content)
+            time.sleep(0.1)
+
+        for fn in (gen, agen):
+            emitted = []
+            assert execute_command_func(fn, self._ctx(), timeout=0.15, emit=slow_emit) == []
+            assert emitted == ["a", "b", "c"]
+
+
+def progress(ctx):
+    yield "started"
+    time.sleep(0.4)
+    yield "done"
+
+
+class TestBotStreaming:
+    def test_items_are_sent_while_command_runs(self):
+        bot = Bot(config=BotConfig(ratelimit_seconds=0.1))
+        bot._commands["progress"] = CommandEntry(name="progress", help="", handler=progress)
+        bot._command_completions = csp.GenericPushAdapter(object)
+        cmd = BotCommand(
+            command="progress",
+            backend="slack",
+            channel_id="C1",
+            channel_name="",
+            message=Message(id="m1", channel=Channel(id="C1")),
+            source=User(id="U1"),
+            targets=(),
+            args=(),
+            delay=None,
+            schedule="",
+        )
+
+        @csp.graph
+        def graph():
+            outputs = bot._handle_commands(csp.const(cmd), bot._command_completions.out(), csp.null_ts([Message]))
+            csp.add_graph_output("messages", outputs.messages)
+
+        out = csp.run(graph, endtime=timedelta(seconds=1), realtime=True)
+
+        sent = [(t, m.content) for t, msgs in out["messages"] for m in msgs]
+        assert [content for _, content in sent] == ["started", "done"]
+        assert sent[1][0] - sent[0][0] >= timedelta(seconds=0.3)
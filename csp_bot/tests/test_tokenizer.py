@@ -0,0 +1,111 @@
+"""Tests for the command tokenizer."""
+
+from csv import reader
+from io import StringIO
+
+import pytest
+from chatom import User
+
+from csp_bot import Bot, BotConfig
+from csp_bot.tokenizer import MentionIndex, Token, as_tokens, tokenize
+
+
+class TestTokenize:
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "/echo hello world",
+            "/echo  a   b",
+            " /echo a",
+            "/echo a ",
+            '/echo "a b" c',
+            '/echo a"b c',
+            '/echo "ab"cd e',
+            '/echo "unterminated',
+            '/echo "a""b" c',
+            '/echo "multi\nline" c',
+            "/echo first\nsecond",
+            '/echo "" x',
+            "/echo a\tb",
+        ],
+    )
+    def test_matches_csv_reader(self, content):
+        expected = next(reader(StringIO(content), delimiter=" ", quotechar='"', skipinitialspace=True))
+
+        assert [t.text for t in tokenize(content)] == expected
+
+    def test_empty(self):
+        assert tokenize("") == []
+        assert tokenize("\nfoo") == []
+
+    def test_spans_and_quotes(self):
+        content = '/echo  "a b" c'
+
+        tokens = tokenize(content)
+
+        assert tokens == [Token("/echo", 0, 5), Token("a b", 7, 12, quoted=True), Token("c", 13, 14)]
+        assert content[tokens[1].start : tokens[1].end] == '"a b"'
+
+    def test_as_tokens_builds_spans_for_strings(self):
+        tokens = as_tokens(["@Paine,", "Timothy"])
+
+        assert [(t.start, t.end) for t in tokens] == [(0, 7), (8, 15)]
+
+
+class TestMentionIndex:
+    def test_finds_mention_shapes(self):
+        user = User(id="U123")
+        index = MentionIndex([user])
+
+        for text in ("<@U123>", "<@!U123>", "<@U123|bob>", "@U123", "U123,"):
+            assert index.find(text) is user
+
+    def test_does_not_match_inside_other_words(self):
+        assert MentionIndex([User(id="U1")]).find("<@U12>") is None
+
+    def test_prefers_exact_id_over_prefix(self):
+        short, long = User(id="U1"), User(id="U12")
+
+        assert MentionIndex([short, long]).find("<@U12>") is long
+
+    def test_empty_ids_are_ignored(self):
+        assert MentionIndex([User(id="")]).find("anything") is None
+
+
+class TestParseCommandArgs:
+    def test_quoted_directive_is_an_argument(self):
+        bot = Bot(config=BotConfig())
+
+        args, _, channel = bot._parse_command_args(tokenize('"/room" TKP'), [], "slack")
+
+        assert args == ["/room", "TKP"]
+        assert channel == ""
+
+    def test_slack_mentions_resolved_by_id(self):
+        bot = Bot(config=BotConfig())
+        users = [User(id=f"U{i}") for i in range(50)]
+        content = " ".join(f"<@U{i}>" for i in reversed(range(50))) + " hello"
+
+        args, targets, _ = bot._parse_command_args(tokenize(content), users, "slack")
+
+        assert args == ["hello"]
+        assert [u.id for u in targets] == [f"U{i}" for i in reversed(range(50))]
+
+    def test_symphony_known_name_skips_only_name_tokens(self):
+        bot = Bot(config=BotConfig())
+        mentions = [User(id="1", name="Paine,  Timothy")]
+
+        args, targets, _ = bot._parse_command_args(tokenize("@Paine,  Timothy hello world"), mentions, "symphony")
+
+        assert [u.id for u in targets] == ["1"]
+        assert args == ["hello", "world"]
+
+    def test_symphony_unknown_name_falls_back_to_skipping_words(self):
+        bot = Bot(config=BotConfig())
+        mentions = [User(id="1", name="")]
+
+        args, targets, channel = bot._parse_command_args(tokenize("@Paine, Timothy /room TKP"), mentions, "symphony")
+
+        assert [u.id for u in targets] == ["1"]
+        assert args == []
+        assert channel == "TKP"
@@ -7,7 +7,7 @@ cross-platform capabilities for mentions, formatting, etc.
 from typing import Literal
 from urllib.parse import urlparse
 
-from chatom import User, mention_user_for_backend
+from chatom import Message, User, mention_user_for_backend
 from chatom.format import Format, FormattedMessage, get_format_for_backend
 
 __all__ = (
@@ -18,6 +18,8 @@ __all__ = (
     "is_valid_url",
     "mention_user",
     "mention_users",
+    "message_backend",
+    "message_thread_id",
     "recursive_format_for_message_ml",
     "sanitize_message",
 )
@@ -41,6 +43,20 @@ def is_valid_url(url: str) -> bool:
         return False
 
 
+def message_backend(msg: Message) -> str:
+    """Return the backend an outgoing message is addressed to."""
+    return (msg.metadata or {}).get("backend") or msg.backend or ""
+
+
+def message_thread_id(msg: Message) -> str:
+    """Return the thread an outgoing message is posted in, or ``""``.
+
+    Responses built by the bot carry ``thread_id`` as an extra field,
+    which chatom's ``Message.thread_id`` property does not see.
+    """
+    return msg.thread_id or (msg.model_extra or {}).get("thread_id") or ""
+
+
 def mention_user(
     user: User,
     backend: Backend,